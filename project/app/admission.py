@@ -0,0 +1,110 @@
+"""Decide whether to accept new summaries.
+
+Each client has a token bucket holding up to ``RATE_LIMIT_BURST`` summaries,
+refilled at ``RATE_LIMIT_PER_SECOND``. Buckets are rows in the database, so
+every web worker draws on the same one, and each is refilled and drawn from
+in one upsert, so concurrent requests can't overdraw it.
+Clients are told apart by address; behind proxies, set
+``FORWARDED_PROXY_HOPS`` so it is read from ``X-Forwarded-For``.
+
+Separately, once ``ADMISSION_MAX_BACKLOG`` summary jobs are queued or running,
+new summaries are refused until the workers catch up.
+"""
+
+import math
+import time
+from typing import Optional
+
+from app.config import Settings
+from app.db import execute_query
+from app.models.tortoise import JobStatus, RateLimitBucket, SummaryJob
+
+# Seconds a process reuses its count of the backlog before counting again.
+BACKLOG_TTL = 1.0
+# Seconds to ask clients to wait while the backlog is full.
+BACKLOG_RETRY_AFTER = 30
+# Seconds between a worker's sweeps for buckets that have refilled.
+PRUNE_INTERVAL = 60.0
+
+_REFILLED = (
+    'CASE WHEN "ratelimitbucket"."tokens" + ($3 - "ratelimitbucket"."updated_at") '
+    '* $4 > $5 THEN $5 ELSE "ratelimitbucket"."tokens" '
+    '+ ($3 - "ratelimitbucket"."updated_at") * $4 END'
+)
+TAKE_TOKENS = (
+    'INSERT INTO "ratelimitbucket" ("key", "tokens", "updated_at") '
+    "VALUES ($1, $2, $3) "
+    f'ON CONFLICT ("key") DO UPDATE SET "tokens" = {_REFILLED} - $6, '  # nosec
+    f'"updated_at" = $3 WHERE {_REFILLED} >= $6 '
+    'RETURNING "tokens"'
+)
+
+
+async def take(key: str, cost: int, settings: Settings) -> Optional[float]:
+    """Take ``cost`` tokens from ``key``'s bucket.
+
+    Returns ``None`` if they were taken, otherwise the seconds until there are
+    enough of them.
+    """
+    if not settings.rate_limit_per_second:
+        return None
+    rate, burst = settings.rate_limit_per_second, float(settings.rate_limit_burst)
+    if cost > burst:
+        return math.inf
+
+    # Refills follow each web worker's clock; they need only roughly agree.
+    now = time.time()
+    taken = await execute_query(
+        TAKE_TOKENS, [key, burst - cost, now, rate, burst, float(cost)]
+    )
+    if taken:
+        return None
+
+    bucket = await RateLimitBucket.filter(key=key).first()
+    if bucket is None:
+        # Pruned since, so full again.
+        return 0.0
+    tokens = min(burst, bucket.tokens + (now - bucket.updated_at) * rate)
+    return (cost - tokens) / rate
+
+
+async def prune_buckets(settings: Settings) -> int:
+    """Delete buckets that have refilled, which is the same as having none."""
+    if not settings.rate_limit_per_second:
+        return 0
+    full_after = settings.rate_limit_burst / settings.rate_limit_per_second
+    return await RateLimitBucket.filter(
+        updated_at__lt=time.time() - full_after
+    ).delete()
+
+
+class Backlog:
+    """Summary jobs queued or running, counted at most every ``BACKLOG_TTL``."""
+
+    def __init__(self) -> None:
+        self._count = 0
+        self._expires_at = 0.0
+
+    async def count(self) -> int:
+        if time.monotonic() >= self._expires_at:
+            self._count = await SummaryJob.filter(
+                status__in=[JobStatus.QUEUED, JobStatus.RUNNING]
+            ).count()
+            self._expires_at = time.monotonic() + BACKLOG_TTL
+        return self._count
+
+    async def is_full(self, settings: Settings) -> bool:
+        if not settings.admission_max_backlog:
+            return False
+        return await self.count() >= settings.admission_max_backlog
+
+
+_backlog: Optional[Backlog] = None
+
+
+def get_backlog() -> Backlog:
+    global _backlog
+
+    if _backlog is None:
+        _backlog = Backlog()
+    return _backlog
@@ -1,45 +1,240 @@
-from typing import Optional
+from datetime import datetime
+from typing import AsyncIterator, Optional
 
-# fmt: off
-from app.models.pydantic import (SummaryPayloadSchema,
-                                 SummaryUpdatePayloadSchema)
-# fmt: on
-from app.models.tortoise import TextSummary
+from tortoise import timezone
+from tortoise.transactions import in_transaction
 
+from app import jobs, notify
+from app.articles import ArticleNotStored
+from app.cache import get_cache
+from app.config import get_settings
+from app.db import execute_query
+from app.metrics import timed_query
+from app.replica import read_connection
+from app.urls import url_hash
 
-async def post(payload: SummaryPayloadSchema) -> int:
-    summary = TextSummary(
-        url=payload.url,
-        summary="",
-    )
-    await summary.save()
+from app.models.tortoise import (  # isort:skip
+    ArticleText,
+    EngineName,
+    SummarySchema,
+    SummaryStatus,
+    TextSummary,
+)
+from app.models.pydantic import (  # isort:skip
+    SummaryCreatePayloadSchema,
+    SummaryUpdatePayloadSchema,
+)
+
+SUMMARY_FIELDS = tuple(SummarySchema.__fields__)
+SUMMARY_COLUMNS = ", ".join(f'"{field}"' for field in SUMMARY_FIELDS)
+
+
+def resolve_engine(engine: Optional[EngineName]) -> str:
+    return (engine or get_settings().summarizer_engine).value
+
+
+@timed_query
+async def post(payload: SummaryCreatePayloadSchema) -> int:
+    engine = resolve_engine(payload.engine)
+    cached = await get_cache().get(payload.url, engine)
+
+    async with in_transaction("default") as connection:
+        summary = TextSummary(
+            url=payload.url,
+            url_hash=url_hash(payload.url),
+            summary=cached or "",
+            engine=engine,
+        )
+        if cached is not None:
+            summary.status = SummaryStatus.DONE
+            summary.finished_at = timezone.now()
+        await summary.save(using_db=connection)
+        if cached is None:
+            await jobs.enqueue(summary.id, payload.url, engine, using_db=connection)
     return summary.id
 
 
-async def get_all() -> list:
-    summaries = await TextSummary.all().values()
+@timed_query
+async def post_many(urls: list[str], engine: Optional[EngineName] = None) -> list[int]:
+    engine = resolve_engine(engine)
+    urls = [str(url) for url in urls]
+    cached = await get_cache().get_many(urls, engine)
+    hashes = [url_hash(url) for url in urls]
+    summaries = [cached.get(url, "") for url in urls]
+    now = timezone.now()
+    statuses = [
+        SummaryStatus.DONE.value if url in cached else SummaryStatus.PENDING.value
+        for url in urls
+    ]
+    finished = [now if url in cached else None for url in urls]
+    engines = [engine] * len(urls)
+
+    async with in_transaction("default") as connection:
+        if connection.capabilities.dialect == "postgres":
+            rows = await connection.execute_query_dict(
+                'INSERT INTO "textsummary" '
+                '("url", "url_hash", "summary", "status", "finished_at", "engine") '
+                "SELECT * FROM unnest($1::text[], $2::varchar[], $3::text[], "
+                '$4::varchar[], $5::timestamptz[], $6::varchar[]) RETURNING "id"',
+                [urls, hashes, summaries, statuses, finished, engines],
+            )
+        else:
+            values = ", ".join(["(?, ?, ?, ?, ?, ?)"] * len(urls))
+            rows = await connection.execute_query_dict(
+                'INSERT INTO "textsummary" '
+                '("url", "url_hash", "summary", "status", "finished_at", "engine") '
+                f'VALUES {values} RETURNING "id"',  # nosec
+                [
+                    value
+                    for row in zip(urls, hashes, summaries, statuses, finished, engines)
+                    for value in row
+                ],
+            )
+
+        ids = [row["id"] for row in rows]
+        await jobs.enqueue_many(
+            [(id, url) for id, url in zip(ids, urls) if url not in cached],
+            engine,
+            using_db=connection,
+        )
+    return ids
+
+
+@timed_query
+async def get_all(
+    limit: int,
+    after: Optional[int] = None,
+    fields: Optional[list[str]] = None,
+    url: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    status: Optional[list[SummaryStatus]] = None,
+) -> list:
+    query = TextSummary.all().using_db(read_connection())
+    if after is not None:
+        query = query.filter(id__gt=after)
+    if url is not None:
+        query = query.filter(url_hash=url_hash(url))
+    if since is not None:
+        query = query.filter(created_at__gte=since)
+    if until is not None:
+        query = query.filter(created_at__lt=until)
+    if status:
+        query = query.filter(status__in=status)
+
+    summaries = (
+        await query.order_by("id").limit(limit).values(*(fields or SUMMARY_FIELDS))
+    )
     return summaries
 
 
+async def iter_all(
+    fields: Optional[list[str]] = None, chunk_size: int = 1000, **filters
+) -> AsyncIterator[dict]:
+    after = None
+    while True:
+        summaries = await get_all(chunk_size, after, fields, **filters)
+        for summary in summaries:
+            yield summary
+
+        if len(summaries) < chunk_size:
+            return
+        after = summaries[-1]["id"]
+
+
+@timed_query
 async def get(id: int) -> Optional[dict]:
-    summary = await TextSummary.filter(id=id).first().values()
+    summary = (
+        await TextSummary.filter(id=id)
+        .using_db(read_connection())
+        .first()
+        .values(*SUMMARY_FIELDS)
+    )
     if summary:
         return summary
     return None
 
 
-async def delete(id: int) -> int:
-    summary = await TextSummary.filter(id=id).delete()
+@timed_query
+async def get_many(ids: list[int]) -> list[dict]:
+    summaries = (
+        await TextSummary.filter(id__in=ids)
+        .using_db(read_connection())
+        .order_by("id")
+        .values(*SUMMARY_FIELDS)
+    )
+    return summaries
+
 
-    return summary
+@timed_query
+async def delete(id: int) -> Optional[dict]:
+    summaries = await execute_query(
+        'DELETE FROM "textsummary" WHERE "id" = $1 RETURNING "id", "url"', [id]
+    )
+    if summaries:
+        return summaries[0]
+    return None
 
 
-async def put(id: int, payload: SummaryUpdatePayloadSchema) -> Optional[dict]:
-    summary = await TextSummary.filter(id=id).update(
-        url=payload.url, summary=payload.summary
+@timed_query
+async def delete_many(ids: list[int]) -> list[dict]:
+    placeholders = ", ".join(f"${index}" for index in range(1, len(ids) + 1))
+    summaries = await execute_query(
+        f'DELETE FROM "textsummary" WHERE "id" IN ({placeholders}) '  # nosec
+        'RETURNING "id", "url"',
+        ids,
     )
+    return sorted(summaries, key=lambda summary: summary["id"])
+
+
+@timed_query
+async def put(id: int, payload: SummaryUpdatePayloadSchema) -> Optional[dict]:
+    # A summary written by hand is final, even when it is empty, so any job
+    # still due to summarize it is settled too.
+    async with in_transaction("default") as connection:
+        summaries = await execute_query(
+            'UPDATE "textsummary" '
+            'SET "url" = $1, "url_hash" = $2, "summary" = $3, "status" = $4, '
+            '"error" = NULL, "finished_at" = $5, "updated_at" = $5 '
+            f'WHERE "id" = $6 RETURNING {SUMMARY_COLUMNS}',  # nosec
+            [
+                str(payload.url),
+                url_hash(payload.url),
+                payload.summary,
+                SummaryStatus.DONE.value,
+                timezone.now(),
+                id,
+            ],
+            connection,
+        )
+        if summaries:
+            await jobs.cancel(id, using_db=connection)
+    if not summaries:
+        return None
+
+    await notify.publish([id])
+    return summaries[0]
+
+
+@timed_query
+async def resummarize(id: int, engine: Optional[EngineName] = None) -> Optional[dict]:
+    """Queue summary ``id`` to be summarized again from its stored article text."""
+    summary = await TextSummary.filter(id=id).first().values("id", "url", "engine")
     if not summary:
         return None
+    if not await ArticleText.exists(url_hash=url_hash(summary["url"])):
+        raise ArticleNotStored(summary["url"])
 
-    updated_summary = await TextSummary.filter(id=id).first().values()
-    return updated_summary
+    engine = EngineName(engine or summary["engine"]).value
+    async with in_transaction("default") as connection:
+        await TextSummary.filter(id=id).using_db(connection).update(
+            status=SummaryStatus.PENDING,
+            engine=engine,
+            error=None,
+            finished_at=None,
+            updated_at=timezone.now(),
+        )
+        await jobs.enqueue(
+            id, summary["url"], engine, using_db=connection, resummarize=True
+        )
+    return {"id": id, "url": summary["url"]}
@@ -0,0 +1,66 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional, Union
+
+from fastapi.requests import Request
+
+
+def as_datetime(value: Union[str, datetime]) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def version(updated_at: Union[str, datetime]) -> int:
+    return int(as_datetime(updated_at).timestamp() * 1_000_000)
+
+
+# Tags are weak: a summary's bytes change with the response's encoding, but
+# its content doesn't, and a 304 must repeat the tag its 200 would send.
+def summary_etag(summary: dict) -> str:
+    return f'W/"{summary["id"]}-{version(summary["updated_at"])}"'
+
+
+def collection_etag(summaries: Iterable[dict], query: str) -> str:
+    digest = hashlib.sha256(query.encode())
+    for summary in summaries:
+        digest.update(f"{summary['id']}-{version(summary['updated_at'])};".encode())
+    return f'W/"{digest.hexdigest()[:32]}"'
+
+
+def last_modified(summaries: Iterable[dict]) -> Optional[datetime]:
+    return max(
+        (as_datetime(summary["updated_at"]) for summary in summaries), default=None
+    )
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def is_not_modified(
+    request: Request, etag: str, modified: Optional[datetime] = None
+) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in tags or "*" in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return modified.replace(microsecond=0) <= since
+
+
+def cache_headers(etag: str, modified: Optional[datetime]) -> dict:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if modified is not None:
+        headers["Last-Modified"] = http_date(modified)
+    return headers
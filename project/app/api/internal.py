@@ -0,0 +1,39 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app.cache import get_cache
+from app.config import Settings, get_settings
+from app.db import get_pool_stats
+
+
+def require_token(
+    authorization: Optional[str] = Header(None),
+    settings: Settings = Depends(get_settings),
+) -> None:
+    """Only serve callers presenting ``INTERNAL_API_TOKEN`` as a bearer token.
+
+    Without a token configured, the endpoints don't exist.
+    """
+    if not settings.internal_api_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(
+        token.encode(), settings.internal_api_token.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Invalid internal API token")
+
+
+router = APIRouter(dependencies=[Depends(require_token)])
+
+
+@router.get("/cache")
+async def cache_stats() -> dict:
+    return get_cache().stats()
+
+
+@router.get("/db-pool")
+async def db_pool_stats() -> dict:
+    return get_pool_stats()
@@ -0,0 +1,39 @@
+import logging
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from tortoise.exceptions import BaseORMException
+from tortoise.functions import Count
+
+from app.metrics import SUMMARY_JOB_QUEUE_DEPTH, render
+from app.models.tortoise import JobStatus, SummaryJob
+
+log = logging.getLogger("uvicorn")
+
+# Finished jobs are kept, so only the statuses that stay small are counted.
+QUEUE_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+router = APIRouter()
+
+
+async def update_queue_depth() -> None:
+    counts = (
+        await SummaryJob.filter(status__in=QUEUE_STATUSES)
+        .annotate(count=Count("id"))
+        .group_by("status")
+        .values_list("status", "count")
+    )
+    depths = dict(counts)
+    for status in QUEUE_STATUSES:
+        SUMMARY_JOB_QUEUE_DEPTH.labels(status.value).set(depths.get(status, 0))
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    try:
+        await update_queue_depth()
+    except (BaseORMException, OSError):
+        log.warning("Could not count queued summary jobs", exc_info=True)
+
+    return Response(render(), media_type=CONTENT_TYPE_LATEST)
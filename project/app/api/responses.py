@@ -0,0 +1,78 @@
+"""Encode database rows straight to JSON responses.
+
+FastAPI validates every row against the endpoint's ``response_model`` before
+encoding it, which is most of the cost of a large listing. Rows read through
+``crud`` already have the model's fields and types, so with
+``FAST_JSON_RESPONSES`` set the read endpoints hand them to orjson instead.
+The JSON is the same either way.
+
+Lists longer than ``RESPONSE_CHUNK_SIZE`` rows are streamed a chunk at a time,
+so the first rows go out before the last are encoded.
+"""
+
+from typing import Any, Callable, Iterator, Union
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+
+from app.config import Settings
+
+Encoder = Callable[[list[dict]], bytes]
+
+
+class RowsJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+def rows_response(content: Any, response: Response) -> RowsJSONResponse:
+    # FastAPI only copies headers from ``response`` onto responses it builds.
+    return RowsJSONResponse(content, headers=dict(response.headers))
+
+
+def validating_encoder(model: type[BaseModel], exclude_unset: bool) -> Encoder:
+    """Encode rows the way FastAPI encodes a ``list[model]`` response."""
+
+    def encode(rows: list[dict]) -> bytes:
+        content = [
+            model.validate(row).dict(by_alias=True, exclude_unset=exclude_unset)
+            for row in rows
+        ]
+        return JSONResponse(jsonable_encoder(content)).body
+
+    return encode
+
+
+def json_array(rows: list[dict], encode: Encoder, chunk_size: int) -> Iterator[bytes]:
+    """Encode ``rows`` as one JSON array, ``chunk_size`` rows at a time."""
+    separator = b"["
+    for start in range(0, len(rows), chunk_size):
+        # Strip each chunk's brackets and join the elements into one array.
+        yield separator + encode(rows[start : start + chunk_size])[1:-1]  # noqa: E203
+        separator = b","
+    yield b"]" if rows else b"[]"
+
+
+def list_response(
+    rows: list[dict],
+    response: Response,
+    settings: Settings,
+    model: type[BaseModel],
+    exclude_unset: bool = False,
+) -> Union[list[dict], Response]:
+    """Respond with ``rows``, streamed if there are more than a chunk of them."""
+    if len(rows) > settings.response_chunk_size:
+        if settings.fast_json_responses:
+            encode = orjson.dumps
+        else:
+            encode = validating_encoder(model, exclude_unset)
+        return StreamingResponse(
+            json_array(rows, encode, settings.response_chunk_size),
+            media_type="application/json",
+            headers=dict(response.headers),
+        )
+    if settings.fast_json_responses:
+        return rows_response(rows, response)
+    return rows
@@ -1,53 +1,318 @@
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Path
+import asyncio
+import json
+import math
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
 
-from app.api import crud
-from app.models.tortoise import SummarySchema
-from app.summarizer import generate_summary
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.requests import Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import AnyHttpUrl
 
+from app import admission
+from app.api import crud, etags
+from app.api.responses import list_response, rows_response
+from app.articles import ArticleNotStored
+from app.config import Settings, get_settings
+from app.metrics import SUMMARY_REQUESTS_REJECTED
+from app.notify import get_notifier
+from app.replica import use_primary
+
+from app.models.tortoise import (  # isort:skip
+    SummaryFieldsSchema,
+    SummarySchema,
+    SummaryStatus,
+)
 from app.models.pydantic import (  # isort:skip
-    SummaryPayloadSchema,
+    MAX_BATCH_SIZE,
+    SummaryBatchPayloadSchema,
+    SummaryCreatePayloadSchema,
     SummaryResponseSchema,
+    SummaryResummarizePayloadSchema,
     SummaryUpdatePayloadSchema,
 )
 
-
 router = APIRouter()
 
+Admit = Callable[[int], Awaitable[None]]
+
+
+def summary_fields(
+    fields: Optional[str] = Query(
+        None, description="Comma separated list of fields to return"
+    )
+) -> Optional[list[str]]:
+    if fields is None:
+        return None
+
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = sorted(set(requested) - set(SummarySchema.__fields__))
+    if unknown:
+        raise HTTPException(
+            status_code=422, detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+
+    # In model order, so the JSON matches whether or not rows are validated.
+    return [
+        field
+        for field in SummarySchema.__fields__
+        if field == "id" or field in requested
+    ]
+
+
+def client_address(request: Request, settings: Settings) -> str:
+    """The address of the client, as recorded by the nearest trusted proxy.
+
+    Each of the ``FORWARDED_PROXY_HOPS`` proxies in front of the app appends
+    the address it saw to ``X-Forwarded-For``, so counting from the right
+    skips anything the client put there itself.
+    """
+    hops = settings.forwarded_proxy_hops
+    if hops:
+        forwarded = [
+            address.strip()
+            for header in request.headers.getlist("x-forwarded-for")
+            for address in header.split(",")
+            if address.strip()
+        ]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+def get_admission(
+    request: Request, settings: Settings = Depends(get_settings)
+) -> Admit:
+    """Admit new summaries for the requesting client, or refuse them."""
+    client = client_address(request, settings)
+
+    async def admit(cost: int) -> None:
+        if await admission.get_backlog().is_full(settings):
+            SUMMARY_REQUESTS_REJECTED.labels("backlog").inc()
+            raise HTTPException(
+                status_code=503,
+                detail="Too many summaries are pending",
+                headers={"Retry-After": str(admission.BACKLOG_RETRY_AFTER)},
+            )
+
+        wait = await admission.take(client, cost, settings)
+        if wait is None:
+            return
+
+        SUMMARY_REQUESTS_REJECTED.labels("rate_limit").inc()
+        if math.isinf(wait):
+            raise HTTPException(
+                status_code=429, detail="More summaries than the rate limit allows"
+            )
+        raise HTTPException(
+            status_code=429,
+            detail="Too many summaries requested",
+            headers={"Retry-After": str(max(math.ceil(wait), 1))},
+        )
+
+    return admit
+
 
 @router.post("/", response_model=SummaryResponseSchema, status_code=201)
 async def create_summary(
-    payload: SummaryPayloadSchema, background_tasks: BackgroundTasks
+    payload: SummaryCreatePayloadSchema, admit: Admit = Depends(get_admission)
 ) -> SummaryResponseSchema:
+    await admit(1)
     summary_id = await crud.post(payload)
 
-    background_tasks.add_task(generate_summary, summary_id, payload.url)
-
     response_object = {"id": summary_id, "url": payload.url}
     return response_object
 
 
-@router.get("/", response_model=list[SummarySchema])
-async def read_all_summaries() -> list[SummarySchema]:
-    return await crud.get_all()
+@router.post("/batch", response_model=list[SummaryResponseSchema], status_code=201)
+async def create_summaries(
+    payload: SummaryBatchPayloadSchema, admit: Admit = Depends(get_admission)
+) -> list[SummaryResponseSchema]:
+    await admit(len(payload.urls))
+    summary_ids = await crud.post_many(payload.urls, payload.engine)
+
+    return [{"id": id, "url": url} for id, url in zip(summary_ids, payload.urls)]
+
+
+@router.get("/batch", response_model=list[SummarySchema])
+async def read_summaries(
+    response: Response,
+    ids: list[int] = Query(..., min_items=1, max_items=MAX_BATCH_SIZE),
+    settings: Settings = Depends(get_settings),
+) -> list[SummarySchema]:
+    summaries = await crud.get_many(ids)
+    return list_response(summaries, response, settings, SummarySchema)
+
+
+@router.delete("/batch", response_model=list[SummaryResponseSchema])
+async def delete_summaries(
+    ids: list[int] = Query(..., min_items=1, max_items=MAX_BATCH_SIZE)
+) -> list[SummaryResponseSchema]:
+    return await crud.delete_many(ids)
+
+
+@router.get(
+    "/", response_model=list[SummaryFieldsSchema], response_model_exclude_unset=True
+)
+async def read_all_summaries(
+    request: Request,
+    response: Response,
+    limit: int = Query(100, gt=0, le=1000),
+    after: Optional[int] = Query(None, ge=0),
+    fields: Optional[list[str]] = Depends(summary_fields),
+    url: Optional[AnyHttpUrl] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    status: Optional[list[SummaryStatus]] = Query(None),
+    settings: Settings = Depends(get_settings),
+) -> list[SummaryFieldsSchema]:
+    # updated_at always feeds the collection ETag, even when not requested.
+    strip_updated_at = fields is not None and "updated_at" not in fields
+    columns = [*fields, "updated_at"] if strip_updated_at else fields
+    summaries = await crud.get_all(
+        limit, after, columns, url=url, since=since, until=until, status=status
+    )
+    etag = etags.collection_etag(summaries, str(request.query_params))
+    headers = etags.cache_headers(etag, etags.last_modified(summaries))
+    if etags.is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    if len(summaries) == limit:
+        next_url = request.url.include_query_params(after=summaries[-1]["id"])
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+
+    if strip_updated_at:
+        for summary in summaries:
+            del summary["updated_at"]
+    return list_response(
+        summaries, response, settings, SummaryFieldsSchema, exclude_unset=True
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_summaries(
+    fields: Optional[list[str]] = Depends(summary_fields),
+    url: Optional[AnyHttpUrl] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    status: Optional[list[SummaryStatus]] = Query(None),
+    settings: Settings = Depends(get_settings),
+) -> StreamingResponse:
+    async def lines():
+        summaries = crud.iter_all(
+            fields, url=url, since=since, until=until, status=status
+        )
+        # One write per chunk of rows rather than per row.
+        chunk = []
+        async for summary in summaries:
+            chunk.append(json.dumps(jsonable_encoder(summary)) + "\n")
+            if len(chunk) == settings.response_chunk_size:
+                yield "".join(chunk)
+                chunk = []
+        if chunk:
+            yield "".join(chunk)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @router.get("/{id}/", response_model=SummarySchema)
-async def read_summary(id: int = Path(..., gt=0)) -> SummarySchema:
+async def read_summary(
+    request: Request,
+    response: Response,
+    id: int = Path(..., gt=0),
+    settings: Settings = Depends(get_settings),
+) -> SummarySchema:
     summary = await crud.get(id)
     if not summary:
         raise HTTPException(status_code=404, detail="Summary not found")
 
+    modified = etags.as_datetime(summary["updated_at"])
+    headers = etags.cache_headers(etags.summary_etag(summary), modified)
+    if etags.is_not_modified(request, headers["ETag"], modified):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    if settings.fast_json_responses:
+        return rows_response(summary, response)
+    return summary
+
+
+@router.get("/{id}/events", response_class=StreamingResponse)
+async def summary_events(
+    id: int = Path(..., gt=0), settings: Settings = Depends(get_settings)
+) -> StreamingResponse:
+    # Replicas may lag behind the notification, so always read the primary.
+    use_primary.set(True)
+    notifier = get_notifier()
+    await notifier.start()
+
+    def event(name: str, data: dict) -> str:
+        return f"event: {name}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+    async def events():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.summary_events_timeout
+        with notifier.subscribe(id) as ready:
+            while True:
+                # Cleared before reading, so a write landing during the read
+                # still wakes the wait below.
+                ready.clear()
+                summary = await crud.get(id)
+                if summary is None:
+                    yield event("error", {"detail": "Summary not found"})
+                    return
+                if summary["status"] == SummaryStatus.DONE:
+                    yield event("summary", summary)
+                    return
+                if summary["status"] == SummaryStatus.FAILED:
+                    yield event("failed", summary)
+                    return
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    yield event("timeout", {"id": id})
+                    return
+                try:
+                    await asyncio.wait_for(
+                        ready.wait(),
+                        min(remaining, settings.summary_events_keepalive),
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+
+    if not await crud.get(id):
+        raise HTTPException(status_code=404, detail="Summary not found")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/{id}/resummarize", response_model=SummaryResponseSchema, status_code=202)
+async def resummarize_summary(
+    payload: Optional[SummaryResummarizePayloadSchema] = None,
+    id: int = Path(..., gt=0),
+) -> SummaryResponseSchema:
+    try:
+        summary = await crud.resummarize(id, payload and payload.engine)
+    except ArticleNotStored:
+        raise HTTPException(status_code=409, detail="Article text is not stored")
+    if not summary:
+        raise HTTPException(status_code=404, detail="Summary not found")
+
     return summary
 
 
 @router.delete("/{id}/", response_model=SummaryResponseSchema)
 async def delete_summary(id: int = Path(..., gt=0)) -> SummaryResponseSchema:
-    summary = await crud.get(id)
+    summary = await crud.delete(id)
     if not summary:
         raise HTTPException(status_code=404, detail="Summary not found")
 
-    await crud.delete(id)
-
     return summary
 
 
@@ -0,0 +1,55 @@
+import asyncio
+import gzip
+from typing import Optional
+
+from app.config import get_settings
+from app.models.tortoise import ArticleText
+from app.urls import normalize_url, url_hash
+
+
+class ArticleNotStored(LookupError):
+    pass
+
+
+def compress(text: str, level: int) -> bytes:
+    return gzip.compress(text.encode(), compresslevel=level, mtime=0)
+
+
+def decompress(data: bytes) -> str:
+    return gzip.decompress(data).decode()
+
+
+async def store(url: str, title: str, text: str, html: Optional[str] = None) -> None:
+    """Keep the extracted text, and optionally the html, of ``url``.
+
+    zlib releases the GIL, so large pages are compressed off the event loop.
+    """
+    settings = get_settings()
+    level = settings.article_compression_level
+    if not settings.article_store_html:
+        html = None
+
+    compressed_text = await asyncio.to_thread(compress, text, level)
+    compressed_html = (
+        await asyncio.to_thread(compress, html, level) if html is not None else None
+    )
+    await ArticleText.update_or_create(
+        defaults={
+            "url": normalize_url(url),
+            "title": title,
+            "text": compressed_text,
+            "html": compressed_html,
+        },
+        url_hash=url_hash(url),
+    )
+
+
+async def load(url: str) -> tuple[str, str]:
+    """Return the stored ``(title, text)`` of ``url``."""
+    article = (
+        await ArticleText.filter(url_hash=url_hash(url)).only("title", "text").first()
+    )
+    if article is None:
+        raise ArticleNotStored(url)
+
+    return article.title, decompress(article.text)
@@ -0,0 +1,59 @@
+import asyncio
+import logging
+
+from tortoise import Tortoise
+
+from app.config import get_settings
+from app.db import get_tortoise_config
+from app.models.tortoise import TextSummary
+from app.urls import url_hash
+
+log = logging.getLogger("uvicorn")
+
+
+async def backfill_url_hashes(batch_size: int = 1000) -> int:
+    updated = 0
+    while True:
+        summaries = (
+            await TextSummary.filter(url_hash__isnull=True)
+            .order_by("id")
+            .limit(batch_size)
+            .only("id", "url")
+        )
+        if not summaries:
+            return updated
+
+        for summary in summaries:
+            summary.url_hash = url_hash(summary.url)
+        await TextSummary.bulk_update(summaries, fields=["url_hash"])
+        updated += len(summaries)
+        log.info("Backfilled url hashes for %s summaries", updated)
+
+
+async def create_url_hash_index() -> None:
+    """Index ``url_hash`` without blocking writes to ``textsummary``.
+
+    Migrations run in a transaction, where an index can't be built
+    concurrently, so this is left out of them.
+    """
+    connection = Tortoise.get_connection("default")
+    if connection.capabilities.dialect != "postgres":
+        return
+    await connection.execute_script(
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS "idx_textsummary_url_has_4e9a12" '
+        'ON "textsummary" ("url_hash")'
+    )
+
+
+async def main() -> None:
+    await Tortoise.init(config=get_tortoise_config(get_settings()))
+    try:
+        await backfill_url_hashes()
+        await create_url_hash_index()
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,167 @@
+import logging
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Optional
+
+from tortoise import timezone
+from tortoise.exceptions import IntegrityError
+
+from app.config import Settings, get_settings
+from app.models.tortoise import CachedSummary
+from app.urls import normalize_url, summary_key
+
+log = logging.getLogger("uvicorn")
+
+
+class LRUCache:
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class SummaryCache:
+    def __init__(self, settings: Settings) -> None:
+        self.memory = LRUCache(settings.summary_cache_size, settings.summary_cache_ttl)
+        self.shared_ttl = settings.summary_cache_shared_ttl
+        self.shared_hits = 0
+        self.shared_misses = 0
+
+    async def get(self, url: str, engine: str) -> Optional[str]:
+        key = summary_key(url, engine)
+        summary = self.memory.get(key)
+        if summary is not None:
+            return summary
+
+        cutoff = timezone.now() - timedelta(seconds=self.shared_ttl)
+        cached = await CachedSummary.filter(key=key, created_at__gte=cutoff).first()
+        if cached is None:
+            self.shared_misses += 1
+            return None
+
+        self.shared_hits += 1
+        self.memory.set(key, cached.summary)
+        return cached.summary
+
+    async def get_many(self, urls: list[str], engine: str) -> dict[str, str]:
+        keys = {url: summary_key(url, engine) for url in urls}
+        found = {}
+        for url, key in keys.items():
+            summary = self.memory.get(key)
+            if summary is not None:
+                found[url] = summary
+
+        missing = {key: url for url, key in keys.items() if url not in found}
+        if not missing:
+            return found
+
+        cutoff = timezone.now() - timedelta(seconds=self.shared_ttl)
+        cached = await CachedSummary.filter(
+            key__in=list(missing), created_at__gte=cutoff
+        ).values("key", "summary")
+        summaries = {row["key"]: row["summary"] for row in cached}
+        for key, url in missing.items():
+            summary = summaries.get(key)
+            if summary is None:
+                self.shared_misses += 1
+                continue
+
+            self.shared_hits += 1
+            self.memory.set(key, summary)
+            found[url] = summary
+        return found
+
+    async def get_stale(self, url: str, engine: str) -> Optional[CachedSummary]:
+        """Return the shared entry for ``url`` even if it has expired.
+
+        Expired entries keep the origin's validators for a conditional re-fetch.
+        """
+        return await CachedSummary.filter(key=summary_key(url, engine)).first()
+
+    async def set(
+        self,
+        url: str,
+        engine: str,
+        summary: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        if not summary:
+            return
+
+        key = summary_key(url, engine)
+        self.memory.set(key, summary)
+        try:
+            await CachedSummary.update_or_create(
+                defaults={
+                    "url": normalize_url(url),
+                    "summary": summary,
+                    "etag": etag,
+                    "last_modified": last_modified,
+                },
+                key=key,
+            )
+        except IntegrityError:
+            log.debug("Summary for %s was cached concurrently", url)
+
+    def stats(self) -> dict:
+        return {
+            "memory": {
+                "size": len(self.memory),
+                "maxsize": self.memory.maxsize,
+                "hits": self.memory.hits,
+                "misses": self.memory.misses,
+                "evictions": self.memory.evictions,
+                "expirations": self.memory.expirations,
+            },
+            "shared": {
+                "hits": self.shared_hits,
+                "misses": self.shared_misses,
+            },
+        }
+
+
+_cache: Optional[SummaryCache] = None
+
+
+def get_cache() -> SummaryCache:
+    global _cache
+
+    if _cache is None:
+        _cache = SummaryCache(get_settings())
+    return _cache
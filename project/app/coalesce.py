@@ -0,0 +1,127 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable
+
+from tortoise import Tortoise
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._calls: dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(
+        self, key: str, func: Callable[..., Awaitable[Any]], *args: Any
+    ) -> Any:
+        call = self._calls.get(key)
+        if call is not None:
+            return await asyncio.shield(call)
+
+        call = asyncio.get_running_loop().create_future()
+        self._calls[key] = call
+        try:
+            result = await func(*args)
+        except asyncio.CancelledError:
+            call.set_exception(RuntimeError(f"Call for {key} was cancelled"))
+            call.exception()
+            raise
+        except Exception as exc:
+            call.set_exception(exc)
+            call.exception()
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+
+class MicroBatcher:
+    """Groups concurrent calls into batches, one batch per key at a time.
+
+    A batch is flushed once it holds ``max_size`` items or ``max_wait``
+    seconds after its first item arrived, and ``func(key, items)`` must
+    return one result per item, in order.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[Hashable, list], Awaitable[list]],
+        max_size: int,
+        max_wait: float,
+    ) -> None:
+        self.func = func
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._batches: dict[Hashable, list[tuple[Any, asyncio.Future]]] = {}
+        self._timers: dict[Hashable, asyncio.TimerHandle] = {}
+        self._running: set[asyncio.Task] = set()
+
+    async def submit(self, key: Hashable, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._batches.setdefault(key, [])
+        batch.append((item, future))
+        if len(batch) >= self.max_size:
+            self._flush(key)
+        elif len(batch) == 1:
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+        return await future
+
+    def _flush(self, key: Hashable) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self._batches.pop(key, [])
+        if batch:
+            task = asyncio.create_task(self._run(key, batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, key: Hashable, batch: list) -> None:
+        try:
+            results = await self.func(key, [item for item, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+def advisory_lock_id(key: str) -> int:
+    return int.from_bytes(bytes.fromhex(key[:16]), "big", signed=True)
+
+
+@asynccontextmanager
+async def try_advisory_lock(
+    key: str, connection_name: str = "default"
+) -> AsyncIterator[bool]:
+    """Try to take a session lock on ``key``, held on a connection of its own.
+
+    The connection is kept out of any transaction, so it doesn't sit idle in
+    one while the lock is held, and writes made under the lock go through the
+    usual connections where other readers see them straight away. Those
+    writes need a connection besides the lock's, which is why ``Settings``
+    keeps ``WORKER_CONCURRENCY`` below ``DB_POOL_MAX_SIZE``.
+    """
+    connection = Tortoise.get_connection(connection_name)
+    if connection.capabilities.dialect != "postgres":
+        yield True
+        return
+
+    lock_id = advisory_lock_id(key)
+    async with connection.acquire_connection() as session:
+        locked = await session.fetchval("SELECT pg_try_advisory_lock($1)", lock_id)
+        try:
+            yield locked
+        finally:
+            # asyncpg also releases every advisory lock when the connection
+            # goes back to the pool, should this be cancelled.
+            if locked:
+                await session.fetchval("SELECT pg_advisory_unlock($1)", lock_id)
@@ -0,0 +1,145 @@
+"""Compress responses with the best encoding the client accepts.
+
+Brotli is preferred to gzip when the client accepts both equally. Bodies
+smaller than ``COMPRESSION_MINIMUM_SIZE`` are sent as they are. Streamed
+responses are compressed a chunk at a time and flushed after each one, so the
+client can decode the first rows before the last are sent. Event streams are
+never compressed: the compressor would hold events back.
+"""
+
+import zlib
+from typing import Optional, Protocol
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import Settings, get_settings
+
+# In order of preference.
+ENCODINGS = ("br", "gzip")
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        """Compress and flush ``data``, ending the stream if ``finish``."""
+
+
+class GzipCompressor:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        mode = zlib.Z_FINISH if finish else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(mode)
+
+
+class BrotliCompressor:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        compressed = self._compressor.process(data)
+        if finish:
+            return compressed + self._compressor.finish()
+        return compressed + self._compressor.flush()
+
+
+def compressor(encoding: str, settings: Settings) -> Compressor:
+    if encoding == "br":
+        return BrotliCompressor(settings.compression_brotli_quality)
+    return GzipCompressor(settings.compression_gzip_level)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """The preferred encoding an ``Accept-Encoding`` header allows, if any."""
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, *params = item.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        await self.app(scope, receive, self._compress(send, encoding))
+
+    def _compress(self, send: Send, encoding: Optional[str]) -> Send:
+        settings = get_settings()
+        start: Optional[Message] = None
+        stream: Optional[Compressor] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, stream, passthrough
+            if message["type"] == "http.response.start":
+                # Held back until the first body shows whether to compress.
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            if stream is not None:
+                more_body = message.get("more_body", False)
+                message["body"] = stream.compress(message["body"], not more_body)
+                await send(message)
+                return
+
+            body = message["body"]
+            more_body = message.get("more_body", False)
+            headers = MutableHeaders(raw=start["headers"])
+            if (
+                "content-encoding" in headers
+                or headers.get("content-type", "").startswith(UNCOMPRESSED_TYPES)
+                or (not more_body and len(body) < settings.compression_minimum_size)
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is None:
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+            etag = headers.get("etag")
+            if etag is not None and not etag.startswith("W/"):
+                # The compressed bytes differ, so the tag can only be weak.
+                headers["ETag"] = f"W/{etag}"
+            stream = compressor(encoding, settings)
+            message["body"] = stream.compress(body, not more_body)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(message["body"]))
+            await send(start)
+            await send(message)
+
+        return send_wrapper
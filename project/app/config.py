@@ -1,8 +1,11 @@
 import logging
 import os
 from functools import lru_cache
+from typing import Optional
 
-from pydantic import AnyUrl, BaseSettings
+from pydantic import AnyUrl, BaseSettings, validator
+
+from app.models.tortoise import EngineName
 
 log = logging.getLogger("uvicorn")
 
@@ -11,6 +14,62 @@ class Settings(BaseSettings):
     environment: str = os.getenv("ENVIRONMENT", "dev")
     testing: bool = os.getenv("TESTING", 0)
     database_url: AnyUrl = os.environ.get("DATABASE_URL")
+    database_read_url: Optional[AnyUrl] = os.environ.get("DATABASE_READ_URL")
+    read_after_write_window: float = os.getenv("READ_AFTER_WRITE_WINDOW", 5.0)
+    db_pool_min_size: int = os.getenv("DB_POOL_MIN_SIZE", 1)
+    db_pool_max_size: int = os.getenv("DB_POOL_MAX_SIZE", 10)
+    db_pool_acquire_timeout: float = os.getenv("DB_POOL_ACQUIRE_TIMEOUT", 10.0)
+    db_pool_max_idle_lifetime: float = os.getenv("DB_POOL_MAX_IDLE_LIFETIME", 300.0)
+    db_statement_cache_size: int = os.getenv("DB_STATEMENT_CACHE_SIZE", 100)
+    summarizer_engine: EngineName = os.getenv("SUMMARIZER_ENGINE", "textrank")
+    summarizer_process_workers: int = os.getenv("SUMMARIZER_PROCESS_WORKERS", 2)
+    summarizer_batch_size: int = os.getenv("SUMMARIZER_BATCH_SIZE", 16)
+    summarizer_batch_wait: float = os.getenv("SUMMARIZER_BATCH_WAIT", 0.01)
+    fetch_timeout: float = os.getenv("FETCH_TIMEOUT", 30.0)
+    fetch_connect_timeout: float = os.getenv("FETCH_CONNECT_TIMEOUT", 5.0)
+    fetch_max_connections: int = os.getenv("FETCH_MAX_CONNECTIONS", 100)
+    fetch_max_keepalive: int = os.getenv("FETCH_MAX_KEEPALIVE", 20)
+    fetch_per_host_limit: int = os.getenv("FETCH_PER_HOST_LIMIT", 4)
+    fetch_max_body_size: int = os.getenv("FETCH_MAX_BODY_SIZE", 5 * 1024 * 1024)
+    fetch_http2: bool = os.getenv("FETCH_HTTP2", 1)
+    article_store_html: bool = os.getenv("ARTICLE_STORE_HTML", 0)
+    article_compression_level: int = os.getenv("ARTICLE_COMPRESSION_LEVEL", 6)
+    fast_json_responses: bool = os.getenv("FAST_JSON_RESPONSES", 0)
+    response_chunk_size: int = os.getenv("RESPONSE_CHUNK_SIZE", 100)
+    compression_minimum_size: int = os.getenv("COMPRESSION_MINIMUM_SIZE", 1024)
+    compression_gzip_level: int = os.getenv("COMPRESSION_GZIP_LEVEL", 6)
+    compression_brotli_quality: int = os.getenv("COMPRESSION_BROTLI_QUALITY", 4)
+    rate_limit_per_second: float = os.getenv("RATE_LIMIT_PER_SECOND", 5.0)
+    rate_limit_burst: int = os.getenv("RATE_LIMIT_BURST", 1000)
+    forwarded_proxy_hops: int = os.getenv("FORWARDED_PROXY_HOPS", 0)
+    internal_api_token: Optional[str] = os.environ.get("INTERNAL_API_TOKEN")
+    admission_max_backlog: int = os.getenv("ADMISSION_MAX_BACKLOG", 10000)
+    summary_cache_size: int = os.getenv("SUMMARY_CACHE_SIZE", 1024)
+    summary_cache_ttl: float = os.getenv("SUMMARY_CACHE_TTL", 3600.0)
+    summary_cache_shared_ttl: float = os.getenv("SUMMARY_CACHE_SHARED_TTL", 604800.0)
+    summary_events_timeout: float = os.getenv("SUMMARY_EVENTS_TIMEOUT", 300.0)
+    summary_events_keepalive: float = os.getenv("SUMMARY_EVENTS_KEEPALIVE", 15.0)
+    worker_concurrency: int = os.getenv("WORKER_CONCURRENCY", 8)
+    worker_poll_interval: float = os.getenv("WORKER_POLL_INTERVAL", 1.0)
+    worker_job_timeout: float = os.getenv("WORKER_JOB_TIMEOUT", 300.0)
+    worker_job_grace: float = os.getenv("WORKER_JOB_GRACE", 60.0)
+    worker_defer_delay: float = os.getenv("WORKER_DEFER_DELAY", 1.0)
+    worker_max_attempts: int = os.getenv("WORKER_MAX_ATTEMPTS", 5)
+    worker_retry_backoff: float = os.getenv("WORKER_RETRY_BACKOFF", 2.0)
+    worker_retry_backoff_max: float = os.getenv("WORKER_RETRY_BACKOFF_MAX", 300.0)
+    worker_metrics_port: int = os.getenv("WORKER_METRICS_PORT", 0)
+
+    @validator("worker_concurrency")
+    def leave_a_connection_free(cls, value: int, values: dict) -> int:
+        # Every running job holds a pooled connection for its advisory lock
+        # and needs another for its writes.
+        pool_size = values.get("db_pool_max_size")
+        if pool_size is not None and value >= pool_size:
+            raise ValueError(
+                f"WORKER_CONCURRENCY ({value}) must be less than "
+                f"DB_POOL_MAX_SIZE ({pool_size})"
+            )
+        return value
 
 
 @lru_cache()
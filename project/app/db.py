@@ -1,9 +1,16 @@
 import logging
 import os
+import re
+from typing import Any, Optional
 
 from fastapi import FastAPI
-from tortoise import Tortoise, run_async
+from tortoise import Tortoise, connections, run_async
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.backends.base.config_generator import expand_db_url
 from tortoise.contrib.fastapi import register_tortoise
+from tortoise.exceptions import ConfigurationError
+
+from app.config import Settings, get_settings
 
 log = logging.getLogger("uvicorn")
 
@@ -19,16 +26,73 @@ TORTOISE_ORM = {
 }
 
 
+def get_connection_config(db_url: str, settings: Settings) -> dict:
+    config = expand_db_url(db_url)
+    if config["engine"] == "tortoise.backends.asyncpg":
+        config["engine"] = "app.db_pool"
+        config["credentials"].update(
+            minsize=settings.db_pool_min_size,
+            maxsize=settings.db_pool_max_size,
+            acquire_timeout=settings.db_pool_acquire_timeout,
+            statement_cache_size=settings.db_statement_cache_size,
+            max_inactive_connection_lifetime=settings.db_pool_max_idle_lifetime,
+        )
+    return config
+
+
+def get_tortoise_config(settings: Settings) -> dict:
+    db_connections = {
+        "default": get_connection_config(settings.database_url, settings),
+    }
+    if settings.database_read_url:
+        db_connections["replica"] = get_connection_config(
+            settings.database_read_url, settings
+        )
+
+    return {
+        "connections": db_connections,
+        "apps": {
+            "models": {
+                "models": ["app.models.tortoise"],
+                "default_connection": "default",
+            },
+        },
+    }
+
+
 def init_db(app: FastAPI) -> None:
     register_tortoise(
         app,
-        db_url=os.environ.get("DATABASE_URL"),
-        modules={"models": ["app.models.tortoise"]},
+        config=get_tortoise_config(get_settings()),
         generate_schemas=False,
         add_exception_handlers=True,
     )
 
 
+def get_pool_stats() -> dict:
+    try:
+        clients = connections.all()
+    except ConfigurationError:
+        return {}
+
+    stats = {}
+    for client in clients:
+        pool_stats = getattr(client, "pool_stats", None)
+        if pool_stats is not None:
+            stats[client.connection_name] = pool_stats()
+    return stats
+
+
+async def execute_query(
+    sql: str, values: list[Any], connection: Optional[BaseDBAsyncClient] = None
+) -> list[dict]:
+    connection = connection or Tortoise.get_connection("default")
+    if connection.capabilities.dialect != "postgres":
+        sql = re.sub(r"\$(\d+)", r"?\1", sql)
+
+    return await connection.execute_query_dict(sql, values)
+
+
 async def generate_schema() -> None:
     log.info("Initializing Tortoise...")
 
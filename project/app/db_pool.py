@@ -0,0 +1,85 @@
+import asyncio
+import time
+from bisect import bisect_left
+from typing import Any, Optional
+
+import asyncpg
+from tortoise.backends.asyncpg.client import AsyncpgDBClient
+
+ACQUIRE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class PoolStats:
+    def __init__(self) -> None:
+        self.waiting = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.wait_buckets = [0] * (len(ACQUIRE_BUCKETS) + 1)
+
+    def observe(self, seconds: float) -> None:
+        self.wait_count += 1
+        self.wait_sum += seconds
+        self.wait_buckets[bisect_left(ACQUIRE_BUCKETS, seconds)] += 1
+
+    def histogram(self) -> dict:
+        buckets = {}
+        total = 0
+        for bound, count in zip((*ACQUIRE_BUCKETS, "+Inf"), self.wait_buckets):
+            total += count
+            buckets[str(bound)] = total
+        return {"buckets": buckets, "count": self.wait_count, "sum": self.wait_sum}
+
+
+class InstrumentedPool:
+    def __init__(self, pool: asyncpg.Pool, acquire_timeout: Optional[float]) -> None:
+        self._pool = pool
+        self.acquire_timeout = acquire_timeout
+        self.stats = PoolStats()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pool, name)
+
+    async def acquire(self, *, timeout: Optional[float] = None):
+        self.stats.waiting += 1
+        started = time.perf_counter()
+        try:
+            return await self._pool.acquire(timeout=timeout or self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.waiting -= 1
+            self.stats.observe(time.perf_counter() - started)
+
+    def snapshot(self) -> dict:
+        size = self._pool.get_size()
+        idle = self._pool.get_idle_size()
+        return {
+            "size": size,
+            "min_size": self._pool.get_min_size(),
+            "max_size": self._pool.get_max_size(),
+            "in_use": size - idle,
+            "idle": idle,
+            "waiting": self.stats.waiting,
+            "acquire_timeouts": self.stats.timeouts,
+            "acquire_wait_seconds": self.stats.histogram(),
+        }
+
+
+class InstrumentedAsyncpgDBClient(AsyncpgDBClient):
+    def __init__(self, *args: Any, acquire_timeout: Any = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.acquire_timeout = float(acquire_timeout) if acquire_timeout else None
+
+    async def create_pool(self, **kwargs: Any) -> InstrumentedPool:
+        pool = await super().create_pool(**kwargs)
+        return InstrumentedPool(pool, self.acquire_timeout)
+
+    def pool_stats(self) -> Optional[dict]:
+        if self._pool is None:
+            return None
+        return self._pool.snapshot()
+
+
+client_class = InstrumentedAsyncpgDBClient
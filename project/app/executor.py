@@ -0,0 +1,45 @@
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.config import Settings, get_settings
+
+log = logging.getLogger("uvicorn")
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def init_executor(
+    settings: Settings, initializer: Optional[Callable[[], Any]] = None
+) -> None:
+    global _process_pool
+
+    if _process_pool is not None:
+        return
+
+    log.info(
+        "Starting summarizer executor (%s processes)...",
+        settings.summarizer_process_workers,
+    )
+    _process_pool = ProcessPoolExecutor(
+        max_workers=settings.summarizer_process_workers, initializer=initializer
+    )
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    global _process_pool
+
+    if _process_pool is None:
+        return
+
+    log.info("Shutting down summarizer executor...")
+    _process_pool.shutdown(wait=wait, cancel_futures=not wait)
+    _process_pool = None
+
+
+async def run_cpu(func: Callable[..., Any], *args: Any) -> Any:
+    init_executor(get_settings())
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_process_pool, func, *args)
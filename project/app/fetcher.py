@@ -0,0 +1,151 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, NamedTuple, Optional
+
+import httpx
+
+from app.config import Settings, get_settings
+
+USER_AGENT = "fastapi-tdd-summarizer/1.0"
+
+
+class FetchError(Exception):
+    pass
+
+
+class BodyTooLarge(FetchError):
+    pass
+
+
+class Page(NamedTuple):
+    url: str
+    html: Optional[str]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.html is None
+
+
+class HostLimit:
+    def __init__(self, limit: int) -> None:
+        self.semaphore = asyncio.Semaphore(limit)
+        self.users = 0
+
+
+class Fetcher:
+    """Pooled article fetcher shared by every summary a process generates.
+
+    Keeps connections alive across requests, bounds each fetch by an overall
+    deadline and body size, and caps concurrent requests per host.
+    """
+
+    def __init__(
+        self, settings: Settings, transport: Optional[httpx.AsyncBaseTransport] = None
+    ) -> None:
+        self.timeout = settings.fetch_timeout
+        self.max_body_size = settings.fetch_max_body_size
+        self.per_host_limit = settings.fetch_per_host_limit
+        self._hosts: dict[str, HostLimit] = {}
+        self._client = httpx.AsyncClient(
+            http2=settings.fetch_http2,
+            transport=transport,
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+            timeout=httpx.Timeout(
+                settings.fetch_timeout, connect=settings.fetch_connect_timeout
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.fetch_max_connections,
+                max_keepalive_connections=settings.fetch_max_keepalive,
+            ),
+        )
+
+    @asynccontextmanager
+    async def _host_slot(self, host: str) -> AsyncIterator[None]:
+        limit = self._hosts.get(host)
+        if limit is None:
+            limit = self._hosts[host] = HostLimit(self.per_host_limit)
+
+        limit.users += 1
+        try:
+            async with limit.semaphore:
+                yield
+        finally:
+            limit.users -= 1
+            if not limit.users:
+                del self._hosts[host]
+
+    async def fetch(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> Page:
+        """Fetch ``url``; with validators, a 304 yields a page without html."""
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        async with self._host_slot(httpx.URL(url).host):
+            try:
+                return await asyncio.wait_for(self._fetch(url, headers), self.timeout)
+            except asyncio.TimeoutError:
+                raise FetchError(f"Fetching {url} took longer than {self.timeout}s")
+            except httpx.HTTPError as exc:
+                raise FetchError(f"Fetching {url} failed: {exc!r}") from exc
+
+    async def _fetch(self, url: str, headers: dict) -> Page:
+        async with self._client.stream("GET", url, headers=headers) as response:
+            if response.status_code == httpx.codes.NOT_MODIFIED:
+                return Page(
+                    str(response.url),
+                    None,
+                    response.headers.get("ETag", headers.get("If-None-Match")),
+                    response.headers.get(
+                        "Last-Modified", headers.get("If-Modified-Since")
+                    ),
+                )
+            response.raise_for_status()
+
+            length = response.headers.get("Content-Length")
+            if length and int(length) > self.max_body_size:
+                raise BodyTooLarge(f"{url} is {length} bytes")
+
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) > self.max_body_size:
+                    raise BodyTooLarge(f"{url} exceeds {self.max_body_size} bytes")
+
+            return Page(
+                str(response.url),
+                bytes(body).decode(response.encoding or "utf-8", errors="replace"),
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+            )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_fetcher: Optional[Fetcher] = None
+
+
+def get_fetcher() -> Fetcher:
+    global _fetcher
+
+    if _fetcher is None:
+        _fetcher = Fetcher(get_settings())
+    return _fetcher
+
+
+async def close_fetcher() -> None:
+    global _fetcher
+
+    if _fetcher is not None:
+        await _fetcher.aclose()
+        _fetcher = None
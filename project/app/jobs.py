@@ -0,0 +1,176 @@
+import logging
+from datetime import timedelta
+from typing import Optional
+
+from tortoise import timezone
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.expressions import F
+from tortoise.transactions import in_transaction
+
+from app import notify
+from app.config import Settings
+from app.urls import summary_key
+
+from app.models.tortoise import (  # isort:skip
+    JobStatus,
+    SummaryJob,
+    SummaryStatus,
+    TextSummary,
+)
+
+log = logging.getLogger("uvicorn")
+
+
+async def enqueue(
+    summary_id: int,
+    url: str,
+    engine: str,
+    using_db: Optional[BaseDBAsyncClient] = None,
+    resummarize: bool = False,
+) -> SummaryJob:
+    return await SummaryJob.create(
+        summary_id=summary_id,
+        url=url,
+        url_key=summary_key(url, engine),
+        engine=engine,
+        resummarize=resummarize,
+        using_db=using_db,
+    )
+
+
+async def enqueue_many(
+    summaries: list[tuple[int, str]],
+    engine: str,
+    using_db: Optional[BaseDBAsyncClient] = None,
+    resummarize: bool = False,
+) -> None:
+    await SummaryJob.bulk_create(
+        [
+            SummaryJob(
+                summary_id=summary_id,
+                url=url,
+                url_key=summary_key(url, engine),
+                engine=engine,
+                resummarize=resummarize,
+            )
+            for summary_id, url in summaries
+        ],
+        using_db=using_db,
+    )
+
+
+async def claim(limit: int) -> list[SummaryJob]:
+    async with in_transaction("default") as connection:
+        jobs = (
+            await SummaryJob.filter(status=JobStatus.QUEUED, run_at__lte=timezone.now())
+            .order_by("run_at", "id")
+            .limit(limit)
+            .select_for_update(skip_locked=True)
+            .using_db(connection)
+        )
+        if not jobs:
+            return []
+
+        now = timezone.now()
+        await SummaryJob.filter(id__in=[job.id for job in jobs]).using_db(
+            connection
+        ).update(status=JobStatus.RUNNING, locked_at=now, attempts=F("attempts") + 1)
+
+    for job in jobs:
+        job.status = JobStatus.RUNNING
+        job.locked_at = now
+        job.attempts += 1
+    return jobs
+
+
+async def complete(job: SummaryJob) -> None:
+    await SummaryJob.filter(id=job.id, status=JobStatus.RUNNING).update(
+        status=JobStatus.DONE, last_error=None
+    )
+
+
+async def cancel(summary_id: int, using_db: Optional[BaseDBAsyncClient] = None) -> int:
+    """Settle ``summary_id``'s outstanding jobs, its summary having been written.
+
+    A job already running is left to finish, but its result is dropped.
+    """
+    return (
+        await SummaryJob.filter(
+            summary_id=summary_id, status__in=[JobStatus.QUEUED, JobStatus.RUNNING]
+        )
+        .using_db(using_db)
+        .update(status=JobStatus.DONE, last_error=None)
+    )
+
+
+async def complete_pending(url_key: str, summary: str) -> list[int]:
+    async with in_transaction("default") as connection:
+        pending = (
+            await SummaryJob.filter(url_key=url_key, status=JobStatus.QUEUED)
+            .select_for_update(skip_locked=True)
+            .using_db(connection)
+        )
+        if not pending:
+            return []
+
+        summary_ids = [job.summary_id for job in pending]
+        await SummaryJob.filter(id__in=[job.id for job in pending]).using_db(
+            connection
+        ).update(status=JobStatus.DONE, last_error=None)
+        now = timezone.now()
+        await TextSummary.filter(id__in=summary_ids).using_db(connection).update(
+            summary=summary,
+            status=SummaryStatus.DONE,
+            error=None,
+            finished_at=now,
+            updated_at=now,
+        )
+    return summary_ids
+
+
+async def defer(job: SummaryJob, delay: float) -> None:
+    await SummaryJob.filter(id=job.id, status=JobStatus.RUNNING).update(
+        status=JobStatus.QUEUED,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        attempts=F("attempts") - 1,
+    )
+
+
+async def fail(job: SummaryJob, error: str, settings: Settings) -> None:
+    running = SummaryJob.filter(id=job.id, status=JobStatus.RUNNING)
+    if job.attempts >= settings.worker_max_attempts:
+        log.error("Job %s failed permanently after %s attempts", job.id, job.attempts)
+        if not await running.update(status=JobStatus.FAILED, last_error=error):
+            return
+        now = timezone.now()
+        await TextSummary.filter(id=job.summary_id).update(
+            status=SummaryStatus.FAILED, error=error, finished_at=now, updated_at=now
+        )
+        await notify.publish([job.summary_id])
+        return
+
+    delay = min(
+        settings.worker_retry_backoff * 2 ** (job.attempts - 1),
+        settings.worker_retry_backoff_max,
+    )
+    log.warning("Job %s failed, retrying in %ss", job.id, delay)
+    if not await running.update(
+        status=JobStatus.QUEUED,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        last_error=error,
+    ):
+        return
+    await TextSummary.filter(id=job.summary_id).update(
+        status=SummaryStatus.PENDING, error=error, updated_at=timezone.now()
+    )
+
+
+async def requeue_stale(settings: Settings) -> int:
+    # A job is only abandoned once its worker has had time to time it out
+    # and record that; before then it may still be running.
+    cutoff = timezone.now() - timedelta(
+        seconds=settings.worker_job_timeout + settings.worker_job_grace
+    )
+    return await SummaryJob.filter(
+        status=JobStatus.RUNNING, locked_at__lt=cutoff
+    ).update(status=JobStatus.QUEUED)
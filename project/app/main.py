@@ -2,18 +2,28 @@ import logging
 
 from fastapi import FastAPI
 
-from app.api import ping, summaries
+from app.api import internal, metrics, ping, summaries
+from app.compression import CompressionMiddleware
 from app.db import init_db
+from app.metrics import MetricsMiddleware
+from app.notify import get_notifier
+from app.replica import ReadRoutingMiddleware
+from app.startup import log_startup
 
 log = logging.getLogger("uvicorn")
 
 
 def create_application() -> FastAPI:
     application = FastAPI()
+    application.add_middleware(CompressionMiddleware)
+    application.add_middleware(ReadRoutingMiddleware)
+    application.add_middleware(MetricsMiddleware)
     application.include_router(ping.router)
+    application.include_router(metrics.router)
     application.include_router(
         summaries.router, prefix="/summaries", tags=["summaries"]
     )
+    application.include_router(internal.router, prefix="/internal", tags=["internal"])
 
     return application
 
@@ -25,8 +35,10 @@ app = create_application()
 async def startup_event():
     log.info("Starting up...")
     init_db(app)
+    log_startup("Web worker")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     log.info("Shutting down...")
+    await get_notifier().stop()
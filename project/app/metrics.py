@@ -0,0 +1,132 @@
+"""Prometheus metrics shared by the web app and the summarizer worker.
+
+With ``PROMETHEUS_MULTIPROC_DIR`` set, every process writes its samples there
+and a scrape of any one process aggregates them all, so gunicorn workers
+report as one app.
+"""
+
+import functools
+import os
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from prometheus_client import (  # isort:skip
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+T = TypeVar("T")
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time to respond to an HTTP request, by route template",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "Time spent in each CRUD function",
+    ["function"],
+)
+SUMMARY_STAGE_SECONDS = Histogram(
+    "summary_stage_duration_seconds",
+    "Time each summary spends in each stage",
+    ["stage"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+SUMMARY_JOBS_IN_FLIGHT = Gauge(
+    "summary_jobs_in_flight",
+    "Summary jobs a worker is running",
+    multiprocess_mode="livesum",
+)
+SUMMARY_REQUESTS_REJECTED = Counter(
+    "summary_requests_rejected",
+    "Requests to create summaries that were refused",
+    ["reason"],
+)
+SUMMARY_JOB_QUEUE_DEPTH = Gauge(
+    "summary_job_queue_depth",
+    "Summary jobs by status, as of the last scrape",
+    ["status"],
+    multiprocess_mode="mostrecent",
+)
+
+
+def collector_registry() -> CollectorRegistry:
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render() -> bytes:
+    return generate_latest(collector_registry())
+
+
+def timed_query(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Record the duration of a CRUD coroutine under its function name."""
+    histogram = DB_QUERY_SECONDS.labels(func.__name__)
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+def route_template(scope: Scope) -> str:
+    # Label by template, not path, to keep one series per route.
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            HTTP_REQUEST_SECONDS.labels(method, route_template(scope), status).observe(
+                time.perf_counter() - started
+            )
@@ -1,13 +1,32 @@
-from pydantic import AnyHttpUrl, BaseModel
+from typing import Optional
+
+from pydantic import AnyHttpUrl, BaseModel, conlist
+
+from app.models.tortoise import EngineName
+
+MAX_BATCH_SIZE = 1000
 
 
 class SummaryPayloadSchema(BaseModel):
     url: AnyHttpUrl
 
 
+class SummaryCreatePayloadSchema(SummaryPayloadSchema):
+    engine: Optional[EngineName] = None
+
+
 class SummaryResponseSchema(SummaryPayloadSchema):
     id: int
 
 
 class SummaryUpdatePayloadSchema(SummaryPayloadSchema):
     summary: str
+
+
+class SummaryResummarizePayloadSchema(BaseModel):
+    engine: Optional[EngineName] = None
+
+
+class SummaryBatchPayloadSchema(BaseModel):
+    urls: conlist(AnyHttpUrl, min_items=1, max_items=MAX_BATCH_SIZE)
+    engine: Optional[EngineName] = None
@@ -1,14 +1,122 @@
+from enum import Enum
+
 from tortoise import fields, models
 from tortoise.contrib.pydantic import pydantic_model_creator
 
 
+class SummaryStatus(str, Enum):
+    PENDING = "pending"
+    DOWNLOADING = "downloading"
+    PARSING = "parsing"
+    SUMMARIZING = "summarizing"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class EngineName(str, Enum):
+    TEXTRANK = "textrank"
+    NEWSPAPER = "newspaper"
+
+
 class TextSummary(models.Model):
     url = fields.TextField()
+    url_hash = fields.CharField(max_length=64, null=True, index=True)
     summary = fields.TextField()
+    status = fields.CharEnumField(
+        SummaryStatus, max_length=16, default=SummaryStatus.PENDING, index=True
+    )
+    engine = fields.CharEnumField(
+        EngineName, max_length=16, default=EngineName.TEXTRANK
+    )
+    error = fields.TextField(null=True)
+    started_at = fields.DatetimeField(null=True)
+    finished_at = fields.DatetimeField(null=True)
+    downloading_seconds = fields.FloatField(null=True)
+    parsing_seconds = fields.FloatField(null=True)
+    summarizing_seconds = fields.FloatField(null=True)
+    created_at = fields.DatetimeField(auto_now_add=True, index=True)
+    updated_at = fields.DatetimeField(auto_now=True)
+
+    def __str__(self):
+        return self.url
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class SummaryJob(models.Model):
+    summary = fields.ForeignKeyField(
+        "models.TextSummary", related_name="jobs", on_delete=fields.CASCADE
+    )
+    url = fields.TextField()
+    url_key = fields.CharField(max_length=64, index=True)
+    engine = fields.CharEnumField(
+        EngineName, max_length=16, default=EngineName.TEXTRANK
+    )
+    status = fields.CharEnumField(JobStatus, default=JobStatus.QUEUED)
+    resummarize = fields.BooleanField(default=False)
+    attempts = fields.IntField(default=0)
+    run_at = fields.DatetimeField(auto_now_add=True)
+    locked_at = fields.DatetimeField(null=True)
+    last_error = fields.TextField(null=True)
     created_at = fields.DatetimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = (("status", "run_at"),)
+
+    def __str__(self):
+        return f"{self.summary_id}: {self.url}"
+
+
+class CachedSummary(models.Model):
+    key = fields.CharField(max_length=64, pk=True)
+    url = fields.TextField()
+    summary = fields.TextField()
+    etag = fields.TextField(null=True)
+    last_modified = fields.TextField(null=True)
+    created_at = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        table = "summarycache"
+
     def __str__(self):
         return self.url
 
 
-SummarySchema = pydantic_model_creator(TextSummary)
+class ArticleText(models.Model):
+    """Compressed article text, kept to re-summarize without re-fetching.
+
+    Shared by every summary of the same url, through ``url_hash``.
+    """
+
+    url_hash = fields.CharField(max_length=64, pk=True)
+    url = fields.TextField()
+    title = fields.TextField()
+    text = fields.BinaryField()
+    html = fields.BinaryField(null=True)
+    created_at = fields.DatetimeField(auto_now=True)
+
+    def __str__(self):
+        return self.url
+
+
+class RateLimitBucket(models.Model):
+    """A client's token bucket for creating summaries, shared by every process."""
+
+    key = fields.CharField(max_length=64, pk=True)
+    tokens = fields.FloatField()
+    # Unix time, so the refill arithmetic is the same in every dialect.
+    updated_at = fields.FloatField()
+
+    def __str__(self):
+        return self.key
+
+
+SummarySchema = pydantic_model_creator(TextSummary, exclude=("url_hash",))
+SummaryFieldsSchema = pydantic_model_creator(
+    TextSummary, name="SummaryFields", optional=tuple(SummarySchema.__fields__)
+)
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from tortoise import Tortoise
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+log = logging.getLogger("uvicorn")
+
+CHANNEL = "summary_ready"
+NOTIFY_BATCH_SIZE = 500
+
+
+class SummaryNotifier:
+    """Fans summary-ready notifications out to in-process subscribers.
+
+    On Postgres a single pooled connection per process LISTENs on
+    ``CHANNEL``, so writers in any process (API or worker) reach every
+    subscriber. Other backends only dispatch within the writing process.
+    """
+
+    def __init__(self) -> None:
+        self._waiters: dict[int, set[asyncio.Event]] = {}
+        self._client: Optional[BaseDBAsyncClient] = None
+        self._connection: Any = None
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    @contextmanager
+    def subscribe(self, summary_id: int) -> Iterator[asyncio.Event]:
+        event = asyncio.Event()
+        self._waiters.setdefault(summary_id, set()).add(event)
+        try:
+            yield event
+        finally:
+            waiters = self._waiters[summary_id]
+            waiters.discard(event)
+            if not waiters:
+                del self._waiters[summary_id]
+
+    def dispatch(self, summary_id: int) -> None:
+        for event in self._waiters.get(summary_id, ()):
+            event.set()
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        for summary_id in payload.split(","):
+            self.dispatch(int(summary_id))
+
+    async def start(self, connection_name: str = "default") -> None:
+        """Start listening; called lazily by the first subscriber."""
+        async with self._lock:
+            client = Tortoise.get_connection(connection_name)
+            if (
+                self._connection is not None
+                or client.capabilities.dialect != "postgres"
+            ):
+                return
+
+            connection = await client._pool.acquire()
+            await connection.add_listener(CHANNEL, self._on_notification)
+            self._client, self._connection = client, connection
+            log.info("Listening for summary notifications on %s", CHANNEL)
+
+    async def stop(self) -> None:
+        if self._connection is None:
+            return
+
+        try:
+            await self._connection.remove_listener(CHANNEL, self._on_notification)
+        finally:
+            await self._client._pool.release(self._connection)
+            self._client = self._connection = None
+
+
+_notifier: Optional[SummaryNotifier] = None
+
+
+def get_notifier() -> SummaryNotifier:
+    global _notifier
+    if _notifier is None:
+        _notifier = SummaryNotifier()
+    return _notifier
+
+
+async def publish(summary_ids: list[int]) -> None:
+    """Announce that ``summary_ids`` have their summary written."""
+    connection = Tortoise.get_connection("default")
+    if connection.capabilities.dialect == "postgres":
+        # NOTIFY payloads are capped at 8000 bytes.
+        for start in range(0, len(summary_ids), NOTIFY_BATCH_SIZE):
+            batch = summary_ids[start : start + NOTIFY_BATCH_SIZE]  # noqa: E203
+            await connection.execute_query(
+                "SELECT pg_notify($1, $2)",
+                [CHANNEL, ",".join(str(summary_id) for summary_id in batch)],
+            )
+        return
+
+    notifier = get_notifier()
+    for summary_id in summary_ids:
+        notifier.dispatch(summary_id)
@@ -0,0 +1,73 @@
+import time
+from contextvars import ContextVar
+from http.cookies import SimpleCookie
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from tortoise import connections
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+from app.config import get_settings
+
+READ_CONSISTENCY_HEADER = "x-read-consistency"
+STICKY_COOKIE = "read_primary_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+use_primary: ContextVar[bool] = ContextVar("use_primary", default=True)
+
+
+def read_connection() -> BaseDBAsyncClient:
+    if get_settings().database_read_url and not use_primary.get():
+        return connections.get("replica")
+    return connections.get("default")
+
+
+def _sticky_until(headers: Headers) -> float:
+    cookie = SimpleCookie(headers.get("cookie", ""))
+    try:
+        return float(cookie[STICKY_COOKIE].value)
+    except (KeyError, ValueError):
+        return 0.0
+
+
+class ReadRoutingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if scope["method"] not in SAFE_METHODS:
+            token = use_primary.set(True)
+            try:
+                await self.app(scope, receive, self._stick_to_primary(send))
+            finally:
+                use_primary.reset(token)
+            return
+
+        primary = (
+            headers.get(READ_CONSISTENCY_HEADER, "").lower() == "primary"
+            or _sticky_until(headers) > time.time()
+        )
+        token = use_primary.set(primary)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            use_primary.reset(token)
+
+    def _stick_to_primary(self, send: Send) -> Send:
+        window = get_settings().read_after_write_window
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{STICKY_COOKIE}={time.time() + window:.3f}; "
+                    f"Max-Age={int(window)}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        return send_wrapper
@@ -0,0 +1,77 @@
+"""Data files the summarizer engines need, fetched at build time.
+
+python -m app.resources            # download any missing NLTK packages
+python -m app.resources --check    # exit non-zero if any are missing
+"""
+
+import argparse
+import logging
+import os
+import sys
+from typing import Optional
+
+from app import summarizer
+
+log = logging.getLogger("uvicorn")
+
+
+class ResourcesMissing(RuntimeError):
+    pass
+
+
+def raise_for_missing(missing: list[str]) -> None:
+    """Fail fast, rather than on the first summary, if anything is missing."""
+    if missing:
+        raise ResourcesMissing(
+            "Summarizer resources are missing, run `python -m app.resources`:\n"
+            + "\n".join(missing)
+        )
+
+
+def check_resources() -> None:
+    raise_for_missing(summarizer.load_engines())
+
+
+def prefetch(download_dir: Optional[str] = None) -> None:
+    import nltk
+
+    packages = sorted(
+        {
+            package
+            for engine in summarizer.ENGINES.values()
+            for package in engine.nltk_packages
+        }
+    )
+    for package in packages:
+        log.info("Downloading NLTK package %s...", package)
+        nltk.download(
+            package, download_dir=download_dir, quiet=True, raise_on_error=True
+        )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.resources")
+    parser.add_argument(
+        "--check", action="store_true", help="only check that resources load"
+    )
+    parser.add_argument(
+        "--download-dir",
+        default=os.environ.get("NLTK_DATA"),
+        help="where to store NLTK packages (default: $NLTK_DATA)",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.check:
+        prefetch(args.download_dir)
+    try:
+        check_resources()
+    except ResourcesMissing as exc:
+        log.error("%s", exc)
+        return 1
+    log.info("Summarizer resources are ready")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
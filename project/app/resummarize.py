@@ -0,0 +1,106 @@
+"""Queue every summary with stored article text to be summarized again.
+
+    python -m app.resummarize [--engine textrank] [--status done ...]
+
+Only stored text is used, so the jobs never fetch an article.
+"""
+
+import argparse
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Optional
+
+from tortoise import Tortoise, timezone
+from tortoise.expressions import Subquery
+from tortoise.transactions import in_transaction
+
+from app import jobs
+from app.config import get_settings
+from app.db import get_tortoise_config
+
+from app.models.tortoise import (  # isort:skip
+    ArticleText,
+    EngineName,
+    SummaryStatus,
+    TextSummary,
+)
+
+log = logging.getLogger("uvicorn")
+
+
+async def resummarize_all(
+    engine: Optional[EngineName] = None,
+    status: Optional[list[SummaryStatus]] = None,
+    batch_size: int = 1000,
+) -> int:
+    """Queue re-summarize jobs in batches; returns the number of summaries queued.
+
+    Without ``engine`` each summary keeps the engine it was last summarized with.
+    """
+    query = TextSummary.filter(
+        url_hash__in=Subquery(ArticleText.all().values("url_hash"))
+    )
+    if status:
+        query = query.filter(status__in=status)
+
+    queued = 0
+    after = 0
+    while True:
+        summaries = (
+            await query.filter(id__gt=after)
+            .order_by("id")
+            .limit(batch_size)
+            .values("id", "url", "engine")
+        )
+        if not summaries:
+            return queued
+
+        by_engine = defaultdict(list)
+        for summary in summaries:
+            by_engine[EngineName(engine or summary["engine"]).value].append(
+                (summary["id"], summary["url"])
+            )
+
+        async with in_transaction("default") as connection:
+            for name, batch in by_engine.items():
+                await TextSummary.filter(id__in=[id for id, _ in batch]).using_db(
+                    connection
+                ).update(
+                    status=SummaryStatus.PENDING,
+                    engine=name,
+                    error=None,
+                    finished_at=None,
+                    updated_at=timezone.now(),
+                )
+                await jobs.enqueue_many(
+                    batch, name, using_db=connection, resummarize=True
+                )
+
+        queued += len(summaries)
+        after = summaries[-1]["id"]
+        log.info("Queued %s summaries to be re-summarized", queued)
+
+
+async def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.resummarize")
+    parser.add_argument("--engine", type=EngineName)
+    parser.add_argument(
+        "--status",
+        type=SummaryStatus,
+        action="append",
+        help="only re-summarize summaries with this status (repeatable)",
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    await Tortoise.init(config=get_tortoise_config(get_settings()))
+    try:
+        await resummarize_all(args.engine, args.status, args.batch_size)
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""What each subsystem costs a process at startup.
+
+    python -m app.startup    # import time and RSS per subsystem, in a fresh process
+
+Processes also log which subsystems they loaded, and their RSS, once started.
+"""
+
+import importlib
+import logging
+import os
+import resource
+import sys
+import time
+from typing import NamedTuple
+
+log = logging.getLogger("uvicorn")
+
+# In the order a process imports them, so each cost excludes the ones before.
+SUBSYSTEMS: dict[str, tuple[str, ...]] = {
+    "framework": ("fastapi", "pydantic"),
+    "orm": ("tortoise", "asyncpg"),
+    "api": ("app.main",),
+    "fetcher": ("httpx", "app.fetcher"),
+    "worker": ("app.worker",),
+    "summarizer": ("numpy", "nltk", "newspaper", "app.textrank"),
+}
+
+
+class ImportCost(NamedTuple):
+    subsystem: str
+    seconds: float
+    rss: int
+
+
+def rss() -> int:
+    """Resident set size of this process, in bytes."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak rather than current, but the best we have off Linux.
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == "darwin" else usage * 1024
+
+
+def loaded_subsystems() -> list[str]:
+    return [
+        name
+        for name, modules in SUBSYSTEMS.items()
+        if any(module in sys.modules for module in modules)
+    ]
+
+
+def log_startup(process: str) -> None:
+    log.info(
+        "%s started: %.1f MiB RSS, loaded %s",
+        process,
+        rss() / 2**20,
+        ", ".join(loaded_subsystems()),
+    )
+
+
+def measure_imports() -> list[ImportCost]:
+    costs = []
+    for name, modules in SUBSYSTEMS.items():
+        before, started = rss(), time.perf_counter()
+        for module in modules:
+            importlib.import_module(module)
+        costs.append(ImportCost(name, time.perf_counter() - started, rss() - before))
+    return costs
+
+
+if __name__ == "__main__":
+    for cost in measure_imports():
+        print(
+            f"{cost.subsystem:<12} {cost.seconds * 1000:8.1f} ms "
+            f"{cost.rss / 2**20:8.1f} MiB"
+        )
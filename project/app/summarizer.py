@@ -1,21 +1,249 @@
-import nltk
-from newspaper import Article
+import time
+from abc import ABC, abstractmethod
+from functools import cached_property
+from typing import Optional
 
-from .models.tortoise import TextSummary
+from tortoise import timezone
 
+from app import articles, jobs, notify
+from app.cache import get_cache
+from app.coalesce import MicroBatcher, SingleFlight, try_advisory_lock
+from app.config import get_settings
+from app.executor import run_cpu
+from app.fetcher import get_fetcher
+from app.metrics import SUMMARY_STAGE_SECONDS
+from app.urls import summary_key
+
+from .models.tortoise import EngineName, SummaryStatus, TextSummary
+
+_in_flight = SingleFlight()
+
+
+class SummaryInProgress(Exception):
+    pass
+
+
+# newspaper, nltk and numpy are imported where they are used, so only the CPU
+# pool processes that parse and summarize pay for loading them.
+
+
+def parse_html(url: str, html: str) -> tuple[str, str]:
+    from newspaper import Article
 
-async def generate_summary(summary_id: int, url: str) -> None:
     article = Article(url)
-    article.download()
+    article.download(input_html=html)
     article.parse()
 
-    try:
-        nltk.data.find("tokenizers/punkt")
-    except LookupError:
-        nltk.download("punkt")
-    finally:
-        article.nlp()
+    return article.title, article.text
+
+
+class SummaryEngine(ABC):
+    """Turns an article's title and text into an extractive summary.
+
+    Engines run in the CPU process pool, so they are looked up by name there.
+    ``load`` reads any data files an engine needs once per process, so no
+    summary pays for finding them.
+    """
+
+    name: EngineName
+    nltk_packages: tuple[str, ...] = ()
+    _loaded = False
+
+    def load(self) -> None:
+        """Load this engine's resources; raises LookupError if any are missing."""
+        if not self._loaded:
+            self._load()
+            self._loaded = True
+
+    def _load(self) -> None:
+        pass
+
+    @cached_property
+    def max_sentences(self) -> int:
+        from newspaper import Config
+
+        return Config().MAX_SUMMARY_SENT
+
+    @abstractmethod
+    def summarize(self, title: str, text: str) -> str:
+        """Summarize one article."""
+
+    def summarize_many(self, documents: list[tuple[str, str]]) -> list[str]:
+        return [self.summarize(title, text) for title, text in documents]
+
+
+class NewspaperEngine(SummaryEngine):
+    name = EngineName.NEWSPAPER
+    nltk_packages = ("punkt", "punkt_tab")
+
+    def _load(self) -> None:
+        from newspaper import Config, nlp
+
+        # Tokenizing once pulls punkt into nltk's resource cache.
+        nlp.load_stopwords(Config().get_language())
+        nlp.split_sentences("Warm up the sentence tokenizer.")
+
+    def summarize(self, title: str, text: str) -> str:
+        from newspaper import nlp
+
+        # Mirrors Article.nlp(), minus the keyword extraction we never store.
+        sentences = nlp.summarize(title=title, text=text, max_sents=self.max_sentences)
+        return "\n".join(sentences)
+
+
+class TextRankEngine(SummaryEngine):
+    name = EngineName.TEXTRANK
+
+    def _load(self) -> None:
+        from app import textrank
+
+        textrank.stopwords()
+
+    def summarize(self, title: str, text: str) -> str:
+        from app import textrank
+
+        return textrank.summarize(title, text, self.max_sentences)
+
+    def summarize_many(self, documents: list[tuple[str, str]]) -> list[str]:
+        from app import textrank
+
+        return textrank.summarize_many(documents, self.max_sentences)
+
+
+ENGINES: dict[str, SummaryEngine] = {
+    engine.name.value: engine for engine in (TextRankEngine(), NewspaperEngine())
+}
+
+
+def load_engines() -> list[str]:
+    """Load every engine's resources, returning those that are missing.
+
+    Runs as the CPU pool's process initializer, so the worker's main process
+    never loads the summarizer libraries itself.
+    """
+    missing = []
+    for name, engine in ENGINES.items():
+        try:
+            engine.load()
+        except (LookupError, OSError) as exc:
+            missing.append(f"{name}: {exc}")
+    return missing
+
+
+def summarize_texts(engine: str, documents: list[tuple[str, str]]) -> list[str]:
+    summarizer = ENGINES[engine]
+    summarizer.load()
+    return summarizer.summarize_many(documents)
+
+
+async def summarize_batch(engine: str, documents: list[tuple[str, str]]) -> list[str]:
+    return await run_cpu(summarize_texts, engine, documents)
+
+
+_batcher: Optional[MicroBatcher] = None
+
+
+def get_batcher() -> MicroBatcher:
+    """Batch concurrent summaries per engine into one CPU-pool call."""
+    global _batcher
+
+    if _batcher is None:
+        settings = get_settings()
+        _batcher = MicroBatcher(
+            summarize_batch,
+            settings.summarizer_batch_size,
+            settings.summarizer_batch_wait,
+        )
+    return _batcher
+
+
+class SummaryProgress:
+    """Writes status transitions and per-stage durations for one summary."""
+
+    def __init__(self, summary_id: int) -> None:
+        self.summary_id = summary_id
+        self.stage: Optional[SummaryStatus] = None
+        self._entered = 0.0
+
+    async def enter(self, stage: SummaryStatus, **values) -> None:
+        now = timezone.now()
+        entered, self._entered = self._entered, time.perf_counter()
+        if self.stage is None:
+            values["started_at"] = now
+        else:
+            seconds = self._entered - entered
+            values[f"{self.stage.value}_seconds"] = seconds
+            SUMMARY_STAGE_SECONDS.labels(self.stage.value).observe(seconds)
+        if stage in (SummaryStatus.DONE, SummaryStatus.FAILED):
+            values["finished_at"] = now
+
+        self.stage = stage
+        # A summary written by hand meanwhile is final; this job's is dropped.
+        await TextSummary.filter(id=self.summary_id).exclude(
+            status=SummaryStatus.DONE
+        ).update(status=stage, updated_at=now, **values)
+
+
+async def summarize_url(
+    url: str, engine: str, key: str, progress: SummaryProgress
+) -> str:
+    cache = get_cache()
+    summary = await cache.get(url, engine)
+    if summary is not None:
+        return summary
+
+    async with try_advisory_lock(key) as locked:
+        if not locked:
+            raise SummaryInProgress(url)
+
+        summary = await cache.get(url, engine)
+        if summary is None:
+            stale = await cache.get_stale(url, engine)
+            await progress.enter(SummaryStatus.DOWNLOADING)
+            page = await get_fetcher().fetch(
+                url, stale and stale.etag, stale and stale.last_modified
+            )
+            if page.not_modified and stale is not None:
+                summary = stale.summary
+            else:
+                await progress.enter(SummaryStatus.PARSING)
+                title, text = await run_cpu(parse_html, url, page.html)
+                await articles.store(url, title, text, page.html)
+                await progress.enter(SummaryStatus.SUMMARIZING)
+                summary = await get_batcher().submit(engine, (title, text))
+            await cache.set(url, engine, summary, page.etag, page.last_modified)
+
+    return summary
+
+
+async def resummarize_url(
+    url: str, engine: str, key: str, progress: SummaryProgress
+) -> str:
+    """Summarize the stored text of ``url`` again, without fetching it."""
+    await progress.enter(SummaryStatus.PARSING)
+    title, text = await articles.load(url)
+    await progress.enter(SummaryStatus.SUMMARIZING)
+    summary = await get_batcher().submit(engine, (title, text))
+
+    cache = get_cache()
+    stale = await cache.get_stale(url, engine)
+    await cache.set(
+        url, engine, summary, stale and stale.etag, stale and stale.last_modified
+    )
+    return summary
+
 
-    summary = article.summary
+async def generate_summary(
+    summary_id: int, url: str, engine: str, resummarize: bool = False
+) -> None:
+    key = summary_key(url, engine)
+    progress = SummaryProgress(summary_id)
+    summarize = resummarize_url if resummarize else summarize_url
+    summary = await _in_flight.do(key, summarize, url, engine, key, progress)
 
-    await TextSummary.filter(id=summary_id).update(summary=summary)
+    with SUMMARY_STAGE_SECONDS.labels("writing").time():
+        await progress.enter(
+            SummaryStatus.DONE, summary=summary, engine=engine, error=None
+        )
+        pending_ids = await jobs.complete_pending(key, summary)
+        await notify.publish([summary_id, *pending_ids])
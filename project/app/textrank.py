@@ -0,0 +1,222 @@
+import re
+from functools import lru_cache
+from typing import Iterator
+
+import numpy as np
+from newspaper import settings as newspaper_settings
+
+PARAGRAPH = re.compile(r"\n+")
+SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])")
+WORD = re.compile(r"[a-z0-9][a-z0-9'-]*[a-z0-9]|[a-z]")
+
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-6
+# Longer articles are summarized from their opening sentences alone, since
+# ranking costs grow with the square of the sentence count.
+MAX_RANKED_SENTENCES = 500
+# The most cells a batch's padded similarity tensor may have; documents are
+# grouped by length and ranked in as many batches as that takes.
+BATCH_CELLS = 2**22
+
+
+@lru_cache()
+def stopwords() -> frozenset[str]:
+    with open(newspaper_settings.NLP_STOPWORDS_EN, encoding="utf-8") as f:
+        return frozenset(line.strip() for line in f if line.strip())
+
+
+def split_sentences(text: str) -> list[str]:
+    sentences = []
+    for paragraph in PARAGRAPH.split(text):
+        sentences.extend(
+            sentence.strip()
+            for sentence in SENTENCE_END.split(paragraph)
+            if sentence.strip()
+        )
+    return sentences
+
+
+def tokenize(sentence: str) -> list[str]:
+    ignored = stopwords()
+    return [word for word in WORD.findall(sentence.lower()) if word not in ignored]
+
+
+def term_matrix(
+    documents: list[list[str]],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Count terms per sentence for a batch of documents, as one sparse matrix.
+
+    Returns parallel COO arrays of ``document``, ``row`` (the sentence within
+    its document), ``term`` (within that document's vocabulary) and ``count``.
+    """
+    document_ids, row_ids, term_ids = [], [], []
+    for document, sentences in enumerate(documents):
+        vocabulary: dict[str, int] = {}
+        for row, sentence in enumerate(sentences):
+            words = tokenize(sentence)
+            term_ids.extend(
+                vocabulary.setdefault(word, len(vocabulary)) for word in words
+            )
+            row_ids.extend([row] * len(words))
+            document_ids.extend([document] * len(words))
+
+    shape = (len(documents), max(map(len, documents)), max(term_ids, default=0) + 1)
+    index, counts = np.unique(
+        np.ravel_multi_index(
+            np.array([document_ids, row_ids, term_ids], dtype=np.intp), shape
+        ),
+        return_counts=True,
+    )
+    return (*np.unravel_index(index, shape), counts)
+
+
+def tfidf(
+    document: np.ndarray,
+    row: np.ndarray,
+    term: np.ndarray,
+    count: np.ndarray,
+    rows: np.ndarray,
+) -> np.ndarray:
+    """Weight sparse term counts by per-document smoothed IDF.
+
+    ``rows`` holds the number of sentences in each document. Returns the
+    weight of every entry, with each sentence L2-normalized.
+    """
+    group = document * (term.max(initial=0) + 1) + term
+    documents = np.bincount(group)[group]
+    weights = count * (np.log((1 + rows[document]) / (1 + documents)) + 1)
+
+    sentence = document * rows.max() + row
+    return weights / np.sqrt(np.bincount(sentence, weights=weights**2)[sentence])
+
+
+def similarity(
+    document: np.ndarray,
+    row: np.ndarray,
+    term: np.ndarray,
+    weights: np.ndarray,
+    shape: tuple[int, int],
+) -> np.ndarray:
+    """Cosine similarity between every pair of sentences within each document.
+
+    Multiplies the sparse matrix by its transpose one term at a time: every
+    pair of sentences sharing a term adds the product of their weights.
+    Returns a dense (documents x sentences x sentences) tensor.
+    """
+    documents, sentences = shape
+    group = document * (term.max(initial=0) + 1) + term
+    order = np.argsort(group, kind="stable")
+    group, row, weights = group[order], row[order], weights[order]
+    document = document[order]
+
+    starts = np.flatnonzero(np.diff(group, prepend=-1))
+    sizes = np.diff(starts, append=len(group))
+    pairs = np.repeat(sizes, sizes)
+    left = np.repeat(np.arange(len(group)), pairs)
+    offsets = np.arange(pairs.sum()) - np.repeat(np.cumsum(pairs) - pairs, pairs)
+    right = np.repeat(np.repeat(starts, sizes), pairs) + offsets
+
+    index = (document[left] * sentences + row[left]) * sentences + row[right]
+    products = np.bincount(
+        index,
+        weights=weights[left] * weights[right],
+        minlength=documents * sentences * sentences,
+    )
+    return products.reshape(documents, sentences, sentences)
+
+
+def textrank(similarity: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    """PageRank over each document's sentence graph, by batched power iteration.
+
+    ``similarity`` is (documents x sentences x sentences), zero-padded past
+    each document's ``sizes``.
+    """
+    mask = np.arange(similarity.shape[1]) < sizes[:, None]
+    uniform = mask / sizes[:, None]
+    similarity = similarity * ~np.eye(similarity.shape[1], dtype=bool)
+    degree = similarity.sum(axis=2, keepdims=True)
+    transition = np.where(
+        degree > 0,
+        similarity / np.where(degree > 0, degree, 1),
+        uniform[:, None, :],
+    )
+    transition = transition.transpose(0, 2, 1) * mask[:, :, None]
+
+    # Documents stop updating once they converge, exactly as if ranked alone.
+    scores = uniform
+    active = np.ones((len(sizes), 1), dtype=bool)
+    for _ in range(MAX_ITERATIONS):
+        ranked = (transition @ scores[..., None])[..., 0]
+        updated = (1 - DAMPING) * uniform + DAMPING * ranked
+        converged = np.abs(updated - scores).sum(axis=1, keepdims=True) < TOLERANCE
+        scores = np.where(active, updated, scores)
+        active &= ~converged
+        if not active.any():
+            break
+    return scores
+
+
+def buckets(sizes: list[int]) -> Iterator[list[int]]:
+    """Group document indices by size, ``BATCH_CELLS`` of padded tensor apiece.
+
+    Sorting by size keeps each batch's padding down to its longest document.
+    """
+    bucket: list[int] = []
+    for index in sorted(range(len(sizes)), key=sizes.__getitem__):
+        if bucket and (len(bucket) + 1) * sizes[index] ** 2 > BATCH_CELLS:
+            yield bucket
+            bucket = []
+        bucket.append(index)
+    if bucket:
+        yield bucket
+
+
+def rank(batch: list[list[str]], max_sentences: int) -> np.ndarray:
+    """The best ``max_sentences`` sentences of each document, in their order.
+
+    Each document's last row is its title, which is never chosen.
+    """
+    rows = np.array([len(rows) for rows in batch])
+    document, row, term, count = term_matrix(batch)
+    weights = tfidf(document, row, term, count, rows)
+    similarities = similarity(document, row, term, weights, (len(batch), rows.max()))
+
+    sizes = rows - 1
+    titles = similarities[np.arange(len(batch)), :, sizes]
+    mask = np.arange(rows.max()) < sizes[:, None]
+    similarities *= mask[:, :, None] & mask[:, None, :]
+    scores = textrank(similarities, sizes)
+    scores *= 1 + titles
+    scores[~mask] = -np.inf
+
+    return np.sort(np.argsort(-scores, axis=1, kind="stable")[:, :max_sentences])
+
+
+def summarize_many(documents: list[tuple[str, str]], max_sentences: int) -> list[str]:
+    """Summarize a batch of ``(title, text)`` documents in vectorized passes."""
+    sentences = [split_sentences(text) for _, text in documents]
+    summaries = ["\n".join(document) for document in sentences]
+    ranked = [
+        index
+        for index, document in enumerate(sentences)
+        if len(document) > max_sentences
+    ]
+
+    # Each title is vectorized as its document's last row to favour on-topic
+    # sentences.
+    batch = [
+        [*sentences[index][:MAX_RANKED_SENTENCES], documents[index][0]]
+        for index in ranked
+    ]
+    for bucket in buckets([len(rows) for rows in batch]):
+        best = rank([batch[index] for index in bucket], max_sentences)
+        for index, chosen in zip(bucket, best):
+            summaries[ranked[index]] = "\n".join(
+                batch[index][sentence] for sentence in chosen
+            )
+    return summaries
+
+
+def summarize(title: str, text: str, max_sentences: int) -> str:
+    return summarize_many([(title, text)], max_sentences)[0]
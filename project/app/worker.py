@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import signal
+import time
+
+from prometheus_client import start_http_server
+from tortoise import Tortoise
+
+from app import jobs
+from app.admission import PRUNE_INTERVAL, prune_buckets
+from app.config import Settings, get_settings
+from app.db import get_tortoise_config
+from app.executor import init_executor, run_cpu, shutdown_executor
+from app.fetcher import close_fetcher
+from app.metrics import SUMMARY_JOBS_IN_FLIGHT, collector_registry
+from app.models.tortoise import SummaryJob
+from app.resources import ResourcesMissing, raise_for_missing
+from app.startup import log_startup
+from app.summarizer import SummaryInProgress, generate_summary, load_engines
+
+log = logging.getLogger("uvicorn")
+
+
+async def run_job(job: SummaryJob, settings: Settings) -> None:
+    if job.attempts > settings.worker_max_attempts:
+        await jobs.fail(job, job.last_error or "Job timed out", settings)
+        return
+
+    try:
+        with SUMMARY_JOBS_IN_FLIGHT.track_inprogress():
+            await asyncio.wait_for(
+                generate_summary(
+                    job.summary_id,
+                    job.url,
+                    job.engine.value,
+                    resummarize=job.resummarize,
+                ),
+                settings.worker_job_timeout,
+            )
+    except SummaryInProgress:
+        log.info("Summary for %s is being generated elsewhere, deferring", job.url)
+        await jobs.defer(job, settings.worker_defer_delay)
+    except Exception as exc:
+        log.exception("Job %s for summary %s failed", job.id, job.summary_id)
+        await jobs.fail(job, repr(exc), settings)
+    else:
+        await jobs.complete(job)
+
+
+async def run_worker(settings: Settings, stop: asyncio.Event) -> None:
+    running: set[asyncio.Task] = set()
+    prune_at = 0.0
+
+    while not stop.is_set():
+        await jobs.requeue_stale(settings)
+        if time.monotonic() >= prune_at:
+            await prune_buckets(settings)
+            prune_at = time.monotonic() + PRUNE_INTERVAL
+
+        claimed = []
+        free = settings.worker_concurrency - len(running)
+        if free > 0:
+            claimed = await jobs.claim(free)
+
+        for job in claimed:
+            task = asyncio.create_task(run_job(job, settings))
+            running.add(task)
+            task.add_done_callback(running.discard)
+
+        if claimed and len(running) < settings.worker_concurrency:
+            continue
+
+        stopping = asyncio.create_task(stop.wait())
+        await asyncio.wait(
+            {stopping, *running},
+            timeout=settings.worker_poll_interval,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        stopping.cancel()
+
+    if running:
+        log.info("Waiting for %s running jobs to finish...", len(running))
+        await asyncio.gather(*running, return_exceptions=True)
+
+
+async def main() -> None:
+    settings = get_settings()
+    stop = asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    log.info("Starting summarizer worker...")
+    init_executor(settings, initializer=load_engines)
+    try:
+        raise_for_missing(await run_cpu(load_engines))
+    except ResourcesMissing as exc:
+        log.error("%s", exc)
+        shutdown_executor()
+        raise SystemExit(1)
+
+    await Tortoise.init(config=get_tortoise_config(settings))
+    if settings.worker_metrics_port:
+        start_http_server(settings.worker_metrics_port, registry=collector_registry())
+    log_startup("Summarizer worker")
+    try:
+        await run_worker(settings, stop)
+    finally:
+        log.info("Shutting down summarizer worker...")
+        shutdown_executor()
+        await close_fetcher()
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""Serialize summary lists the way GET /summaries/ does, at growing sizes.
+
+Both with response validation, the default, and with ``FAST_JSON_RESPONSES``.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import serialize_response
+
+from app.api.crud import SUMMARY_FIELDS
+from app.api.responses import RowsJSONResponse
+from app.main import create_application
+from app.models.tortoise import EngineName, SummaryStatus
+
+# Rounds per size, so the largest list still finishes in seconds.
+SIZES = {1_000: 50, 10_000: 10, 100_000: 3}
+
+
+def rows(count: int) -> list[dict]:
+    """Rows shaped like ``crud.get_all()`` returns them."""
+    created = datetime(2022, 10, 1, tzinfo=timezone.utc)
+    summary = "A sentence that was ranked highly. " * 5
+    return [
+        {
+            "id": id,
+            "url": f"https://news.example/{id}",
+            "summary": summary,
+            "status": SummaryStatus.DONE,
+            "engine": EngineName.TEXTRANK,
+            "error": None,
+            "started_at": created + timedelta(seconds=id),
+            "finished_at": created + timedelta(seconds=id + 2),
+            "downloading_seconds": 0.5,
+            "parsing_seconds": 0.25,
+            "summarizing_seconds": 0.125,
+            "created_at": created + timedelta(seconds=id),
+            "updated_at": created + timedelta(seconds=id + 2),
+        }
+        for id in range(1, count + 1)
+    ]
+
+
+@pytest.fixture(scope="module")
+def route():
+    app = create_application()
+    return next(
+        route
+        for route in app.routes
+        if route.path == "/summaries/" and "GET" in route.methods
+    )
+
+
+def test_rows_match_summary_fields():
+    assert tuple(rows(1)[0]) == SUMMARY_FIELDS  # nosec
+
+
+@pytest.mark.parametrize("count", SIZES)
+def test_serialize_summaries(benchmark, route, count):
+    content = rows(count)
+    response_class = route.response_class
+    if isinstance(response_class, DefaultPlaceholder):
+        response_class = response_class.value
+    loop = asyncio.new_event_loop()
+
+    def render() -> bytes:
+        serialized = loop.run_until_complete(
+            serialize_response(
+                field=route.secure_cloned_response_field,
+                response_content=content,
+                exclude_unset=route.response_model_exclude_unset,
+            )
+        )
+        return response_class(serialized).body
+
+    try:
+        body = benchmark.pedantic(render, rounds=SIZES[count], warmup_rounds=1)
+    finally:
+        loop.close()
+    assert body.startswith(b'[{"id":1,')  # nosec
+
+
+@pytest.mark.parametrize("count", SIZES)
+def test_serialize_summaries_fast(benchmark, count):
+    content = rows(count)
+
+    def render() -> bytes:
+        return RowsJSONResponse(content).body
+
+    body = benchmark.pedantic(render, rounds=SIZES[count], warmup_rounds=1)
+    assert body.startswith(b'[{"id":1,')  # nosec
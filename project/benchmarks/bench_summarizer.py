@@ -0,0 +1,38 @@
+"""Parse and summarize a fixed corpus of stored articles, as the worker does."""
+
+from pathlib import Path
+
+import pytest
+
+from app.summarizer import ENGINES, parse_html
+
+FIXTURES = sorted((Path(__file__).parent / "fixtures").glob("*.html"))
+
+
+@pytest.fixture(scope="module")
+def pages() -> list[tuple[str, str]]:
+    return [
+        (f"https://fixtures.example/{path.stem}", path.read_text()) for path in FIXTURES
+    ]
+
+
+@pytest.fixture(scope="module")
+def documents(pages) -> list[tuple[str, str]]:
+    return [parse_html(url, html) for url, html in pages]
+
+
+def test_parse(benchmark, pages):
+    documents = benchmark(lambda: [parse_html(url, html) for url, html in pages])
+    assert all(text for _, text in documents)  # nosec
+
+
+@pytest.mark.parametrize("name", sorted(ENGINES))
+def test_summarize(benchmark, documents, name):
+    engine = ENGINES[name]
+    try:
+        engine.load()
+    except LookupError:
+        pytest.skip(f"{name} resources are missing, run `python -m app.resources`")
+
+    summaries = benchmark(engine.summarize_many, documents)
+    assert all(summaries)  # nosec
@@ -0,0 +1,82 @@
+"""Deterministic articles for benchmarks, so every run summarizes the same text."""
+
+import random
+from html import escape
+from typing import NamedTuple
+
+TOPICS = (
+    "city council",
+    "river flooding",
+    "battery research",
+    "football season",
+    "housing market",
+    "vaccine trial",
+    "railway strike",
+    "space telescope",
+)
+NOUNS = (
+    "officials residents scientists analysts investors workers players fans "
+    "engineers teachers doctors voters"
+).split()
+THINGS = (
+    "budget report plan study network project market forecast results "
+    "proposal schedule contract"
+).split()
+VERBS = (
+    "announced questioned reviewed welcomed delayed criticised approved "
+    "expected discussed published"
+).split()
+ADJECTIVES = "early local national unusual careful recent important final".split()
+TEMPLATES = (
+    "The {noun} {verb} the {thing} for the {topic} on {day}.",
+    "According to the {noun}, the {adjective} {thing} was {verb} after weeks "
+    "of debate about the {topic}.",
+    "Many {noun} said that they had {verb} the {thing}, but it is not clear "
+    "when the {topic} will change.",
+    "It was the {adjective} {thing} that the {noun} {verb}, and they will "
+    "meet again to talk about the {topic}.",
+    "There is still no {adjective} {thing} for the {topic}, which the {noun} "
+    "{verb} again this week.",
+)
+DAYS = "Monday Tuesday Wednesday Thursday Friday".split()
+
+
+class Article(NamedTuple):
+    title: str
+    paragraphs: list[str]
+
+    @property
+    def html(self) -> str:
+        body = "\n".join(f"<p>{escape(paragraph)}</p>" for paragraph in self.paragraphs)
+        return (
+            f"<html><head><title>{escape(self.title)}</title></head><body>"
+            f"<article><h1>{escape(self.title)}</h1>\n{body}\n</article>"
+            "</body></html>"
+        )
+
+
+def sentence(rng: random.Random, topic: str) -> str:
+    return rng.choice(TEMPLATES).format(
+        noun=rng.choice(NOUNS),
+        thing=rng.choice(THINGS),
+        verb=rng.choice(VERBS),
+        adjective=rng.choice(ADJECTIVES),
+        day=rng.choice(DAYS),
+        topic=topic,
+    )
+
+
+def article(index: int, paragraphs: int = 12, sentences: int = 5) -> Article:
+    rng = random.Random(index)  # nosec
+    topic = TOPICS[index % len(TOPICS)]
+    return Article(
+        f"Update {index} on the {topic}",
+        [
+            " ".join(sentence(rng, topic) for _ in range(sentences))
+            for _ in range(paragraphs)
+        ],
+    )
+
+
+def corpus(size: int) -> list[Article]:
+    return [article(index) for index in range(size)]
@@ -0,0 +1,343 @@
+"""Load test the summaries API end to end and write the results as JSON.
+
+    python -m benchmarks.load --database-url postgres://.../web_test
+
+Runs the real app under uvicorn against a local Postgres, and a stub origin
+serving canned articles. Each endpoint gets a fixed number of requests at a
+fixed concurrency, reported as p50/p99 latency and requests per second.
+Then the summarizer worker is started and a batch of articles is summarized
+to measure articles per second. Point it at a throwaway database: the schema
+is created if missing, and everything the run creates is deleted again.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess  # nosec
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Iterator, Optional
+
+import httpx
+from tortoise import Tortoise
+
+from app.config import Settings
+from app.db import get_tortoise_config
+from app.models.pydantic import MAX_BATCH_SIZE
+from benchmarks.origin import serve
+from benchmarks.stats import latency_summary, percentile
+
+PROJECT = Path(__file__).resolve().parents[1]
+RESULTS = PROJECT / "benchmarks" / "results"
+STAGES = ("downloading", "parsing", "summarizing")
+# Pooled connections beyond one per running job: each job's advisory lock
+# holds one, and its writes and the worker's polling need the rest.
+POOL_HEADROOM = 4
+
+Call = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def chunks(items: list, size: int) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]  # noqa: E203
+
+
+async def prepare_database(database_url: str) -> None:
+    await Tortoise.init(config=get_tortoise_config(Settings(database_url=database_url)))
+    try:
+        await Tortoise.generate_schemas(safe=True)
+    finally:
+        await Tortoise.close_connections()
+
+
+@contextmanager
+def run_process(args: list[str], env: dict) -> Iterator[subprocess.Popen]:
+    process = subprocess.Popen(  # nosec
+        [sys.executable, *args], cwd=PROJECT, env={**os.environ, **env}
+    )
+    try:
+        yield process
+    finally:
+        process.terminate()
+        try:
+            process.wait(30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def wait_until_up(client: httpx.AsyncClient, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get("/ping")).status_code == 200:
+                return
+        except httpx.TransportError:
+            if time.monotonic() > deadline:
+                raise
+        await asyncio.sleep(0.1)
+
+
+async def measure(
+    client: httpx.AsyncClient, requests: int, concurrency: int, call: Call
+) -> dict:
+    """Issue ``requests`` calls from ``concurrency`` clients, timing each one."""
+    latencies: list[float] = []
+    errors = 0
+    indexes = iter(range(requests))
+
+    async def run() -> None:
+        nonlocal errors
+        for index in indexes:
+            started = time.perf_counter()
+            try:
+                response = await call(client, index)
+                await response.aread()
+                failed = response.is_error
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run() for _ in range(concurrency)))
+    return latency_summary(latencies, errors, time.perf_counter() - started)
+
+
+async def benchmark_endpoints(
+    client: httpx.AsyncClient, origin: str, requests: int, concurrency: int
+) -> dict:
+    run = uuid.uuid4().hex
+    ids: list[int] = []
+
+    async def create(client: httpx.AsyncClient, index: int) -> httpx.Response:
+        response = await client.post(
+            "/summaries/", json={"url": f"{origin}/articles/{index}?run={run}"}
+        )
+        if response.status_code == 201:
+            ids.append(response.json()["id"])
+        return response
+
+    def summary(index: int) -> int:
+        if not ids:
+            raise RuntimeError("No summaries were created")
+        return ids[index % len(ids)]
+
+    phases: dict[str, tuple[int, Call]] = {
+        "create": (requests, create),
+        "read": (
+            requests,
+            lambda client, index: client.get(f"/summaries/{summary(index)}/"),
+        ),
+        "list": (
+            requests,
+            lambda client, index: client.get(
+                "/summaries/",
+                params={"limit": 100, "after": max(summary(index) - 100, 0)},
+            ),
+        ),
+        "read_batch": (
+            requests,
+            lambda client, index: client.get(
+                "/summaries/batch",
+                params={"ids": [summary(index + offset) for offset in range(50)]},
+            ),
+        ),
+        "update": (
+            requests,
+            lambda client, index: client.put(
+                f"/summaries/{summary(index)}/",
+                json={"url": f"{origin}/articles/{index}", "summary": "updated"},
+            ),
+        ),
+        "export": (
+            max(requests // 100, 1),
+            lambda client, index: client.get("/summaries/export"),
+        ),
+    }
+
+    results = {}
+    for name, (count, call) in phases.items():
+        results[name] = await measure(client, count, concurrency, call)
+
+    # Deletes every summary the run created, so they run last.
+    deleted = list(ids)
+    results["delete"] = await measure(
+        client,
+        len(deleted),
+        concurrency,
+        lambda client, index: client.delete(f"/summaries/{deleted[index]}/"),
+    )
+    return results
+
+
+async def benchmark_summarization(
+    client: httpx.AsyncClient,
+    worker: subprocess.Popen,
+    origin: str,
+    articles: int,
+    engine: str,
+    timeout: float,
+) -> dict:
+    run = uuid.uuid4().hex
+    urls = [f"{origin}/articles/{index}?run={run}" for index in range(articles)]
+
+    started = time.perf_counter()
+    ids = []
+    for batch in chunks(urls, MAX_BATCH_SIZE):
+        response = await client.post(
+            "/summaries/batch", json={"urls": batch, "engine": engine}
+        )
+        response.raise_for_status()
+        ids.extend(summary["id"] for summary in response.json())
+
+    pending = set(ids)
+    finished = []
+    deadline = time.monotonic() + timeout
+    while pending and time.monotonic() < deadline:
+        if worker.poll() is not None:
+            raise RuntimeError(f"The worker exited with status {worker.returncode}")
+        await asyncio.sleep(0.1)
+        for batch in chunks(sorted(pending), MAX_BATCH_SIZE):
+            response = await client.get("/summaries/batch", params={"ids": batch})
+            for summary in response.json():
+                if summary["status"] in ("done", "failed"):
+                    pending.discard(summary["id"])
+                    finished.append(summary)
+    elapsed = time.perf_counter() - started
+
+    for batch in chunks(ids, MAX_BATCH_SIZE):
+        await client.delete("/summaries/batch", params={"ids": batch})
+
+    done = [summary for summary in finished if summary["status"] == "done"]
+    stages = {}
+    for stage in STAGES:
+        seconds = [
+            summary[f"{stage}_seconds"]
+            for summary in done
+            if summary[f"{stage}_seconds"] is not None
+        ]
+        stages[stage] = {
+            "p50_ms": percentile(seconds, 50) * 1000,
+            "p99_ms": percentile(seconds, 99) * 1000,
+        }
+    return {
+        "articles": articles,
+        "done": len(done),
+        "failed": len(finished) - len(done),
+        "timed_out": len(pending),
+        "seconds": elapsed,
+        "articles_per_second": len(done) / elapsed,
+        "stages": stages,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(  # nosec
+            ["git", "rev-parse", "HEAD"],
+            cwd=PROJECT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    await prepare_database(args.database_url)
+    env = {
+        "DATABASE_URL": args.database_url,
+        "ENVIRONMENT": "benchmark",
+        "TESTING": "0",
+        "SUMMARIZER_ENGINE": args.engine,
+        # Every article comes from one stub host; don't throttle it.
+        "FETCH_PER_HOST_LIMIT": str(args.worker_concurrency),
+        # Every request comes from this one client; measure without limits.
+        "RATE_LIMIT_PER_SECOND": "0",
+        "ADMISSION_MAX_BACKLOG": "0",
+        "WORKER_CONCURRENCY": str(args.worker_concurrency),
+        "DB_POOL_MAX_SIZE": str(args.worker_concurrency + POOL_HEADROOM),
+    }
+    web = [
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--port",
+        str(args.port),
+        "--workers",
+        str(args.web_workers),
+        "--log-level",
+        "warning",
+    ]
+    limits = httpx.Limits(max_connections=args.concurrency)
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    with serve() as origin, run_process(web, env):
+        async with httpx.AsyncClient(
+            base_url=base_url, limits=limits, timeout=60
+        ) as client:
+            await wait_until_up(client)
+            endpoints = await benchmark_endpoints(
+                client, origin, args.requests, args.concurrency
+            )
+            with run_process(["-m", "app.worker"], env) as worker:
+                summarization = await benchmark_summarization(
+                    client, worker, origin, args.articles, args.engine, args.timeout
+                )
+
+    return {
+        "meta": {
+            "started_at": args.started_at,
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "web_workers": args.web_workers,
+            "worker_concurrency": args.worker_concurrency,
+            "db_pool_max_size": args.worker_concurrency + POOL_HEADROOM,
+            "engine": args.engine,
+        },
+        "endpoints": endpoints,
+        "summarization": summarization,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load")
+    parser.add_argument(
+        "--database-url",
+        default=os.environ.get("BENCHMARK_DATABASE_URL"),
+        required="BENCHMARK_DATABASE_URL" not in os.environ,
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--engine", default="textrank")
+    parser.add_argument("--web-workers", type=int, default=1)
+    parser.add_argument("--worker-concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+    args.started_at = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    results = asyncio.run(run(args))
+
+    output = args.output or RESULTS / f"load-{args.started_at}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
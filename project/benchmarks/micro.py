@@ -0,0 +1,57 @@
+"""Run the micro-benchmarks and compare them with the stored baseline.
+
+    python -m benchmarks.micro                  # fail if slower than the baseline
+    python -m benchmarks.micro --save-baseline  # record a new baseline
+
+Baselines are stored per machine and Python version under
+benchmarks/baseline/, so save one on the machine that runs the comparison.
+Extra arguments are passed to pytest, e.g. ``-k serialize``.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Optional
+
+import pytest
+from pytest_benchmark.utils import get_machine_id
+
+BENCHMARKS = Path(__file__).resolve().parent
+STORAGE = BENCHMARKS / "baseline"
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.micro")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=20,
+        help="fail when a median is this many percent slower (default: 20)",
+    )
+    args, pytest_args = parser.parse_known_args(argv)
+
+    options = [
+        str(BENCHMARKS),
+        "-o",
+        "python_files=bench_*.py",
+        "-p",
+        "no:cacheprovider",
+        "--benchmark-only",
+        f"--benchmark-storage=file://{STORAGE}",
+        "--benchmark-sort=fullname",
+    ]
+    if args.save_baseline:
+        options.append("--benchmark-save=baseline")
+    elif not any((STORAGE / get_machine_id()).glob("*.json")):
+        print(f"No baseline for {get_machine_id()} yet, use --save-baseline")
+    else:
+        options += [
+            "--benchmark-compare",
+            f"--benchmark-compare-fail=median:{args.threshold:g}%",
+        ]
+    return pytest.main([*options, *pytest_args])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""A local origin serving canned articles, so benchmarks never leave the host."""
+
+import hashlib
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+from benchmarks.corpus import article
+
+
+class ArticleHandler(BaseHTTPRequestHandler):
+    """Serves ``/articles/<n>`` (any query string) with an ETag."""
+
+    def do_GET(self) -> None:
+        path = self.path.split("?", 1)[0]
+        try:
+            index = int(path.removeprefix("/articles/"))
+        except ValueError:
+            self.send_error(404)
+            return
+
+        body = article(index).html.encode()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+@contextmanager
+def serve(host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+    """Run the origin in a thread, yielding its base url."""
+    server = ThreadingHTTPServer((host, port), ArticleHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,9 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "ratelimitbucket" (
+    "key" VARCHAR(64) NOT NULL  PRIMARY KEY,
+    "tokens" DOUBLE PRECISION NOT NULL,
+    "updated_at" DOUBLE PRECISION NOT NULL
+);
+COMMENT ON TABLE "ratelimitbucket" IS 'A client''s token bucket for creating summaries, shared by every process.';
+-- downgrade --
+DROP TABLE IF EXISTS "ratelimitbucket";
@@ -0,0 +1,16 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "summaryjob" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "url" TEXT NOT NULL,
+    "status" VARCHAR(7) NOT NULL  DEFAULT 'queued',
+    "attempts" INT NOT NULL  DEFAULT 0,
+    "run_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "locked_at" TIMESTAMPTZ,
+    "last_error" TEXT,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "summary_id" INT NOT NULL REFERENCES "textsummary" ("id") ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS "idx_summaryjob_status_d5c64c" ON "summaryjob" ("status", "run_at");
+COMMENT ON COLUMN "summaryjob"."status" IS 'QUEUED: queued\nRUNNING: running\nDONE: done\nFAILED: failed';
+-- downgrade --
+DROP TABLE IF EXISTS "summaryjob";
@@ -0,0 +1,9 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "summarycache" (
+    "key" VARCHAR(64) NOT NULL  PRIMARY KEY,
+    "url" TEXT NOT NULL,
+    "summary" TEXT NOT NULL,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP
+);
+-- downgrade --
+DROP TABLE IF EXISTS "summarycache";
@@ -0,0 +1,7 @@
+-- upgrade --
+ALTER TABLE "summaryjob" ADD "url_key" VARCHAR(64) NOT NULL  DEFAULT '';
+ALTER TABLE "summaryjob" ALTER COLUMN "url_key" DROP DEFAULT;
+CREATE INDEX "idx_summaryjob_url_key_20b58d" ON "summaryjob" ("url_key");
+-- downgrade --
+DROP INDEX "idx_summaryjob_url_key_20b58d";
+ALTER TABLE "summaryjob" DROP COLUMN "url_key";
@@ -0,0 +1,7 @@
+-- upgrade --
+ALTER TABLE "textsummary" ADD "url_hash" VARCHAR(64);
+CREATE INDEX "idx_textsummary_created_6d73cb" ON "textsummary" ("created_at");
+-- downgrade --
+DROP INDEX "idx_textsummary_created_6d73cb";
+DROP INDEX IF EXISTS "idx_textsummary_url_has_4e9a12";
+ALTER TABLE "textsummary" DROP COLUMN "url_hash";
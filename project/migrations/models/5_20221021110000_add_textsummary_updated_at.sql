@@ -0,0 +1,5 @@
+-- upgrade --
+ALTER TABLE "textsummary" ADD "updated_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP;
+UPDATE "textsummary" SET "updated_at" = "created_at";
+-- downgrade --
+ALTER TABLE "textsummary" DROP COLUMN "updated_at";
@@ -0,0 +1,22 @@
+-- upgrade --
+ALTER TABLE "textsummary" ADD "status" VARCHAR(16) NOT NULL  DEFAULT 'pending';
+ALTER TABLE "textsummary" ADD "error" TEXT;
+ALTER TABLE "textsummary" ADD "started_at" TIMESTAMPTZ;
+ALTER TABLE "textsummary" ADD "finished_at" TIMESTAMPTZ;
+ALTER TABLE "textsummary" ADD "downloading_seconds" DOUBLE PRECISION;
+ALTER TABLE "textsummary" ADD "parsing_seconds" DOUBLE PRECISION;
+ALTER TABLE "textsummary" ADD "summarizing_seconds" DOUBLE PRECISION;
+UPDATE "textsummary" SET "status" = 'done', "finished_at" = "updated_at" WHERE "summary" <> '';
+UPDATE "textsummary" SET "status" = 'failed', "error" = "summaryjob"."last_error", "finished_at" = "textsummary"."updated_at"
+    FROM "summaryjob" WHERE "summaryjob"."summary_id" = "textsummary"."id" AND "summaryjob"."status" = 'failed' AND "textsummary"."summary" = '';
+CREATE INDEX "idx_textsummary_status_5025d6" ON "textsummary" ("status");
+COMMENT ON COLUMN "textsummary"."status" IS 'PENDING: pending\nDOWNLOADING: downloading\nPARSING: parsing\nSUMMARIZING: summarizing\nDONE: done\nFAILED: failed';
+-- downgrade --
+DROP INDEX "idx_textsummary_status_5025d6";
+ALTER TABLE "textsummary" DROP COLUMN "summarizing_seconds";
+ALTER TABLE "textsummary" DROP COLUMN "parsing_seconds";
+ALTER TABLE "textsummary" DROP COLUMN "downloading_seconds";
+ALTER TABLE "textsummary" DROP COLUMN "finished_at";
+ALTER TABLE "textsummary" DROP COLUMN "started_at";
+ALTER TABLE "textsummary" DROP COLUMN "error";
+ALTER TABLE "textsummary" DROP COLUMN "status";
@@ -0,0 +1,6 @@
+-- upgrade --
+ALTER TABLE "summarycache" ADD "etag" TEXT;
+ALTER TABLE "summarycache" ADD "last_modified" TEXT;
+-- downgrade --
+ALTER TABLE "summarycache" DROP COLUMN "last_modified";
+ALTER TABLE "summarycache" DROP COLUMN "etag";
@@ -0,0 +1,12 @@
+-- upgrade --
+ALTER TABLE "textsummary" ADD "engine" VARCHAR(16) NOT NULL  DEFAULT 'newspaper';
+ALTER TABLE "textsummary" ALTER COLUMN "engine" SET DEFAULT 'textrank';
+COMMENT ON COLUMN "textsummary"."engine" IS 'TEXTRANK: textrank\nNEWSPAPER: newspaper';
+ALTER TABLE "summaryjob" ADD "engine" VARCHAR(16) NOT NULL  DEFAULT 'newspaper';
+ALTER TABLE "summaryjob" ALTER COLUMN "engine" SET DEFAULT 'textrank';
+COMMENT ON COLUMN "summaryjob"."engine" IS 'TEXTRANK: textrank\nNEWSPAPER: newspaper';
+-- Cache keys now include the engine, so existing entries can never be hit.
+DELETE FROM "summarycache";
+-- downgrade --
+ALTER TABLE "summaryjob" DROP COLUMN "engine";
+ALTER TABLE "textsummary" DROP COLUMN "engine";
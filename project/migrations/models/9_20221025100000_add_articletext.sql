@@ -0,0 +1,14 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "articletext" (
+    "url_hash" VARCHAR(64) NOT NULL  PRIMARY KEY,
+    "url" TEXT NOT NULL,
+    "title" TEXT NOT NULL,
+    "text" BYTEA NOT NULL,
+    "html" BYTEA,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP
+);
+COMMENT ON TABLE "articletext" IS 'Compressed article text, kept to re-summarize without re-fetching.';
+ALTER TABLE "summaryjob" ADD "resummarize" BOOL NOT NULL  DEFAULT False;
+-- downgrade --
+ALTER TABLE "summaryjob" DROP COLUMN "resummarize";
+DROP TABLE IF EXISTS "articletext";
@@ -7,9 +7,32 @@ from tortoise.contrib.fastapi import register_tortoise
 from app.config import Settings, get_settings
 from app.main import create_application
 
+# Settings changed for the current test, through override_settings.
+settings_overrides: dict = {}
+
 
 def get_settings_override():
-    return Settings(testing=1, database_url=os.environ.get("DATABASE_TEST_URL"))
+    return Settings(
+        testing=1,
+        database_url=os.environ.get("DATABASE_TEST_URL"),
+        **settings_overrides,
+    )
+
+
+@pytest.fixture
+def override_settings(monkeypatch):
+    """Change the test apps' settings until the test ends.
+
+    Returns a function taking the settings to change, which returns the
+    resulting ``Settings``.
+    """
+
+    def override(**settings):
+        for name, value in settings.items():
+            monkeypatch.setitem(settings_overrides, name, value)
+        return get_settings_override()
+
+    return override
 
 
 @pytest.fixture(scope="module")
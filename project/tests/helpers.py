@@ -1,4 +1,15 @@
 import json
+import os
+import uuid
+
+import pytest
+
+from app import jobs
+
+postgres_only = pytest.mark.skipif(
+    not os.environ.get("DATABASE_TEST_URL", "").startswith("postgres"),
+    reason="needs Postgres",
+)
 
 
 def create_summary(testclient, url):
@@ -6,3 +17,17 @@ def create_summary(testclient, url):
     summary_id = response.json()["id"]
 
     return summary_id
+
+
+def unique_url(url):
+    # The test database outlives a run, so fixed urls find the last run's rows.
+    return f"{url.rstrip('/')}/{uuid.uuid4().hex}"
+
+
+async def claim_all():
+    # Jobs left queued by earlier runs share the test database, so claim
+    # until none are left rather than a fixed number.
+    claimed = []
+    while batch := await jobs.claim(100):
+        claimed.extend(batch)
+    return claimed
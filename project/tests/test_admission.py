@@ -0,0 +1,194 @@
+import json
+import math
+import time
+import uuid
+
+import pytest
+from fastapi import status
+from fastapi.requests import Request
+
+from app import admission
+from app.api.summaries import client_address
+from app.models.tortoise import RateLimitBucket
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = time.time()
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def bucket_key():
+    # Buckets outlive a run of the tests, so each test takes fresh ones.
+    return uuid.uuid4().hex
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def client_bucket(test_app_with_db):
+    yield
+
+    # Leave the test client's bucket full for the tests that follow.
+    test_app_with_db.portal.call(
+        lambda: RateLimitBucket.filter(key="testclient").delete()
+    )
+
+
+def test_take_refills_over_time(test_app_with_db, clock, override_settings):
+    # Given
+    # A bucket of three summaries, refilled at one a second
+    limits = override_settings(rate_limit_per_second=1, rate_limit_burst=3)
+    key = bucket_key()
+
+    def take(cost):
+        return test_app_with_db.portal.call(admission.take, key, cost, limits)
+
+    # When / Then
+    # The burst is taken, and then the client waits for each refill
+    assert [take(1) for _ in range(3)] == [None, None, None]
+    assert take(1) == pytest.approx(1)
+    assert take(2) == pytest.approx(2)
+    clock.now += 1.5
+    assert take(1) is None
+    assert take(1) == pytest.approx(0.5)
+    clock.now += 60
+    assert take(3) is None
+
+
+def test_take_more_than_the_burst(test_app_with_db, override_settings):
+    limits = override_settings(rate_limit_per_second=1, rate_limit_burst=3)
+    wait = test_app_with_db.portal.call(admission.take, bucket_key(), 4, limits)
+    assert math.isinf(wait)
+
+
+def test_take_without_a_limit(test_app_with_db, override_settings):
+    limits = override_settings(rate_limit_per_second=0, rate_limit_burst=1)
+    key = bucket_key()
+    for _ in range(3):
+        assert test_app_with_db.portal.call(admission.take, key, 1, limits) is None
+
+
+def test_create_summaries_rate_limited(
+    test_app_with_db, client_bucket, override_settings
+):
+    # Given
+    # A limit of two summaries that barely refills
+    override_settings(rate_limit_per_second=0.01, rate_limit_burst=2)
+
+    # When
+    # Three summaries are created one by one, and then a batch
+    responses = [
+        test_app_with_db.post(
+            "/summaries/", data=json.dumps({"url": f"https://limited.example/{n}"})
+        )
+        for n in range(3)
+    ]
+    batch = test_app_with_db.post(
+        "/summaries/batch",
+        data=json.dumps({"urls": [f"https://limited.example/b{n}" for n in range(3)]}),
+    )
+
+    # Then
+    # The third is refused until a token refills, and the batch never fits
+    assert [response.status_code for response in responses] == [
+        status.HTTP_201_CREATED,
+        status.HTTP_201_CREATED,
+        status.HTTP_429_TOO_MANY_REQUESTS,
+    ]
+    assert responses[2].json()["detail"] == "Too many summaries requested"
+    assert 90 <= int(responses[2].headers["Retry-After"]) <= 100
+    assert batch.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert batch.json()["detail"] == "More summaries than the rate limit allows"
+    assert "Retry-After" not in batch.headers
+
+
+def test_create_summary_backlog_full(
+    test_app_with_db, client_bucket, override_settings, monkeypatch
+):
+    # Given
+    # A summary waiting for the worker, and a backlog of at most one
+    test_app_with_db.post(
+        "/summaries/", data=json.dumps({"url": "https://backlog.example/"})
+    )
+    monkeypatch.setattr(admission, "_backlog", None)
+    override_settings(admission_max_backlog=1)
+
+    # When
+    # Another summary is created
+    response = test_app_with_db.post(
+        "/summaries/", data=json.dumps({"url": "https://backlog.example/more"})
+    )
+
+    # Then
+    # It is refused until the backlog drains
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json()["detail"] == "Too many summaries are pending"
+    assert response.headers["Retry-After"] == str(admission.BACKLOG_RETRY_AFTER)
+
+
+def test_prune_buckets(test_app_with_db, override_settings):
+    # Given
+    # One bucket idle long enough to have refilled, and one in use
+    now = time.time()
+    idle, busy = bucket_key(), bucket_key()
+
+    async def create_buckets():
+        await RateLimitBucket.create(key=idle, tokens=0, updated_at=now - 10)
+        await RateLimitBucket.create(key=busy, tokens=0, updated_at=now)
+
+    test_app_with_db.portal.call(create_buckets)
+
+    # When
+    # Full buckets are pruned
+    limits = override_settings(rate_limit_per_second=1, rate_limit_burst=5)
+    test_app_with_db.portal.call(admission.prune_buckets, limits)
+
+    # Then
+    # Only the idle bucket is deleted
+    keys = test_app_with_db.portal.call(
+        lambda: RateLimitBucket.filter(key__in=[idle, busy]).values_list(
+            "key", flat=True
+        )
+    )
+    assert keys == [busy]
+
+
+@pytest.mark.parametrize(
+    ("hops", "forwarded", "expected"),
+    [
+        [0, ["1.1.1.1"], "10.0.0.1"],
+        [1, ["1.1.1.1"], "1.1.1.1"],
+        [1, ["6.6.6.6, 1.1.1.1"], "1.1.1.1"],
+        [1, ["6.6.6.6", "1.1.1.1"], "1.1.1.1"],
+        [2, ["6.6.6.6, 1.1.1.1, 2.2.2.2"], "1.1.1.1"],
+        [2, ["1.1.1.1"], "10.0.0.1"],
+        [1, [], "10.0.0.1"],
+    ],
+    ids=["direct", "proxied", "spoofed", "repeated", "two_hops", "too_few", "missing"],
+)
+def test_client_address(override_settings, hops, forwarded, expected):
+    # Given
+    # A request from a proxy, through as many proxies as configured
+    request = Request(
+        {
+            "type": "http",
+            "client": ("10.0.0.1", 40000),
+            "headers": [(b"x-forwarded-for", value.encode()) for value in forwarded],
+        }
+    )
+
+    # When / Then
+    # The client is the address the nearest trusted proxy recorded
+    settings = override_settings(forwarded_proxy_hops=hops)
+    assert client_address(request, settings) == expected
@@ -0,0 +1,166 @@
+import json
+
+from fastapi import status
+
+from app import articles, summarizer, worker
+from app.config import Settings
+from app.fetcher import Page
+from app.models.tortoise import ArticleText, JobStatus, SummaryJob
+from app.resummarize import resummarize_all
+from app.urls import url_hash
+
+from .helpers import claim_all, unique_url
+
+
+class FailingFetcher:
+    async def fetch(self, url, etag=None, last_modified=None):
+        raise AssertionError("stored articles are not fetched again")
+
+
+def create_summary(test_app_with_db, url):
+    response = test_app_with_db.post("/summaries/", data=json.dumps({"url": url}))
+    return response.json()["id"]
+
+
+def test_compress_roundtrip():
+    text = "Cats sleep most of the day. " * 100
+    compressed = articles.compress(text, 6)
+    assert len(compressed) < len(text)
+    assert articles.decompress(compressed) == text
+
+
+def test_store_empty_html(test_app_with_db, monkeypatch):
+    # Given
+    # Html storage is enabled and a page's html is empty
+    monkeypatch.setattr(
+        articles, "get_settings", lambda: Settings(article_store_html=1)
+    )
+    url = unique_url("https://empty.example/")
+
+    # When
+    test_app_with_db.portal.call(articles.store, url, "Empty", "Text.", "")
+
+    # Then
+    # It is stored compressed like any other html
+    article = test_app_with_db.portal.call(
+        lambda: ArticleText.get(url_hash=url_hash(url))
+    )
+    assert articles.decompress(article.html) == ""
+
+
+def test_resummarize_from_stored_text(test_app_with_db, monkeypatch):
+    # Given
+    # A summary whose article text is stored
+    url = unique_url("https://stored.example/")
+    summary_id = create_summary(test_app_with_db, url)
+    test_app_with_db.portal.call(
+        articles.store, url, "Stored", "Stored text.", "<html></html>"
+    )
+
+    # And
+    # Summarization is mocked and fetching fails
+    summarized = []
+
+    async def mock_run_cpu(func, engine, documents):
+        summarized.extend(documents)
+        return [f"{engine} summary"] * len(documents)
+
+    monkeypatch.setattr(summarizer, "get_fetcher", FailingFetcher)
+    monkeypatch.setattr(summarizer, "run_cpu", mock_run_cpu)
+
+    # When
+    # It is re-summarized with another engine and the worker runs the job
+    response = test_app_with_db.post(
+        f"/summaries/{summary_id}/resummarize",
+        data=json.dumps({"engine": "newspaper"}),
+    )
+
+    async def drain():
+        for job in await claim_all():
+            if job.resummarize and job.summary_id == summary_id:
+                await worker.run_job(job, Settings())
+
+    test_app_with_db.portal.call(drain)
+
+    # Then
+    # The job is accepted and the stored text is summarized without a download
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.json() == {"id": summary_id, "url": url}
+    assert summarized == [("Stored", "Stored text.")]
+    summary = test_app_with_db.get(f"/summaries/{summary_id}/").json()
+    assert summary["status"] == "done"
+    assert summary["engine"] == "newspaper"
+    assert summary["summary"] == "newspaper summary"
+
+
+def test_resummarize_without_stored_text(test_app_with_db):
+    summary_id = create_summary(test_app_with_db, "https://unstored.example/")
+
+    response = test_app_with_db.post(f"/summaries/{summary_id}/resummarize")
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert response.json()["detail"] == "Article text is not stored"
+
+
+def test_resummarize_not_found(test_app_with_db):
+    response = test_app_with_db.post("/summaries/999999/resummarize")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["detail"] == "Summary not found"
+
+
+def test_generate_summary_stores_article_text(test_app_with_db, monkeypatch):
+    # Given
+    # A pending summary and a mocked download and summarization
+    url = "https://store.example/article"
+    summary_id = create_summary(test_app_with_db, url)
+
+    class MockFetcher:
+        async def fetch(self, url, etag=None, last_modified=None):
+            return Page(url, "<html>raw</html>")
+
+    async def mock_run_cpu(func, *args):
+        if func is summarizer.parse_html:
+            return "Title", "Extracted text."
+        return ["summary"] * len(args[1])
+
+    monkeypatch.setattr(summarizer, "get_fetcher", MockFetcher)
+    monkeypatch.setattr(summarizer, "run_cpu", mock_run_cpu)
+
+    # When
+    # The summary is generated
+    test_app_with_db.portal.call(
+        summarizer.generate_summary, summary_id, url, "textrank"
+    )
+
+    # Then
+    # The extracted text is stored compressed, without the html by default
+    article = test_app_with_db.portal.call(
+        lambda: ArticleText.get(url_hash=url_hash(url))
+    )
+    assert article.title == "Title"
+    assert articles.decompress(article.text) == "Extracted text."
+    assert article.html is None
+
+
+def test_resummarize_all_queues_stored_articles(test_app_with_db):
+    # Given
+    # Two summaries, only one with stored article text
+    stored = create_summary(test_app_with_db, "https://bulk.example/stored")
+    unstored = create_summary(test_app_with_db, "https://bulk.example/unstored")
+    test_app_with_db.portal.call(
+        articles.store, "https://bulk.example/stored", "Title", "Text."
+    )
+
+    # When
+    # The bulk command runs
+    queued = test_app_with_db.portal.call(resummarize_all)
+
+    # Then
+    # Only the stored article is queued to be re-summarized
+    assert queued >= 1
+    resummarize_jobs = test_app_with_db.portal.call(
+        lambda: SummaryJob.filter(
+            resummarize=True, status=JobStatus.QUEUED
+        ).values_list("summary_id", flat=True)
+    )
+    assert stored in resummarize_jobs
+    assert unstored not in resummarize_jobs
@@ -0,0 +1,47 @@
+import httpx
+
+from benchmarks.corpus import corpus
+from benchmarks.origin import serve
+from benchmarks.stats import latency_summary, percentile
+
+
+def test_percentile_nearest_rank():
+    values = [0.5, 0.1, 0.4, 0.2, 0.3]
+    assert percentile(values, 50) == 0.3
+    assert percentile(values, 99) == 0.5
+    assert percentile(values, 0) == 0.1
+
+
+def test_latency_summary():
+    summary = latency_summary([0.01] * 99 + [1.0], errors=2, elapsed=2.0)
+    assert summary["requests"] == 100
+    assert summary["errors"] == 2
+    assert summary["rps"] == 50
+    assert summary["p50_ms"] == 10
+    assert summary["p99_ms"] == 10
+    assert summary["max_ms"] == 1000
+
+
+def test_corpus_is_deterministic():
+    assert corpus(3) == corpus(3)
+    assert len({article.title for article in corpus(8)}) == 8
+
+
+def test_stub_origin_serves_articles_with_validators():
+    # Given
+    # The stub origin
+    with serve() as origin:
+        # When
+        # An article is fetched, then re-fetched with its ETag
+        response = httpx.get(f"{origin}/articles/3?run=abc")
+        again = httpx.get(
+            f"{origin}/articles/3", headers={"If-None-Match": response.headers["ETag"]}
+        )
+        missing = httpx.get(f"{origin}/nothing")
+
+    # Then
+    # The canned article is served, and is unchanged the second time
+    assert response.status_code == 200
+    assert response.text == corpus(4)[3].html
+    assert again.status_code == 304
+    assert missing.status_code == 404
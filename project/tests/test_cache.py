@@ -0,0 +1,180 @@
+import json
+
+import pytest
+from fastapi import status
+
+from app.cache import LRUCache, get_cache
+from app.models.tortoise import SummaryJob
+from app.urls import normalize_url
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ["https://foo.bar", "https://foo.bar/"],
+        ["HTTPS://Foo.BAR/Path", "https://foo.bar/Path"],
+        ["https://foo.bar:443/a#section", "https://foo.bar/a"],
+        ["http://foo.bar:8080/a", "http://foo.bar:8080/a"],
+        [
+            "https://foo.bar/a?utm_source=x&b=2&fbclid=y&a=1",
+            "https://foo.bar/a?a=1&b=2",
+        ],
+    ],
+    ids=["root_path", "case", "default_port_&_fragment", "port", "tracking_params"],
+)
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+
+def test_lru_cache_evicts_least_recently_used():
+    # Given
+    # A full cache
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+
+    # When
+    # "a" is read and a third entry is added
+    cache.get("a")
+    cache.set("c", "3")
+
+    # Then
+    # "b" is evicted and counted
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.evictions == 1
+    assert cache.hits == 3
+    assert cache.misses == 1
+
+
+def test_lru_cache_expires_entries():
+    # Given
+    # A cache whose entries expire immediately
+    cache = LRUCache(maxsize=2, ttl=0)
+    cache.set("a", "1")
+
+    # When
+    # The entry is read
+    value = cache.get("a")
+
+    # Then
+    # It is a miss and the expiry is counted
+    assert value is None
+    assert cache.expirations == 1
+    assert len(cache) == 0
+
+
+def test_create_summary_uses_cached_summary(test_app_with_db):
+    # Given
+    # A cached summary for a url
+    test_app_with_db.portal.call(
+        get_cache().set,
+        "https://cached.example/story?utm_source=feed",
+        "textrank",
+        "cached",
+    )
+
+    # When
+    # The same url is posted in a different form
+    response = test_app_with_db.post(
+        "/summaries/", data=json.dumps({"url": "https://Cached.example/story#top"})
+    )
+    summary_id = response.json()["id"]
+
+    # Then
+    # The summary is filled in straight away and no job is queued
+    assert response.status_code == status.HTTP_201_CREATED
+    response = test_app_with_db.get(f"/summaries/{summary_id}/")
+    assert response.json()["summary"] == "cached"
+    assert not test_app_with_db.portal.call(
+        lambda: SummaryJob.filter(summary_id=summary_id).exists()
+    )
+
+
+def test_create_summary_cache_is_per_engine(test_app_with_db):
+    # Given
+    # A url cached for the textrank engine only
+    test_app_with_db.portal.call(
+        get_cache().set, "https://engines.example/", "textrank", "ranked"
+    )
+
+    # When
+    # The url is posted for the newspaper engine
+    response = test_app_with_db.post(
+        "/summaries/",
+        data=json.dumps({"url": "https://engines.example/", "engine": "newspaper"}),
+    )
+    summary_id = response.json()["id"]
+
+    # Then
+    # The cached summary is not reused and a job is queued for that engine
+    summary = test_app_with_db.get(f"/summaries/{summary_id}/").json()
+    assert summary["summary"] == ""
+    assert summary["engine"] == "newspaper"
+    job = test_app_with_db.portal.call(lambda: SummaryJob.get(summary_id=summary_id))
+    assert job.engine == "newspaper"
+
+
+def test_create_summary_uses_shared_cache(test_app_with_db):
+    # Given
+    # A summary only present in the shared cache
+    cache = get_cache()
+    test_app_with_db.portal.call(
+        cache.set, "https://shared.example/", "textrank", "shared"
+    )
+    cache.memory.clear()
+    shared_hits = cache.shared_hits
+
+    # When
+    # The url is posted
+    response = test_app_with_db.post(
+        "/summaries/", data=json.dumps({"url": "https://shared.example/"})
+    )
+    summary_id = response.json()["id"]
+
+    # Then
+    # The summary comes from the shared tier
+    response = test_app_with_db.get(f"/summaries/{summary_id}/")
+    assert response.json()["summary"] == "shared"
+    assert cache.shared_hits == shared_hits + 1
+
+
+def test_cache_stats(test_app, override_settings):
+    # When
+    # The cache stats are requested with the internal token
+    override_settings(internal_api_token="secret")
+    response = test_app.get(
+        "/internal/cache", headers={"Authorization": "Bearer secret"}
+    )
+
+    # Then
+    # Hit, miss and eviction counters are reported
+    assert response.status_code == status.HTTP_200_OK
+    stats = response.json()
+    assert {"hits", "misses", "evictions", "expirations"} <= stats["memory"].keys()
+    assert {"hits", "misses"} <= stats["shared"].keys()
+
+
+@pytest.mark.parametrize(
+    ("token", "authorization", "status_code"),
+    [
+        [None, "Bearer secret", status.HTTP_404_NOT_FOUND],
+        ["secret", None, status.HTTP_403_FORBIDDEN],
+        ["secret", "Bearer wrong", status.HTTP_403_FORBIDDEN],
+        ["secret", "Basic secret", status.HTTP_403_FORBIDDEN],
+    ],
+    ids=["disabled", "missing", "wrong", "scheme"],
+)
+def test_internal_endpoints_need_the_token(
+    test_app, override_settings, token, authorization, status_code
+):
+    # Given
+    # An internal token, or none
+    override_settings(internal_api_token=token)
+    headers = {"Authorization": authorization} if authorization else {}
+
+    # When / Then
+    # The internal endpoints are hidden or refused without the right token
+    for path in ("/internal/cache", "/internal/db-pool"):
+        assert test_app.get(path, headers=headers).status_code == status_code
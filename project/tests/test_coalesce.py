@@ -0,0 +1,215 @@
+import asyncio
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from app import summarizer
+from app.config import Settings
+from app.fetcher import Page
+from app.models.tortoise import JobStatus, SummaryJob
+from app.urls import summary_key
+
+from .helpers import postgres_only, unique_url
+
+from app.coalesce import (  # isort:skip
+    MicroBatcher,
+    SingleFlight,
+    advisory_lock_id,
+    try_advisory_lock,
+)
+
+
+def test_single_flight_runs_once_per_key():
+    # Given
+    # A slow call counting its invocations
+    calls = []
+
+    async def fetch(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key.upper()
+
+    # When
+    # The same key is requested concurrently, alongside a different key
+    async def run():
+        flight = SingleFlight()
+        return await asyncio.gather(
+            flight.do("a", fetch, "a"),
+            flight.do("a", fetch, "a"),
+            flight.do("b", fetch, "b"),
+        )
+
+    results = asyncio.run(run())
+
+    # Then
+    # Each key is fetched once and every caller gets the result
+    assert results == ["A", "A", "B"]
+    assert sorted(calls) == ["a", "b"]
+
+
+def test_single_flight_shares_errors():
+    # Given
+    # A failing call
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    # When
+    # Two callers wait on the same key
+    async def run():
+        flight = SingleFlight()
+        return await asyncio.gather(
+            flight.do("a", fail), flight.do("a", fail), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+
+    # Then
+    # Both see the error
+    assert [str(result) for result in results] == ["boom", "boom"]
+
+
+def test_micro_batcher_groups_calls_per_key():
+    # Given
+    # A batch function recording the batches it receives
+    batches = []
+
+    async def double(key, items):
+        batches.append((key, items))
+        return [item * 2 for item in items]
+
+    # When
+    # Calls for two keys arrive together, more than a batch for one of them
+    async def run():
+        batcher = MicroBatcher(double, max_size=2, max_wait=0.01)
+        return await asyncio.gather(
+            batcher.submit("a", 1),
+            batcher.submit("a", 2),
+            batcher.submit("a", 3),
+            batcher.submit("b", 4),
+        )
+
+    results = asyncio.run(run())
+
+    # Then
+    # Full batches flush at once, the rest after the wait, each key separately
+    assert results == [2, 4, 6, 8]
+    assert sorted(batches) == [("a", [1, 2]), ("a", [3]), ("b", [4])]
+
+
+def test_micro_batcher_shares_errors():
+    # Given
+    # A failing batch function
+    async def fail(key, items):
+        raise ValueError("boom")
+
+    # When
+    # Two calls share a batch
+    async def run():
+        batcher = MicroBatcher(fail, max_size=10, max_wait=0.01)
+        return await asyncio.gather(
+            batcher.submit("a", 1), batcher.submit("a", 2), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+
+    # Then
+    # Both see the error
+    assert [str(result) for result in results] == ["boom", "boom"]
+
+
+def test_generate_summary_coalesces_same_url(test_app_with_db, monkeypatch):
+    # Given
+    # Several summaries for the same article
+    story = unique_url("https://viral.example/story")
+    urls = [
+        story,
+        story.replace("viral", "VIRAL") + "?utm_campaign=share",
+        story + "#comments",
+    ]
+    summary_ids = [
+        test_app_with_db.post("/summaries/", data=json.dumps({"url": url})).json()["id"]
+        for url in urls
+    ]
+
+    # And
+    # Mock download and summarization, counting downloads
+    downloads = []
+
+    class MockFetcher:
+        async def fetch(self, url, etag=None, last_modified=None):
+            downloads.append(url)
+            await asyncio.sleep(0.01)
+            return Page(url, "<html></html>")
+
+    async def mock_run_cpu(func, *args):
+        if func is summarizer.parse_html:
+            return "Viral", "viral text"
+        return ["viral summary"] * len(args[1])
+
+    monkeypatch.setattr(summarizer, "get_fetcher", MockFetcher)
+    monkeypatch.setattr(summarizer, "run_cpu", mock_run_cpu)
+
+    # When
+    # Two summaries are generated at the same time
+    async def run():
+        await asyncio.gather(
+            summarizer.generate_summary(summary_ids[0], urls[0], "textrank"),
+            summarizer.generate_summary(summary_ids[1], urls[1], "textrank"),
+        )
+
+    test_app_with_db.portal.call(run)
+
+    # Then
+    # The article is downloaded once
+    assert len(downloads) == 1
+
+    # And
+    # Every waiting summary gets the result
+    for summary_id in summary_ids:
+        response = test_app_with_db.get(f"/summaries/{summary_id}/")
+        assert response.json()["summary"] == "viral summary"
+
+    # And
+    # The queued job for the third summary is completed without running
+    job = test_app_with_db.portal.call(
+        lambda: SummaryJob.get(summary_id=summary_ids[2])
+    )
+    assert job.status == JobStatus.DONE
+
+
+@pytest.mark.parametrize(
+    ("key", "expected"),
+    [["0" * 64, 0], ["f" * 64, -1], ["7fffffffffffffff" + "0" * 48, 2**63 - 1]],
+    ids=["zero", "negative", "max"],
+)
+def test_advisory_lock_id_fits_bigint(key, expected):
+    assert advisory_lock_id(key) == expected
+
+
+@postgres_only
+def test_advisory_lock_is_exclusive(test_app_with_db):
+    # Given
+    # A summary key
+    key = summary_key(unique_url("https://locked.example/"), "textrank")
+
+    # When
+    # Its lock is taken twice at once, and then again once released
+    async def run():
+        async with try_advisory_lock(key) as first:
+            async with try_advisory_lock(key) as second:
+                held = first, second
+        async with try_advisory_lock(key) as again:
+            return held, again
+
+    # Then
+    # Only the first holder gets it until it is released
+    assert test_app_with_db.portal.call(run) == ((True, False), True)
+
+
+def test_worker_concurrency_leaves_a_connection_free():
+    # Every job's lock holds a connection, so its writes need one more.
+    assert Settings(worker_concurrency=9, db_pool_max_size=10)
+    with pytest.raises(ValidationError, match="must be less than DB_POOL_MAX_SIZE"):
+        Settings(worker_concurrency=10, db_pool_max_size=10)
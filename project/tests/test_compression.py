@@ -0,0 +1,210 @@
+import asyncio
+import gzip
+import json
+import zlib
+
+import brotli
+import pytest
+from starlette.applications import Starlette
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.compression import CompressionMiddleware, negotiate
+
+from .helpers import create_summary, unique_url
+
+BODY = "All work and no play makes Jack a dull boy. " * 100
+
+
+async def plain(request):
+    return PlainTextResponse(BODY, headers={"ETag": '"1-2"'})
+
+
+async def small(request):
+    return PlainTextResponse("tiny")
+
+
+async def stream_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    for _ in range(3):
+        await send(
+            {"type": "http.response.body", "body": BODY.encode(), "more_body": True}
+        )
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def events(request):
+    async def chunks():
+        yield "data: 1\n\n"
+
+    return StreamingResponse(chunks(), media_type="text/event-stream")
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = Starlette(
+        routes=[
+            Route("/plain", plain),
+            Route("/small", small),
+            Route("/events", events),
+        ]
+    )
+    app.add_middleware(CompressionMiddleware)
+    with TestClient(app) as client:
+        yield client
+
+
+def raw(client, path, accept_encoding):
+    with client.stream(
+        "GET", path, headers={"Accept-Encoding": accept_encoding}
+    ) as response:
+        return response, b"".join(response.iter_raw())
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "encoding"),
+    [
+        ["gzip, deflate, br", "br"],
+        ["gzip", "gzip"],
+        ["GZIP;q=0.8, br;q=0.5", "gzip"],
+        ["br;q=0, gzip", "gzip"],
+        ["*", "br"],
+        ["*;q=0.5, br;q=0", "gzip"],
+        ["identity", None],
+        ["deflate", None],
+        ["", None],
+        ["gzip;q=nonsense", None],
+    ],
+)
+def test_negotiate(accept_encoding, encoding):
+    assert negotiate(accept_encoding) == encoding
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "decompress"),
+    [["br", brotli.decompress], ["gzip", gzip.decompress]],
+)
+def test_compresses_large_responses(client, accept_encoding, decompress):
+    # When
+    # A large response is requested by a client accepting the encoding
+    response, body = raw(client, "/plain", accept_encoding)
+
+    # Then
+    # It is compressed, with a matching length and a weakened ETag
+    assert response.headers["content-encoding"] == accept_encoding
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == 'W/"1-2"'
+    assert int(response.headers["content-length"]) == len(body) < len(BODY)
+    assert decompress(body).decode() == BODY
+
+
+def test_uncompressed_without_accept_encoding(client):
+    response, body = raw(client, "/plain", "identity")
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == '"1-2"'
+    assert body.decode() == BODY
+
+
+def test_small_responses_are_not_compressed(client):
+    response, body = raw(client, "/small", "gzip")
+
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
+    assert body == b"tiny"
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "decompressor"),
+    [["br", brotli.Decompressor], ["gzip", lambda: zlib.decompressobj(31)]],
+)
+def test_streams_are_compressed_per_chunk(accept_encoding, decompressor):
+    # Given
+    # The middleware around a streamed response, and a client accepting the encoding
+    app = CompressionMiddleware(stream_app)
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/stream",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    # When
+    # The response is sent
+    asyncio.run(app(scope, receive, send))
+
+    # Then
+    # It is sent compressed, and each chunk decodes as it arrives
+    start, *bodies = messages
+    headers = Headers(raw=start["headers"])
+    assert headers["content-encoding"] == accept_encoding
+    assert "content-length" not in headers
+    decoder = decompressor()
+    decode = getattr(decoder, "process", None) or decoder.decompress
+    assert [decode(body["body"]).decode() for body in bodies] == [BODY] * 3 + [""]
+
+
+def test_event_streams_are_not_compressed(client):
+    response, body = raw(client, "/events", "gzip, br")
+
+    assert "content-encoding" not in response.headers
+    assert body == b"data: 1\n\n"
+
+
+def test_summaries_are_compressed(test_app_with_db):
+    # Given
+    # Enough summaries to pass the size threshold
+    for index in range(20):
+        test_app_with_db.post(
+            "/summaries/",
+            data=json.dumps({"url": f"https://compressed.example/{index}"}),
+        )
+
+    # When
+    # They are listed by a client accepting brotli
+    response = test_app_with_db.get(
+        "/summaries/?limit=20", headers={"Accept-Encoding": "br"}
+    )
+
+    # Then
+    # The listing is compressed and decodes to the summaries
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "br"
+    assert len(response.json()) == 20
+
+
+def test_compressed_summary_not_modified(test_app_with_db):
+    # Given
+    # A summary larger than the compression threshold, read compressed
+    url = unique_url("https://compressed.example/")
+    summary_id = create_summary(test_app_with_db, url)
+    test_app_with_db.put(
+        f"/summaries/{summary_id}/",
+        data=json.dumps({"url": url, "summary": "Long sentence. " * 100}),
+    )
+    response = test_app_with_db.get(
+        f"/summaries/{summary_id}/", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.headers["content-encoding"] == "gzip"
+
+    # When
+    # It is revalidated with the same encoding
+    cached = test_app_with_db.get(
+        f"/summaries/{summary_id}/",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]},
+    )
+
+    # Then
+    # The 304 repeats the 200's ETag
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == response.headers["etag"]
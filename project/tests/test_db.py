@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from fastapi import status
+
+from app.config import Settings
+from app.db import get_connection_config
+from app.db_pool import InstrumentedPool
+
+
+class FakePool:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    async def acquire(self, timeout=None):
+        if self.delay and timeout and self.delay > timeout:
+            raise asyncio.TimeoutError()
+        await asyncio.sleep(self.delay)
+        return "connection"
+
+    def get_size(self):
+        return 4
+
+    def get_idle_size(self):
+        return 1
+
+    def get_min_size(self):
+        return 1
+
+    def get_max_size(self):
+        return 10
+
+
+def test_connection_config_applies_pool_settings():
+    # Given
+    # Pool settings
+    settings = Settings(
+        db_pool_min_size=2,
+        db_pool_max_size=20,
+        db_pool_acquire_timeout=3,
+        db_statement_cache_size=0,
+        db_pool_max_idle_lifetime=60,
+    )
+
+    # When
+    # A postgres connection config is built
+    config = get_connection_config("postgres://user:pass@db:5432/web", settings)
+
+    # Then
+    # The instrumented client is used with the configured pool
+    assert config["engine"] == "app.db_pool"
+    assert config["credentials"]["minsize"] == 2
+    assert config["credentials"]["maxsize"] == 20
+    assert config["credentials"]["acquire_timeout"] == 3
+    assert config["credentials"]["statement_cache_size"] == 0
+    assert config["credentials"]["max_inactive_connection_lifetime"] == 60
+
+
+def test_connection_config_leaves_other_engines_alone():
+    config = get_connection_config("sqlite://:memory:", Settings())
+
+    assert config["engine"] == "tortoise.backends.sqlite"
+    assert "maxsize" not in config["credentials"]
+
+
+def test_instrumented_pool_records_acquire_waits():
+    # Given
+    # An instrumented pool
+    pool = InstrumentedPool(FakePool(), acquire_timeout=1)
+
+    # When
+    # A connection is acquired
+    connection = asyncio.run(pool.acquire())
+
+    # Then
+    # The wait is recorded and the pool usage is reported
+    assert connection == "connection"
+    snapshot = pool.snapshot()
+    assert snapshot["in_use"] == 3
+    assert snapshot["idle"] == 1
+    assert snapshot["waiting"] == 0
+    assert snapshot["acquire_wait_seconds"]["count"] == 1
+    assert snapshot["acquire_wait_seconds"]["buckets"]["+Inf"] == 1
+
+
+def test_instrumented_pool_counts_acquire_timeouts():
+    # Given
+    # A pool slower than the acquire timeout
+    pool = InstrumentedPool(FakePool(delay=1), acquire_timeout=0.01)
+
+    # When
+    # A connection is acquired
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(pool.acquire())
+
+    # Then
+    # The timeout is counted
+    assert pool.snapshot()["acquire_timeouts"] == 1
+
+
+def test_db_pool_stats(test_app, override_settings):
+    # When
+    # The pool stats are requested with the internal token
+    override_settings(internal_api_token="secret")
+    response = test_app.get(
+        "/internal/db-pool", headers={"Authorization": "Bearer secret"}
+    )
+
+    # Then
+    # The status code is 200 ok
+    assert response.status_code == status.HTTP_200_OK
+    assert isinstance(response.json(), dict)
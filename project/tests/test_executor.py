@@ -0,0 +1,34 @@
+import asyncio
+
+from app import executor
+from app.config import Settings
+
+
+def test_executor_runs_work_off_the_event_loop():
+    # Given
+    # A started summarizer executor
+    executor.init_executor(Settings(summarizer_process_workers=1))
+
+    # When
+    # Work is submitted to the cpu pool
+    total = asyncio.run(executor.run_cpu(sum, [1, 2, 3]))
+    executor.shutdown_executor()
+
+    # Then
+    # The cpu work returned its result
+    assert total == 6
+
+
+def test_shutdown_executor_is_idempotent():
+    # Given
+    # A started summarizer executor
+    executor.init_executor(Settings())
+
+    # When
+    # It is shut down twice
+    executor.shutdown_executor()
+    executor.shutdown_executor()
+
+    # Then
+    # The pools are released
+    assert executor._process_pool is None
@@ -0,0 +1,204 @@
+import asyncio
+from datetime import timedelta
+
+import httpx
+import pytest
+from tortoise import timezone
+
+from app import summarizer
+from app.cache import get_cache
+from app.config import Settings
+from app.fetcher import BodyTooLarge, Fetcher, FetchError, Page
+from app.models.tortoise import CachedSummary
+from app.summarizer import SummaryProgress
+from app.urls import summary_key
+
+from .helpers import unique_url
+
+
+def make_fetcher(handler, **settings):
+    return Fetcher(Settings(**settings), transport=httpx.MockTransport(handler))
+
+
+def test_fetch_returns_html_and_validators():
+    # Given
+    # An origin serving an article with validators
+    def handler(request):
+        assert "If-None-Match" not in request.headers
+        return httpx.Response(
+            200,
+            html="<html>article</html>",
+            headers={"ETag": '"v1"', "Last-Modified": "Fri, 21 Oct 2022 10:00:00 GMT"},
+        )
+
+    # When
+    # The article is fetched
+    async def run():
+        fetcher = make_fetcher(handler)
+        try:
+            return await fetcher.fetch("https://foo.bar/article")
+        finally:
+            await fetcher.aclose()
+
+    page = asyncio.run(run())
+
+    # Then
+    # The html and its validators are returned
+    assert page == Page(
+        "https://foo.bar/article",
+        "<html>article</html>",
+        '"v1"',
+        "Fri, 21 Oct 2022 10:00:00 GMT",
+    )
+    assert not page.not_modified
+
+
+def test_fetch_conditional_not_modified():
+    # Given
+    # An origin that honours If-None-Match
+    def handler(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, html="<html>changed</html>")
+
+    # When
+    # The article is re-fetched with its validator
+    async def run():
+        fetcher = make_fetcher(handler)
+        try:
+            return await fetcher.fetch("https://foo.bar/article", etag='"v1"')
+        finally:
+            await fetcher.aclose()
+
+    page = asyncio.run(run())
+
+    # Then
+    # The page is reported as not modified
+    assert page.not_modified
+    assert page.etag == '"v1"'
+
+
+@pytest.mark.parametrize(
+    "headers", [{"Content-Length": "11"}, {}], ids=["declared", "streamed"]
+)
+def test_fetch_rejects_large_bodies(headers):
+    # Given
+    # An origin serving a body larger than allowed
+    async def body():
+        yield b"x" * 6
+        yield b"x" * 5
+
+    def handler(request):
+        return httpx.Response(200, headers=headers, content=body())
+
+    # When
+    # The article is fetched
+    async def run():
+        fetcher = make_fetcher(handler, fetch_max_body_size=10)
+        try:
+            await fetcher.fetch("https://foo.bar/huge")
+        finally:
+            await fetcher.aclose()
+
+    # Then
+    # The fetch is aborted
+    with pytest.raises(BodyTooLarge):
+        asyncio.run(run())
+
+
+def test_fetch_enforces_total_deadline():
+    # Given
+    # An origin that never finishes responding
+    async def handler(request):
+        await asyncio.sleep(10)
+
+    # When
+    # The article is fetched with a short deadline
+    async def run():
+        fetcher = make_fetcher(handler, fetch_timeout=0.01)
+        try:
+            await fetcher.fetch("https://slow.example/")
+        finally:
+            await fetcher.aclose()
+
+    # Then
+    # The fetch fails instead of tying up the worker
+    with pytest.raises(FetchError, match="took longer"):
+        asyncio.run(run())
+
+
+def test_fetch_limits_concurrency_per_host():
+    # Given
+    # An origin tracking concurrent requests per host
+    active = {}
+    peak = {}
+
+    async def handler(request):
+        host = request.url.host
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        await asyncio.sleep(0.01)
+        active[host] -= 1
+        return httpx.Response(200, html="ok")
+
+    # When
+    # Several articles are fetched at once from two hosts
+    async def run():
+        fetcher = make_fetcher(handler, fetch_per_host_limit=2)
+        try:
+            await asyncio.gather(
+                *(fetcher.fetch(f"https://a.example/{n}") for n in range(5)),
+                *(fetcher.fetch(f"https://b.example/{n}") for n in range(5)),
+            )
+            return fetcher._hosts
+        finally:
+            await fetcher.aclose()
+
+    hosts = asyncio.run(run())
+
+    # Then
+    # Each host is capped independently, and idle hosts are forgotten
+    assert peak == {"a.example": 2, "b.example": 2}
+    assert hosts == {}
+
+
+def test_summarize_url_reuses_summary_when_not_modified(test_app_with_db, monkeypatch):
+    # Given
+    # An expired shared cache entry with a validator
+    url = unique_url("https://conditional.example/")
+    key = summary_key(url, "textrank")
+
+    async def seed():
+        get_cache().memory.clear()
+        await CachedSummary.create(key=key, url=url, summary="still fresh", etag='"v1"')
+        await CachedSummary.filter(key=key).update(
+            created_at=timezone.now() - timedelta(days=30)
+        )
+
+    test_app_with_db.portal.call(seed)
+
+    # And
+    # An origin reporting the article unchanged
+    requests = []
+
+    class MockFetcher:
+        async def fetch(self, url, etag=None, last_modified=None):
+            requests.append(etag)
+            return Page(url, None, etag)
+
+    async def mock_run_cpu(func, *args):
+        raise AssertionError("unchanged articles are not summarized again")
+
+    monkeypatch.setattr(summarizer, "get_fetcher", MockFetcher)
+    monkeypatch.setattr(summarizer, "run_cpu", mock_run_cpu)
+
+    # When
+    # The url is summarized
+    summary = test_app_with_db.portal.call(
+        summarizer.summarize_url, url, "textrank", key, SummaryProgress(0)
+    )
+
+    # Then
+    # The article is re-fetched conditionally and the stored summary reused
+    assert requests == ['"v1"']
+    assert summary == "still fresh"
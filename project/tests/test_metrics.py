@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app import metrics
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_metrics_endpoint(test_app_with_db):
+    # Given
+    # A summary that has been read back
+    summary_id = test_app_with_db.post(
+        "/summaries/", data=json.dumps({"url": "https://metrics.example/"})
+    ).json()["id"]
+    reads = sample(
+        "http_request_duration_seconds_count",
+        method="GET",
+        route="/summaries/{id}/",
+        status="200",
+    )
+    test_app_with_db.get(f"/summaries/{summary_id}/")
+
+    # When
+    # The metrics are scraped
+    response = test_app_with_db.get("/metrics")
+
+    # Then
+    # Requests are counted per route template and CRUD calls are timed
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        sample(
+            "http_request_duration_seconds_count",
+            method="GET",
+            route="/summaries/{id}/",
+            status="200",
+        )
+        == reads + 1
+    )
+    assert 'db_query_duration_seconds_count{function="get"}' in response.text
+
+    # And
+    # The job queue depth is reported
+    assert sample("summary_job_queue_depth", status="queued") >= 1
+    assert 'summary_job_queue_depth{status="running"}' in response.text
+
+
+def test_unmatched_routes_share_a_label(test_app):
+    before = sample(
+        "http_request_duration_seconds_count",
+        method="GET",
+        route="unmatched",
+        status="404",
+    )
+    test_app.get("/no/such/path/123")
+    test_app.get("/no/such/path/456")
+    after = sample(
+        "http_request_duration_seconds_count",
+        method="GET",
+        route="unmatched",
+        status="404",
+    )
+    assert after == before + 2
+
+
+def test_timed_query_records_failures():
+    # Given
+    # A CRUD function that fails
+    @metrics.timed_query
+    async def broken_query():
+        raise RuntimeError("boom")
+
+    before = sample("db_query_duration_seconds_count", function="broken_query")
+
+    # When / Then
+    # The error propagates and the call is still timed
+    with pytest.raises(RuntimeError):
+        asyncio.run(broken_query())
+    assert sample("db_query_duration_seconds_count", function="broken_query") == (
+        before + 1
+    )
+
+
+def test_multiprocess_registry(monkeypatch, tmp_path):
+    # Given
+    # A multiprocess directory, as set for gunicorn
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+    # When / Then
+    # Scrapes aggregate the samples every process wrote there
+    registry = metrics.collector_registry()
+    assert registry is not REGISTRY
+    assert metrics.render() == b""
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import threading
+import time
+
+from fastapi import status
+
+from app.api import crud
+from app.notify import SummaryNotifier, get_notifier
+
+
+def parse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        if "event" in lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_notifier_dispatches_to_subscribers():
+    # Given
+    # A notifier with a subscriber for summary 1
+    async def run():
+        notifier = SummaryNotifier()
+        with notifier.subscribe(1) as ready:
+            assert len(notifier) == 1
+
+            # When
+            # Summaries 2 and then 1 are announced
+            notifier.dispatch(2)
+            assert not ready.is_set()
+            notifier._on_notification(None, 0, "summary_ready", "3,1")
+
+            # Then
+            # Only the matching subscriber is woken
+            await asyncio.wait_for(ready.wait(), 1)
+        return notifier
+
+    notifier = asyncio.run(run())
+
+    # And
+    # Leaving the subscription cleans it up
+    assert len(notifier) == 0
+
+
+def test_summary_events_ready(test_app_with_db):
+    # Given
+    # A summary that is already written
+    summary_id = test_app_with_db.post(
+        "/summaries/", data=json.dumps({"url": "https://foo.bar"})
+    ).json()["id"]
+    test_app_with_db.put(
+        f"/summaries/{summary_id}/",
+        data=json.dumps({"url": "https://foo.bar", "summary": "ready"}),
+    )
+
+    # When
+    # A client subscribes to its events
+    response = test_app_with_db.get(f"/summaries/{summary_id}/events")
+
+    # Then
+    # The summary is pushed straight away
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/event-stream")
+    [(name, data)] = parse_events(response.text)
+    assert name == "summary"
+    assert data["id"] == summary_id
+    assert data["summary"] == "ready"
+
+
+def test_summary_events_pushed_on_write(test_app_with_db):
+    # Given
+    # A pending summary and a client waiting on its events
+    summary_id = test_app_with_db.post(
+        "/summaries/", data=json.dumps({"url": "https://foo.bar"})
+    ).json()["id"]
+    responses = []
+    client = threading.Thread(
+        target=lambda: responses.append(
+            test_app_with_db.get(f"/summaries/{summary_id}/events")
+        )
+    )
+    client.start()
+    deadline = time.monotonic() + 5
+    while not len(get_notifier()) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # When
+    # The summary is written
+    test_app_with_db.put(
+        f"/summaries/{summary_id}/",
+        data=json.dumps({"url": "https://foo.bar", "summary": "pushed"}),
+    )
+    client.join(5)
+
+    # Then
+    # The waiting client receives it without polling
+    [(name, data)] = parse_events(responses[0].text)
+    assert name == "summary"
+    assert data["summary"] == "pushed"
+
+
+def test_summary_events_write_during_read(
+    test_app_with_db, monkeypatch, override_settings
+):
+    # Given
+    # A summary written while its events are reading it
+    summaries = iter([{"id": 1, "status": "pending"}, {"id": 1, "status": "pending"}])
+
+    async def mock_get(id):
+        summary = next(summaries, None)
+        if summary is None:
+            return {"id": id, "status": "done", "summary": "written"}
+        if len(get_notifier()):
+            get_notifier().dispatch(id)
+        return summary
+
+    monkeypatch.setattr(crud, "get", mock_get)
+    override_settings(summary_events_timeout=5, summary_events_keepalive=1)
+
+    # When
+    # A client subscribes to its events
+    response = test_app_with_db.get("/summaries/1/events")
+
+    # Then
+    # The write is not missed, so the summary is pushed without a keepalive
+    assert ": keepalive" not in response.text
+    assert parse_events(response.text) == [
+        ("summary", {"id": 1, "status": "done", "summary": "written"})
+    ]
+
+
+def test_summary_events_timeout(test_app_with_db, override_settings):
+    # Given
+    # A pending summary and a short event timeout
+    summary_id = test_app_with_db.post(
+        "/summaries/", data=json.dumps({"url": "https://foo.bar"})
+    ).json()["id"]
+    override_settings(summary_events_timeout=0.05, summary_events_keepalive=0.01)
+
+    # When
+    # A client subscribes to its events
+    response = test_app_with_db.get(f"/summaries/{summary_id}/events")
+
+    # Then
+    # Keepalives are sent until the stream times out
+    assert ": keepalive" in response.text
+    assert parse_events(response.text) == [("timeout", {"id": summary_id})]
+
+
+def test_summary_events_not_found(test_app_with_db):
+    response = test_app_with_db.get("/summaries/999999/events")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["detail"] == "Summary not found"
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+from app.replica import STICKY_COOKIE, ReadRoutingMiddleware, use_primary
+
+
+@pytest.fixture(scope="module")
+def routing_client():
+    app = FastAPI()
+    app.add_middleware(ReadRoutingMiddleware)
+
+    @app.get("/read")
+    async def read():
+        return {"primary": use_primary.get()}
+
+    @app.post("/write")
+    async def write():
+        return {"primary": use_primary.get()}
+
+    with TestClient(app) as client:
+        yield client
+
+
+def test_reads_use_replica(routing_client):
+    # When
+    # A read is sent without any consistency hints
+    response = routing_client.get("/read")
+
+    # Then
+    # It is routed to the replica
+    assert response.json() == {"primary": False}
+
+
+def test_reads_use_primary_on_request(routing_client):
+    # When
+    # A read asks for primary consistency
+    response = routing_client.get("/read", headers={"X-Read-Consistency": "primary"})
+
+    # Then
+    # It is routed to the primary
+    assert response.json() == {"primary": True}
+
+
+def test_writes_stick_client_to_primary(routing_client):
+    # When
+    # A client writes
+    response = routing_client.post("/write")
+
+    # Then
+    # The write uses the primary
+    assert response.json() == {"primary": True}
+
+    # And
+    # The client is told to read from the primary for a short window
+    sticky_until = float(response.cookies[STICKY_COOKIE])
+    assert sticky_until > time.time()
+
+    # When
+    # The same client reads straight after
+    response = routing_client.get(
+        "/read", headers={"Cookie": f"{STICKY_COOKIE}={sticky_until}"}
+    )
+
+    # Then
+    # It reads its own write from the primary
+    assert response.json() == {"primary": True}
+
+
+def test_expired_sticky_window_uses_replica(routing_client):
+    # When
+    # A read carries an expired sticky window
+    response = routing_client.get(
+        "/read", headers={"Cookie": f"{STICKY_COOKIE}={time.time() - 1}"}
+    )
+
+    # Then
+    # It is routed to the replica
+    assert response.json() == {"primary": False}
@@ -0,0 +1,74 @@
+import pytest
+
+from app import resources, summarizer
+
+
+class CountingEngine(summarizer.SummaryEngine):
+    nltk_packages = ("punkt",)
+
+    def __init__(self, missing=False):
+        self.missing = missing
+        self.loads = 0
+
+    def _load(self):
+        self.loads += 1
+        if self.missing:
+            raise LookupError("Resource punkt not found.")
+
+    def summarize(self, title, text):
+        return text
+
+
+def test_engine_resources_load_once():
+    # Given
+    # An engine whose resources are available
+    engine = CountingEngine()
+
+    # When
+    # It is loaded repeatedly, as every summary batch does
+    engine.load()
+    engine.load()
+
+    # Then
+    # Its resources are only read the first time
+    assert engine.loads == 1
+
+
+def test_check_resources_fails_fast(monkeypatch):
+    # Given
+    # One engine whose resources are missing
+    monkeypatch.setattr(
+        summarizer,
+        "ENGINES",
+        {"ready": CountingEngine(), "broken": CountingEngine(missing=True)},
+    )
+
+    # When / Then
+    # The check reports the broken engine
+    with pytest.raises(resources.ResourcesMissing, match="broken: Resource punkt"):
+        resources.check_resources()
+    assert resources.main(["--check"]) == 1
+
+
+def test_prefetch_downloads_engine_packages(monkeypatch, tmp_path):
+    # Given
+    # Engines needing overlapping NLTK packages
+    engine = CountingEngine()
+    engine.nltk_packages = ("punkt", "punkt_tab")
+    monkeypatch.setattr(summarizer, "ENGINES", {"one": CountingEngine(), "two": engine})
+    downloads = []
+    monkeypatch.setattr(
+        "nltk.download",
+        lambda package, download_dir, **kwargs: downloads.append(
+            (package, download_dir)
+        ),
+    )
+
+    # When
+    # The build-time prefetch command runs
+    status = resources.main(["--download-dir", str(tmp_path)])
+
+    # Then
+    # Each package is downloaded once and the resources are checked
+    assert downloads == [("punkt", str(tmp_path)), ("punkt_tab", str(tmp_path))]
+    assert status == 0
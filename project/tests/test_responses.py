@@ -0,0 +1,146 @@
+import json
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+
+from app.api import crud, responses
+from app.models.tortoise import EngineName, SummaryStatus
+
+READS = [
+    "/summaries/",
+    "/summaries/?limit=2",
+    "/summaries/?fields=summary,url",
+    "/summaries/?fields=updated_at,status",
+    "/summaries/?status=done",
+]
+
+
+@pytest.fixture(scope="module")
+def summary_ids(test_app_with_db):
+    ids = [
+        test_app_with_db.post(
+            "/summaries/", data=json.dumps({"url": f"https://fast.example/{index}"})
+        ).json()["id"]
+        for index in range(3)
+    ]
+    test_app_with_db.put(
+        f"/summaries/{ids[0]}/",
+        data=json.dumps({"url": "https://fast.example/0", "summary": "Ünïcode ✓"}),
+    )
+    return ids
+
+
+def read_all(test_app_with_db, summary_ids):
+    paths = [
+        *(f"{path}{'&' if '?' in path else '?'}after=0" for path in READS),
+        *(f"/summaries/{id}/" for id in summary_ids),
+        "/summaries/batch?" + "&".join(f"ids={id}" for id in summary_ids),
+    ]
+    return {path: test_app_with_db.get(path) for path in paths}
+
+
+def test_fast_json_matches_validated_responses(
+    test_app_with_db, summary_ids, override_settings
+):
+    # Given
+    # Every read endpoint's responses, validated against the response model
+    validated = read_all(test_app_with_db, summary_ids)
+
+    # When
+    # The same reads are encoded straight from the database rows
+    override_settings(fast_json_responses=1)
+    fast = read_all(test_app_with_db, summary_ids)
+
+    # Then
+    # The bodies and headers are identical
+    for path, response in validated.items():
+        assert fast[path].status_code == response.status_code == 200, path
+        assert fast[path].content == response.content, path
+        assert fast[path].headers == response.headers, path
+
+
+@pytest.mark.parametrize("fast_json_responses", [0, 1], ids=["validated", "fast"])
+def test_streamed_lists_match_buffered_responses(
+    test_app_with_db, summary_ids, override_settings, fast_json_responses
+):
+    # Given
+    # Every read endpoint's responses, buffered
+    buffered = read_all(test_app_with_db, summary_ids)
+
+    # When
+    # Lists are streamed two rows at a time
+    override_settings(fast_json_responses=fast_json_responses, response_chunk_size=2)
+    streamed = read_all(test_app_with_db, summary_ids)
+
+    # Then
+    # Lists longer than that are streamed, and every body is unchanged
+    assert "content-length" not in streamed["/summaries/?after=0"].headers
+    assert "etag" in streamed["/summaries/?after=0"].headers
+    assert "content-length" in streamed["/summaries/?limit=2&after=0"].headers
+    for path, response in buffered.items():
+        assert streamed[path].status_code == response.status_code == 200, path
+        assert streamed[path].content == response.content, path
+
+
+def test_fast_json_not_modified(test_app_with_db, summary_ids, override_settings):
+    # Given
+    # The fast path is enabled and a summary's ETag is known
+    override_settings(fast_json_responses=1)
+    response = test_app_with_db.get(f"/summaries/{summary_ids[1]}/")
+
+    # When
+    # The summary is requested again with that ETag
+    cached = test_app_with_db.get(
+        f"/summaries/{summary_ids[1]}/",
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+
+    # Then
+    # It is not modified
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+def test_fast_json_encodes_row_types(test_app, monkeypatch, override_settings):
+    # Given
+    # A row with every type crud returns, as stored by Postgres
+    row = {
+        "id": 1,
+        "url": "https://foo.bar",
+        "summary": 'Quotes " and \\ and ✓',
+        "status": SummaryStatus.DONE,
+        "engine": EngineName.NEWSPAPER,
+        "error": None,
+        "started_at": datetime(2022, 10, 1, 12, 0, 0, 123456, tzinfo=timezone.utc),
+        "finished_at": datetime(2022, 10, 1, 12, 0, 1, tzinfo=timezone.utc),
+        "downloading_seconds": 0.1,
+        "parsing_seconds": 1e-05,
+        "summarizing_seconds": 12.5,
+        "created_at": datetime(2022, 10, 1, 12, 0, 0, tzinfo=timezone.utc),
+        "updated_at": datetime(2022, 10, 1, 12, 0, 1, tzinfo=timezone.utc),
+    }
+
+    async def mock_get(id):
+        return dict(row)
+
+    monkeypatch.setattr(crud, "get", mock_get)
+    validated = test_app.get("/summaries/1/")
+
+    # When
+    # The fast path encodes it
+    override_settings(fast_json_responses=1)
+    fast = test_app.get("/summaries/1/")
+
+    # Then
+    # It decodes to the same document as the validated response
+    assert fast.json() == validated.json()
+    assert fast.json()["started_at"] == "2022-10-01T12:00:00.123456+00:00"
+
+
+@pytest.mark.parametrize("count", [0, 1, 2, 5])
+def test_json_array(count):
+    rows = [{"id": id} for id in range(count)]
+    chunks = list(responses.json_array(rows, orjson.dumps, 2))
+    assert b"".join(chunks) == orjson.dumps(rows)
+    assert len(chunks) == (count + 1) // 2 + 1
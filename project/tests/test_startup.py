@@ -0,0 +1,34 @@
+import subprocess  # nosec
+import sys
+
+from app import startup
+
+
+def loaded_by(module):
+    code = f"import {module}, app.startup; print(*app.startup.loaded_subsystems())"
+    result = subprocess.run(  # nosec
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return result.stdout.split()
+
+
+def test_web_app_does_not_load_summarizer():
+    # Given / When
+    # The web app is imported in a fresh interpreter
+    loaded = loaded_by("app.main")
+
+    # Then
+    # The summarizer libraries are left to the worker's CPU pool
+    assert "api" in loaded
+    assert "summarizer" not in loaded
+
+
+def test_worker_does_not_load_summarizer():
+    assert "summarizer" not in loaded_by("app.worker")
+
+
+def test_measure_imports_reports_every_subsystem():
+    costs = startup.measure_imports()
+    assert [cost.subsystem for cost in costs] == list(startup.SUBSYSTEMS)
+    assert all(cost.seconds >= 0 for cost in costs)
+    assert startup.rss() > 0
@@ -2,24 +2,19 @@ import json
 
 import pytest
 from fastapi import status
+from tortoise import Tortoise
 
-from app.api import summaries
+from app.backfill import backfill_url_hashes, create_url_hash_index
+from app.models.tortoise import TextSummary
 
 from .errors import ERRORS
-from .helpers import create_summary
+from .helpers import create_summary, postgres_only, unique_url
 
 
-def test_create_summary(test_app_with_db, monkeypatch):
+def test_create_summary(test_app_with_db):
     # Given
     # test_app_with_db
 
-    # And
-    # Mock generate summary
-    def mock_generate_summary(summary_id, url):
-        return None
-
-    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
-
     # When
     # posting the json
     # {"url": "https://foo.bar"} to /summaries/
@@ -68,17 +63,10 @@ def test_create_summary_invalid_url(test_app):
     assert response.json()["detail"][0]["msg"] == "URL scheme not permitted"
 
 
-def test_read_summary(test_app_with_db, monkeypatch):
+def test_read_summary(test_app_with_db):
     # Given
     # test_app_with_db
 
-    # And
-    # Mock generate summary
-    def mock_generate_summary(summary_id, url):
-        return None
-
-    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
-
     response = test_app_with_db.post(
         "/summaries/", data=json.dumps({"url": "https://foo.bar"})
     )
@@ -94,6 +82,75 @@ def test_read_summary(test_app_with_db, monkeypatch):
     assert response_dict["created_at"]
 
 
+def test_read_summary_conditional(test_app_with_db):
+    # Given
+    # A stored summary
+    response = test_app_with_db.post(
+        "/summaries/", data=json.dumps({"url": "https://foo.bar"})
+    )
+    summary_id = response.json()["id"]
+
+    # When
+    # The summary is read with its validators
+    response = test_app_with_db.get(f"/summaries/{summary_id}/")
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+
+    # Then
+    # The ETag is weak, and revalidating with either validator returns 304 not
+    # modified, since weak tags match their strong form
+    assert etag.startswith("W/")
+    response = test_app_with_db.get(
+        f"/summaries/{summary_id}/",
+        headers={"If-None-Match": etag.removeprefix("W/")},
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["etag"] == etag
+    assert not response.content
+
+    response = test_app_with_db.get(
+        f"/summaries/{summary_id}/", headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # And
+    # An update changes the ETag
+    test_app_with_db.put(
+        f"/summaries/{summary_id}/",
+        data=json.dumps({"url": "https://foo.bar", "summary": "updated!"}),
+    )
+    response = test_app_with_db.get(
+        f"/summaries/{summary_id}/", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["etag"] != etag
+    assert response.json()["summary"] == "updated!"
+
+
+def test_read_all_summaries_conditional(test_app_with_db):
+    # Given
+    # A stored summary and the ETag of a projected listing
+    test_app_with_db.post("/summaries/", data=json.dumps({"url": "https://foo.bar"}))
+    response = test_app_with_db.get("/summaries/?fields=url")
+    etag = response.headers["etag"]
+    assert all("updated_at" not in summary for summary in response.json())
+
+    # When
+    # The listing is revalidated
+    response = test_app_with_db.get(
+        "/summaries/?fields=url", headers={"If-None-Match": etag}
+    )
+
+    # Then
+    # The status code is 304 not modified
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # And
+    # A different query does not match the ETag
+    response = test_app_with_db.get("/summaries/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+
+
 def test_read_summary_nonexistent_id(test_app_with_db):
     # Given
     # test_app_with_db
@@ -162,23 +219,16 @@ def test_read_summary_non_int_id(test_app):
     }
 
 
-def test_read_all_summaries(test_app_with_db, monkeypatch):
+def test_read_all_summaries(test_app_with_db):
     # Given
     # test_app_with_db
 
-    # And
-    # Mock generate summary
-    def mock_generate_summary(summary_id, url):
-        return None
-
-    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
-
     # When a url is posted
     response = test_app_with_db.post(
         "/summaries/", data=json.dumps({"url": "https://foo.bar"})
     )
     summary_id = response.json()["id"]
-    response = test_app_with_db.get("/summaries/")
+    response = test_app_with_db.get(f"/summaries/?after={summary_id - 1}")
 
     # Then
     # The status code will be 200 ok
@@ -191,16 +241,77 @@ def test_read_all_summaries(test_app_with_db, monkeypatch):
     # Todo improve summaries testing
 
 
-def test_remove_summary(test_app_with_db, monkeypatch):
+def test_read_all_summaries_paginated(test_app_with_db):
     # Given
     # test_app_with_db
 
     # And
-    # Mock generate summary
-    def mock_generate_summary(summary_id, url):
-        return None
+    # Three summaries in the database
+    summary_ids = [
+        create_summary(test_app_with_db, "https://foo.bar") for _ in range(3)
+    ]
 
-    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
+    # When
+    # The first page of two summaries after the first id is requested
+    response = test_app_with_db.get(f"/summaries/?limit=2&after={summary_ids[0] - 1}")
+
+    # Then
+    # The page holds the first two summaries in id order
+    assert response.status_code == status.HTTP_200_OK
+    assert [summary["id"] for summary in response.json()] == summary_ids[:2]
+
+    # And
+    # The Link header points at the next page
+    assert f"after={summary_ids[1]}" in response.headers["link"]
+
+    # When
+    # The next page is requested
+    response = test_app_with_db.get(f"/summaries/?limit=2&after={summary_ids[1]}")
+
+    # Then
+    # It starts with the third summary
+    assert response.json()[0]["id"] == summary_ids[2]
+
+
+def test_read_all_summaries_fields(test_app_with_db):
+    # Given
+    # A summary in the database
+    summary_id = create_summary(test_app_with_db, "https://foo.bar")
+
+    # When
+    # Only the url field is requested
+    response = test_app_with_db.get(
+        f"/summaries/?after={summary_id - 1}&limit=1&fields=url"
+    )
+
+    # Then
+    # Only the id and url are returned
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [{"id": summary_id, "url": "https://foo.bar"}]
+
+
+def test_export_summaries(test_app_with_db):
+    # Given
+    # A summary in the database
+    summary_id = create_summary(test_app_with_db, "https://foo.bar")
+
+    # When
+    # The summaries are exported
+    response = test_app_with_db.get("/summaries/export?fields=url,created_at")
+
+    # Then
+    # Every summary is streamed as one json document per line
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    exported = [line for line in lines if line["id"] == summary_id]
+    assert len(exported) == 1
+    assert exported[0].keys() == {"id", "url", "created_at"}
+
+
+def test_remove_summary(test_app_with_db):
+    # Given
+    # test_app_with_db
 
     # And
     # There is a summary in the database
@@ -300,17 +411,10 @@ def test_remove_summary_with_id_0_or_less(test_app_with_db):
     }
 
 
-def test_update_summary(test_app_with_db, monkeypatch):
+def test_update_summary(test_app_with_db):
     # Given
     # test_app_with_db
 
-    # And
-    # Mock generate summary
-    def mock_generate_summary(summary_id, url):
-        return None
-
-    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
-
     # And
     # There is a summary in the database
 
@@ -339,17 +443,10 @@ def test_update_summary(test_app_with_db, monkeypatch):
     assert response_dict["created_at"]
 
 
-def test_update_summary_with_invalid_url(test_app_with_db, monkeypatch):
+def test_update_summary_with_invalid_url(test_app_with_db):
     # Given
     # test_app_with_db
 
-    # And
-    # Mock generate summary
-    def mock_generate_summary(summary_id, url):
-        return None
-
-    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
-
     # And
     # There is a summary in the database
 
@@ -421,18 +518,11 @@ def test_update_summary_with_invalid_url(test_app_with_db, monkeypatch):
     ],
 )
 def test_update_summary_invalid(
-    test_app_with_db, monkeypatch, add_summary, summary_id, payload, status_code, detail
+    test_app_with_db, add_summary, summary_id, payload, status_code, detail
 ):
     # Given
     # test_app_with_db
 
-    # And
-    # Mock generate summary
-    def mock_generate_summary(summary_id, url):
-        return None
-
-    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
-
     # And
     # [If there is a summary in the database]
     if add_summary:
@@ -451,3 +541,199 @@ def test_update_summary_invalid(
     # And
     # The json detail is detail
     response.json()["detail"] == detail
+
+
+def test_create_read_and_delete_summaries_in_batch(test_app_with_db):
+    # Given
+    # test_app_with_db
+
+    # When
+    # A batch of urls is posted to /summaries/batch
+    urls = ["https://foo.bar", "https://bar.baz", "https://baz.qux"]
+    response = test_app_with_db.post(
+        "/summaries/batch", data=json.dumps({"urls": urls})
+    )
+
+    # Then
+    # The status code is 201 created
+    # And every url gets its own id, in order
+    assert response.status_code == status.HTTP_201_CREATED
+    created = response.json()
+    assert [summary["url"] for summary in created] == urls
+    summary_ids = [summary["id"] for summary in created]
+    assert len(set(summary_ids)) == 3
+
+    # When
+    # The batch is read back
+    query = "&".join(f"ids={id}" for id in summary_ids)
+    response = test_app_with_db.get(f"/summaries/batch?{query}")
+
+    # Then
+    # Every summary is returned
+    assert response.status_code == status.HTTP_200_OK
+    assert [summary["id"] for summary in response.json()] == summary_ids
+    assert [summary["summary"] for summary in response.json()] == ["", "", ""]
+
+    # When
+    # The batch is deleted
+    response = test_app_with_db.delete(f"/summaries/batch?{query}")
+
+    # Then
+    # The deleted summaries are returned
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == created
+
+    # And
+    # They are no longer available
+    response = test_app_with_db.get(f"/summaries/batch?{query}")
+    assert response.json() == []
+
+
+@pytest.mark.parametrize(
+    ("payload", "status_code"),
+    [
+        [{"urls": []}, status.HTTP_422_UNPROCESSABLE_ENTITY],
+        [{"urls": ["invalid://url"]}, status.HTTP_422_UNPROCESSABLE_ENTITY],
+        [{}, status.HTTP_422_UNPROCESSABLE_ENTITY],
+    ],
+    ids=["e2e_empty_batch", "e2e_invalid_url", "e2e_missing_urls"],
+)
+def test_create_summaries_in_batch_invalid(test_app, payload, status_code):
+    # When
+    # An invalid batch is posted
+    response = test_app.post("/summaries/batch", data=json.dumps(payload))
+
+    # Then
+    # The status code is status_code
+    assert response.status_code == status_code
+
+
+def test_read_all_summaries_by_url(test_app_with_db):
+    # Given
+    # Summaries for two different urls
+    url = unique_url("https://lookup.example/")
+    summary_id = create_summary(test_app_with_db, f"{url}/a?utm_id=1")
+    create_summary(test_app_with_db, f"{url}/b")
+
+    # When
+    # The summaries are filtered by an equivalent url
+    response = test_app_with_db.get(
+        "/summaries/", params={"url": f"{url.replace('lookup', 'LOOKUP')}/a#top"}
+    )
+
+    # Then
+    # Only the matching summary is returned
+    assert response.status_code == status.HTTP_200_OK
+    assert [summary["id"] for summary in response.json()] == [summary_id]
+
+
+def test_read_all_summaries_by_time_window(test_app_with_db):
+    # Given
+    # A summary in the database
+    summary_id = create_summary(test_app_with_db, "https://foo.bar")
+    created_at = test_app_with_db.get(f"/summaries/{summary_id}/").json()["created_at"]
+
+    # When
+    # The summaries created from then on are requested
+    response = test_app_with_db.get(
+        "/summaries/", params={"since": created_at, "after": summary_id - 1}
+    )
+
+    # Then
+    # The summary is included
+    assert summary_id in [summary["id"] for summary in response.json()]
+
+    # When
+    # The summaries created before then are requested
+    response = test_app_with_db.get("/summaries/", params={"until": created_at})
+
+    # Then
+    # The summary is excluded
+    assert summary_id not in [summary["id"] for summary in response.json()]
+
+
+def test_read_all_summaries_by_status(test_app_with_db):
+    # Given
+    # A pending summary and a finished one
+    pending_id = test_app_with_db.post(
+        "/summaries/", data=json.dumps({"url": "https://status.example/pending"})
+    ).json()["id"]
+    done_id = test_app_with_db.post(
+        "/summaries/", data=json.dumps({"url": "https://status.example/done"})
+    ).json()["id"]
+    test_app_with_db.put(
+        f"/summaries/{done_id}/",
+        data=json.dumps({"url": "https://status.example/done", "summary": ""}),
+    )
+
+    # When
+    # Summaries are filtered by status
+    after = pending_id - 1
+    pending = test_app_with_db.get(
+        f"/summaries/?after={after}&status=pending&fields=status"
+    ).json()
+    done = test_app_with_db.get(
+        f"/summaries/?after={after}&status=done&status=failed&fields=status"
+    ).json()
+
+    # Then
+    # Only the matching summaries are returned, even with an empty summary
+    assert {"id": pending_id, "status": "pending"} in pending
+    assert {"id": done_id, "status": "done"} in done
+    assert all(summary["status"] == "pending" for summary in pending)
+    assert all(summary["status"] in ("done", "failed") for summary in done)
+
+    # And
+    # Unknown statuses are rejected
+    response = test_app_with_db.get("/summaries/?status=lost")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_backfill_url_hashes(test_app_with_db):
+    # Given
+    # A summary created before url hashes existed
+    url = unique_url("https://legacy.example/")
+    summary = test_app_with_db.portal.call(
+        lambda: TextSummary.create(url=url, summary="")
+    )
+
+    # When
+    # The url hashes are backfilled
+    test_app_with_db.portal.call(backfill_url_hashes)
+
+    # Then
+    # The summary can be found by url
+    response = test_app_with_db.get(
+        "/summaries/", params={"url": url.replace("legacy", "LEGACY")}
+    )
+    assert [summary["id"] for summary in response.json()] == [summary.id]
+
+
+@postgres_only
+def test_create_url_hash_index(test_app_with_db):
+    # Given
+    # A database migrated without the url hash index
+    async def indexes():
+        connection = Tortoise.get_connection("default")
+        return [
+            row["indexname"]
+            for row in await connection.execute_query_dict(
+                "SELECT indexname FROM pg_indexes WHERE tablename = 'textsummary'"
+            )
+        ]
+
+    test_app_with_db.portal.call(
+        lambda: Tortoise.get_connection("default").execute_script(
+            'DROP INDEX IF EXISTS "idx_textsummary_url_has_4e9a12"'
+        )
+    )
+    assert "idx_textsummary_url_has_4e9a12" not in test_app_with_db.portal.call(indexes)
+
+    # When
+    # The index is created, twice as a rerun would
+    test_app_with_db.portal.call(create_url_hash_index)
+    test_app_with_db.portal.call(create_url_hash_index)
+
+    # Then
+    # It exists
+    assert "idx_textsummary_url_has_4e9a12" in test_app_with_db.portal.call(indexes)
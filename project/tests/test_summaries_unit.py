@@ -13,13 +13,6 @@ def test_create_summary(test_app, monkeypatch):
     # Given
     # test_app
 
-    # And
-    # Mock generate summary
-    def mock_generate_summary(summary_id, url):
-        return None
-
-    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
-
     # And
     # mock test payloads for request & response
     test_request_payload = {"url": "https://foo.bar"}
@@ -31,8 +24,14 @@ def test_create_summary(test_app, monkeypatch):
         return 1
 
     # And
-    # The monkeypatch overrides crud post to mock_post
+    # The monkeypatch overrides crud post to mock_post, and admits every summary
+    async def mock_admit(cost):
+        pass
+
     monkeypatch.setattr(crud, "post", mock_post)
+    monkeypatch.setitem(
+        test_app.app.dependency_overrides, summaries.get_admission, lambda: mock_admit
+    )
 
     # When
     # The test_request_payload is posted
@@ -95,6 +94,15 @@ def test_read_summary(test_app, monkeypatch):
         "url": "https://foo.bar",
         "summary": "summary",
         "created_at": datetime.utcnow().isoformat(),
+        "updated_at": datetime.utcnow().isoformat(),
+        "status": "done",
+        "engine": "textrank",
+        "error": None,
+        "started_at": None,
+        "finished_at": None,
+        "downloading_seconds": None,
+        "parsing_seconds": None,
+        "summarizing_seconds": None,
     }
 
     # And
@@ -153,18 +161,20 @@ def test_read_all_summaries(test_app, monkeypatch):
             "url": "https://foo.bar",
             "summary": "summary",
             "created_at": datetime.utcnow().isoformat(),
+            "updated_at": datetime.utcnow().isoformat(),
         },
         {
             "id": 2,
             "url": "https://testdriven.io/",
             "summary": "summary",
             "created_at": datetime.utcnow().isoformat(),
+            "updated_at": datetime.utcnow().isoformat(),
         },
     ]
 
     # And
     # Mock get all
-    async def mock_get_all():
+    async def mock_get_all(limit, after, fields, **filters):
         return test_data
 
     monkeypatch.setattr(crud, "get_all", mock_get_all)
@@ -182,30 +192,82 @@ def test_read_all_summaries(test_app, monkeypatch):
     assert response.json() == test_data
 
 
-def test_remove_summary(test_app, monkeypatch):
+def test_read_all_summaries_next_page_link(test_app, monkeypatch):
     # Given
     # test_app
 
     # And
-    # A test get
-    async def mock_get(id):
-        return {
-            "id": 1,
-            "url": "https://foo.bar",
-            "summary": "summary",
-            "created_at": datetime.utcnow().isoformat(),
-        }
+    # Mock get all returning a full page
+    async def mock_get_all(limit, after, fields, **filters):
+        return [
+            {
+                "id": id,
+                "url": "https://foo.bar",
+                "updated_at": datetime.utcnow().isoformat(),
+            }
+            for id in range(after + 1, limit + 1)
+        ]
 
-    monkeypatch.setattr(crud, "get", mock_get)
+    monkeypatch.setattr(crud, "get_all", mock_get_all)
+
+    # When
+    # A page of two summaries is requested with a projection
+    response = test_app.get("/summaries/?limit=2&after=0&fields=url")
+
+    # Then
+    # The status code is 200 ok
+    assert response.status_code == status.HTTP_200_OK
+
+    # And
+    # Only the projected fields are returned
+    assert response.json() == [
+        {"id": 1, "url": "https://foo.bar"},
+        {"id": 2, "url": "https://foo.bar"},
+    ]
+
+    # And
+    # The Link header points after the last id
+    assert response.headers["link"] == (
+        '<http://testserver/summaries/?limit=2&fields=url&after=2>; rel="next"'
+    )
+
+
+@pytest.mark.parametrize(
+    ("query", "detail"),
+    [
+        ["fields=url,body", "Unknown fields: body"],
+        ["limit=0", None],
+        ["limit=1001", None],
+    ],
+    ids=["unknown_field", "limit_0", "limit_too_large"],
+)
+def test_read_all_summaries_invalid_query(test_app, query, detail):
+    # When
+    # An invalid query is sent
+    response = test_app.get(f"/summaries/?{query}")
+
+    # Then
+    # The status code is 422 unprocessable entity
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    # And
+    # Unknown fields are named
+    if detail:
+        assert response.json()["detail"] == detail
+
+
+def test_remove_summary(test_app, monkeypatch):
+    # Given
+    # test_app
 
     # And
     # test_data
     test_data = {"id": 1, "url": "https://foo.bar"}
 
     # And
-    # Mock delete
+    # Mock delete returning the deleted row
     async def mock_delete(id):
-        return id
+        return test_data
 
     monkeypatch.setattr(crud, "delete", mock_delete)
 
@@ -222,6 +284,30 @@ def test_remove_summary(test_app, monkeypatch):
     assert response.json() == test_data
 
 
+def test_remove_summary_missing(test_app, monkeypatch):
+    # Given
+    # test_app
+
+    # And
+    # Mock delete not finding a row
+    async def mock_delete(id):
+        return None
+
+    monkeypatch.setattr(crud, "delete", mock_delete)
+
+    # When
+    # A missing summary is deleted
+    response = test_app.delete("/summaries/1/")
+
+    # Then
+    # The status code is 404 not found
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    # And
+    # The json response detail is "Summary not found"
+    assert response.json()["detail"] == ERRORS["not_found"]
+
+
 def test_remove_summary_incorrect_id(test_app, monkeypatch):
     # Given
     # test_app
@@ -258,6 +344,15 @@ def test_update_summary(test_app, monkeypatch):
         "url": "https://foo.bar",
         "summary": "updated",
         "created_at": datetime.utcnow().isoformat(),
+        "updated_at": datetime.utcnow().isoformat(),
+        "status": "done",
+        "engine": "textrank",
+        "error": None,
+        "started_at": None,
+        "finished_at": None,
+        "downloading_seconds": None,
+        "parsing_seconds": None,
+        "summarizing_seconds": None,
     }
 
     # And
@@ -0,0 +1,170 @@
+import json
+
+import numpy as np
+import pytest
+from fastapi import status
+
+from app import summarizer, textrank
+
+
+def test_split_sentences():
+    text = 'First one. "Second," she said! Third?\n\nNew paragraph 4 here'
+    assert textrank.split_sentences(text) == [
+        "First one.",
+        '"Second," she said!',
+        "Third?",
+        "New paragraph 4 here",
+    ]
+
+
+def test_sentence_similarity_from_sparse_tfidf():
+    # Given
+    # Sparse term counts for one document, one sentence without any terms
+    sentences = ["cats purr", "dogs bark at cats", "the"]
+    document, row, term, count = textrank.term_matrix([sentences])
+
+    # When
+    # They are weighted and compared
+    weights = textrank.tfidf(document, row, term, count, np.array([3]))
+    similarity = textrank.similarity(document, row, term, weights, (1, 3))[0]
+
+    # Then
+    # Sentences are unit length, related ones overlap and empty ones stay empty
+    assert set(row) == {0, 1}
+    assert np.allclose(np.diag(similarity), [1, 1, 0])
+    assert 0 < similarity[0, 1] == similarity[1, 0] < 1
+    assert not similarity[2].any()
+
+
+def test_textrank_summary_keeps_central_sentences_in_order():
+    # Given
+    # An article about cats with off-topic sentences mixed in
+    text = " ".join(
+        [
+            "Cats sleep most of the day.",
+            "Stock markets fell sharply on Monday.",
+            "Cats purr when they sleep.",
+            "The weather was rainy.",
+            "Many cats sleep in the sun and purr.",
+        ]
+    )
+
+    # When
+    # It is summarized to two sentences
+    summary = textrank.summarize("Why cats sleep", text, 2)
+
+    # Then
+    # Only on-topic sentences are kept, in their original order
+    sentences = summary.split("\n")
+    assert len(sentences) == 2
+    assert all("cats" in sentence.lower() for sentence in sentences)
+    assert sentences == sorted(sentences, key=text.index)
+
+
+def test_textrank_short_text_is_returned_whole():
+    assert textrank.summarize("Title", "Only one. Just two.", 5) == (
+        "Only one.\nJust two."
+    )
+
+
+def test_textrank_batch_matches_single_documents():
+    # Given
+    # Articles of different lengths, including one too short to rank
+    documents = [
+        ("Cats", "Cats sleep. Dogs bark. Cats purr. Birds sing. Cats eat. Fish swim."),
+        ("Short", "Just one sentence."),
+        (
+            "Markets",
+            "Markets fell. Rain came. Markets rose again. Traders cheered markets. "
+            "Nobody cared. The sun set. Markets closed.",
+        ),
+    ]
+
+    # When
+    # They are summarized as one batch
+    summaries = textrank.summarize_many(documents, 3)
+
+    # Then
+    # Each summary is the same as when summarized alone
+    assert summaries == [
+        textrank.summarize(title, text, 3) for title, text in documents
+    ]
+
+
+def test_textrank_batch_is_ranked_in_buckets(monkeypatch):
+    # Given
+    # Articles of different lengths, and room for one long article per batch
+    documents = [
+        ("Cats", " ".join(f"Cats nap {n}." for n in range(12))),
+        ("Dogs", "Dogs bark. Dogs run. Cats hide. Dogs sleep. Birds sing."),
+        ("Fish", "Fish swim. Fish dart. Fish rest. Cats watch. Fish eat. Fish hide."),
+    ]
+    monkeypatch.setattr(textrank, "BATCH_CELLS", 13**2)
+    shapes = []
+    similarity = textrank.similarity
+
+    def spy(document, row, term, weights, shape):
+        shapes.append(shape)
+        return similarity(document, row, term, weights, shape)
+
+    monkeypatch.setattr(textrank, "similarity", spy)
+
+    # When
+    # They are summarized as one batch
+    summaries = textrank.summarize_many(documents, 3)
+
+    # Then
+    # Short articles are ranked together, the long one alone, and each
+    # summary is the same as when summarized alone
+    assert shapes == [(2, 7), (1, 13)]
+    assert summaries == [
+        textrank.summarize(title, text, 3) for title, text in documents
+    ]
+
+
+def test_textrank_ranks_opening_sentences_of_long_texts(monkeypatch):
+    # Given
+    # More sentences than are ranked, the best of them last
+    monkeypatch.setattr(textrank, "MAX_RANKED_SENTENCES", 4)
+    text = "Rain fell. Wind blew. Snow came. Fog rose. Cats sleep. Cats purr."
+
+    # When
+    summary = textrank.summarize("Cats", text, 2)
+
+    # Then
+    # The summary is drawn from the opening sentences alone
+    assert "Cats" not in summary
+    assert len(summary.splitlines()) == 2
+
+
+def test_summarize_texts_dispatches_to_engine(monkeypatch):
+    # Given
+    # A registered engine
+    class EchoEngine(summarizer.SummaryEngine):
+        def summarize(self, title, text):
+            return f"{title}: {text}"
+
+    monkeypatch.setitem(summarizer.ENGINES, "echo", EchoEngine())
+
+    # When / Then
+    # Each document is summarized by the named engine
+    assert summarizer.summarize_texts("echo", [("A", "a"), ("B", "b")]) == [
+        "A: a",
+        "B: b",
+    ]
+
+
+def test_engine_without_summarize_cannot_be_created():
+    class IncompleteEngine(summarizer.SummaryEngine):
+        pass
+
+    with pytest.raises(TypeError, match="summarize"):
+        IncompleteEngine()
+
+
+def test_create_summary_rejects_unknown_engine(test_app):
+    response = test_app.post(
+        "/summaries/", data=json.dumps({"url": "https://foo.bar", "engine": "gpt"})
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json()["detail"][0]["loc"] == ["body", "engine"]
@@ -0,0 +1,363 @@
+import json
+import os
+from datetime import timedelta
+
+import asyncpg
+from prometheus_client import REGISTRY
+from tortoise import timezone
+
+from app import jobs, summarizer, worker
+from app.cache import get_cache
+from app.config import Settings
+from app.fetcher import Page
+from app.models.tortoise import JobStatus, SummaryJob, TextSummary
+
+from .helpers import claim_all, postgres_only, unique_url
+
+
+def test_create_summary_enqueues_job(test_app_with_db):
+    # Given
+    # test_app_with_db
+
+    # When
+    # A url is posted to /summaries/
+    response = test_app_with_db.post(
+        "/summaries/", data=json.dumps({"url": "https://foo.bar"})
+    )
+    summary_id = response.json()["id"]
+
+    # Then
+    # A queued job exists for the new summary
+    job = test_app_with_db.portal.call(lambda: SummaryJob.get(summary_id=summary_id))
+    assert job.status == JobStatus.QUEUED
+    assert job.url == "https://foo.bar"
+    assert job.attempts == 0
+
+
+def test_worker_runs_claimed_job(test_app_with_db, monkeypatch):
+    # Given
+    # A queued summary job
+    response = test_app_with_db.post(
+        "/summaries/", data=json.dumps({"url": "https://foo.bar"})
+    )
+    summary_id = response.json()["id"]
+
+    # And
+    # Mock generate summary
+    async def mock_generate_summary(summary_id, url, engine, resummarize=False):
+        await TextSummary.filter(id=summary_id).update(summary="generated")
+
+    monkeypatch.setattr(worker, "generate_summary", mock_generate_summary)
+
+    # When
+    # The worker claims and runs the queued jobs
+    async def drain():
+        for job in await claim_all():
+            await worker.run_job(job, Settings())
+
+    test_app_with_db.portal.call(drain)
+
+    # Then
+    # The summary is written and the job is done
+    response = test_app_with_db.get(f"/summaries/{summary_id}/")
+    assert response.json()["summary"] == "generated"
+    job = test_app_with_db.portal.call(lambda: SummaryJob.get(summary_id=summary_id))
+    assert job.status == JobStatus.DONE
+    assert job.attempts == 1
+
+
+def test_generate_summary_records_stages(test_app_with_db, monkeypatch):
+    # Given
+    # A pending summary
+    url = unique_url("https://stages.example/")
+    response = test_app_with_db.post("/summaries/", data=json.dumps({"url": url}))
+    summary_id = response.json()["id"]
+
+    # And
+    # Mock download and summarization, recording the status seen by each stage
+    seen = []
+
+    async def status():
+        return (await TextSummary.get(id=summary_id)).status.value
+
+    class MockFetcher:
+        async def fetch(self, url, etag=None, last_modified=None):
+            seen.append(await status())
+            return Page(url, "<html></html>")
+
+    async def mock_run_cpu(func, *args):
+        seen.append(await status())
+        if func is summarizer.parse_html:
+            return "Title", "text"
+        return ["summary"] * len(args[1])
+
+    monkeypatch.setattr(summarizer, "get_fetcher", MockFetcher)
+    monkeypatch.setattr(summarizer, "run_cpu", mock_run_cpu)
+
+    def stage_count(stage):
+        return REGISTRY.get_sample_value(
+            "summary_stage_duration_seconds_count", {"stage": stage}
+        )
+
+    stages = ("downloading", "parsing", "summarizing", "writing")
+    counts = {stage: stage_count(stage) or 0 for stage in stages}
+
+    # When
+    # The summary is generated
+    test_app_with_db.portal.call(
+        summarizer.generate_summary, summary_id, url, "textrank"
+    )
+
+    # Then
+    # Each stage is entered in order
+    assert seen == ["downloading", "parsing", "summarizing"]
+
+    # And
+    # The summary is done, with timestamps and stage durations
+    summary = test_app_with_db.get(f"/summaries/{summary_id}/").json()
+    assert summary["status"] == "done"
+    assert summary["summary"] == "summary"
+    assert summary["engine"] == "textrank"
+    assert summary["started_at"] <= summary["finished_at"]
+    for stage in ("downloading", "parsing", "summarizing"):
+        assert summary[f"{stage}_seconds"] >= 0
+
+    # And
+    # Every stage, including the final write, is exported as a metric
+    assert all(stage_count(stage) == counts[stage] + 1 for stage in stages)
+
+
+@postgres_only
+def test_stages_are_visible_while_running(test_app_with_db, monkeypatch):
+    # Given
+    # A pending summary, and a reader on a connection of its own
+    url = unique_url("https://visible.example/")
+    response = test_app_with_db.post("/summaries/", data=json.dumps({"url": url}))
+    summary_id = response.json()["id"]
+    seen = []
+
+    async def read_stage():
+        reader = await asyncpg.connect(os.environ["DATABASE_TEST_URL"])
+        try:
+            seen.append(
+                tuple(
+                    await reader.fetchrow(
+                        'SELECT "status", "updated_at" FROM "textsummary" '
+                        'WHERE "id" = $1',
+                        summary_id,
+                    )
+                )
+            )
+        finally:
+            await reader.close()
+
+    # And
+    # Mock download and summarization, reading the stage from outside the job
+    class MockFetcher:
+        async def fetch(self, url, etag=None, last_modified=None):
+            await read_stage()
+            return Page(url, "<html></html>")
+
+    async def mock_run_cpu(func, *args):
+        await read_stage()
+        if func is summarizer.parse_html:
+            return "Title", "text"
+        return ["summary"] * len(args[1])
+
+    monkeypatch.setattr(summarizer, "get_fetcher", MockFetcher)
+    monkeypatch.setattr(summarizer, "run_cpu", mock_run_cpu)
+
+    # When
+    # The summary is generated
+    test_app_with_db.portal.call(
+        summarizer.generate_summary, summary_id, url, "textrank"
+    )
+
+    # Then
+    # Other connections see each stage, and its update time, as it is entered
+    assert [status for status, _ in seen] == ["downloading", "parsing", "summarizing"]
+    updated = [updated_at for _, updated_at in seen]
+    assert updated == sorted(set(updated))
+
+
+def test_worker_retries_failed_job_with_backoff(test_app_with_db, monkeypatch):
+    # Given
+    # A queued summary job
+    response = test_app_with_db.post(
+        "/summaries/", data=json.dumps({"url": "https://foo.bar"})
+    )
+    summary_id = response.json()["id"]
+
+    # And
+    # generate summary fails
+    async def mock_generate_summary(summary_id, url, engine, resummarize=False):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(worker, "generate_summary", mock_generate_summary)
+
+    # When
+    # The worker claims and runs the queued jobs
+    settings = Settings(worker_max_attempts=2, worker_retry_backoff=60)
+
+    async def drain():
+        for job in await claim_all():
+            await worker.run_job(job, settings)
+
+    test_app_with_db.portal.call(drain)
+    job = test_app_with_db.portal.call(lambda: SummaryJob.get(summary_id=summary_id))
+
+    # Then
+    # The job is queued again, but not before its backoff has passed
+    assert job.status == JobStatus.QUEUED
+    assert job.attempts == 1
+    assert "boom" in job.last_error
+    assert job.run_at > job.created_at
+
+    # And
+    # The summary is pending again with the error recorded
+    summary = test_app_with_db.get(f"/summaries/{summary_id}/").json()
+    assert summary["status"] == "pending"
+    assert "boom" in summary["error"]
+
+    # When
+    # The job is claimed again once its backoff has passed, and fails on its
+    # last attempt
+    test_app_with_db.portal.call(
+        lambda: SummaryJob.filter(id=job.id).update(run_at=timezone.now())
+    )
+    test_app_with_db.portal.call(drain)
+    job = test_app_with_db.portal.call(lambda: SummaryJob.get(summary_id=summary_id))
+
+    # Then
+    # The job and its summary are marked as failed
+    assert job.status == JobStatus.FAILED
+    summary = test_app_with_db.get(f"/summaries/{summary_id}/").json()
+    assert summary["status"] == "failed"
+    assert summary["finished_at"]
+
+
+def test_summary_written_by_hand_is_kept(test_app_with_db, monkeypatch):
+    # Given
+    # One summary's job already running, and another's still queued
+    def create(url):
+        return test_app_with_db.post(
+            "/summaries/", data=json.dumps({"url": url})
+        ).json()["id"]
+
+    running_url = unique_url("https://running.example/")
+    running_id = create(running_url)
+    [running] = [
+        job
+        for job in test_app_with_db.portal.call(claim_all)
+        if job.summary_id == running_id
+    ]
+    queued_url = unique_url("https://queued.example/")
+    queued_id = create(queued_url)
+
+    # When
+    # Both are written by hand
+    for summary_id, url in [(running_id, running_url), (queued_id, queued_url)]:
+        test_app_with_db.put(
+            f"/summaries/{summary_id}/",
+            data=json.dumps({"url": url, "summary": "by hand"}),
+        )
+
+    # And
+    # The worker finishes the running job and then claims queued jobs
+    async def mock_summarize_url(url, engine, key, progress):
+        return "generated"
+
+    monkeypatch.setattr(summarizer, "summarize_url", mock_summarize_url)
+
+    async def run():
+        await worker.run_job(running, Settings())
+        return [job.summary_id for job in await claim_all()]
+
+    claimed = test_app_with_db.portal.call(run)
+
+    # Then
+    # Neither summary is overwritten, and both jobs are done
+    assert queued_id not in claimed
+    for summary_id in (running_id, queued_id):
+        summary = test_app_with_db.get(f"/summaries/{summary_id}/").json()
+        assert summary["summary"] == "by hand"
+        assert summary["status"] == "done"
+        job = test_app_with_db.portal.call(
+            lambda: SummaryJob.get(summary_id=summary_id)
+        )
+        assert job.status == JobStatus.DONE
+
+
+def test_requeue_stale_waits_for_the_grace_period(test_app_with_db):
+    # Given
+    # A job running for just past its timeout
+    summary_id = test_app_with_db.post(
+        "/summaries/", data=json.dumps({"url": "https://foo.bar"})
+    ).json()["id"]
+    settings = Settings(worker_job_timeout=60, worker_job_grace=30)
+
+    def lock(seconds_ago):
+        return test_app_with_db.portal.call(
+            lambda: SummaryJob.filter(summary_id=summary_id).update(
+                status=JobStatus.RUNNING,
+                locked_at=timezone.now() - timedelta(seconds=seconds_ago),
+            )
+        )
+
+    def status():
+        return test_app_with_db.portal.call(
+            lambda: SummaryJob.get(summary_id=summary_id)
+        ).status
+
+    lock(70)
+
+    # When
+    # Stale jobs are requeued
+    test_app_with_db.portal.call(jobs.requeue_stale, settings)
+
+    # Then
+    # Its worker may still be recording the timeout, so it is left running
+    assert status() == JobStatus.RUNNING
+
+    # When
+    # The grace period passes too
+    lock(100)
+    test_app_with_db.portal.call(jobs.requeue_stale, settings)
+
+    # Then
+    # The job is queued again
+    assert status() == JobStatus.QUEUED
+
+
+def test_create_summaries_in_batch_enqueues_uncached_urls(test_app_with_db):
+    # Given
+    # One of the urls already has a cached summary
+    test_app_with_db.portal.call(
+        get_cache().set, "https://batch.example/1", "textrank", "cached"
+    )
+
+    # When
+    # A batch is posted
+    response = test_app_with_db.post(
+        "/summaries/batch",
+        data=json.dumps(
+            {"urls": ["https://batch.example/1", "https://batch.example/2"]}
+        ),
+    )
+    cached_id, uncached_id = [summary["id"] for summary in response.json()]
+
+    # Then
+    # Only the uncached url is queued
+    assert not test_app_with_db.portal.call(
+        lambda: SummaryJob.filter(summary_id=cached_id).exists()
+    )
+    job = test_app_with_db.portal.call(lambda: SummaryJob.get(summary_id=uncached_id))
+    assert job.status == JobStatus.QUEUED
+
+    # And
+    # The cached summary is filled in
+    response = test_app_with_db.get(f"/summaries/{cached_id}/")
+    assert response.json()["summary"] == "cached"
+    assert response.json()["status"] == "done"
+    response = test_app_with_db.get(f"/summaries/{uncached_id}/")
+    assert response.json()["status"] == "pending"
@@ -3,7 +3,8 @@
 set -e
 
 IMAGE_ID=$(docker inspect ${HEROKU_REGISTRY_IMAGE} --format={{.Id}})
-PAYLOAD='{"updates": [{"type": "web", "docker_image": "'"$IMAGE_ID"'"}]}'
+WORKER_IMAGE_ID=$(docker inspect ${HEROKU_WORKER_IMAGE} --format={{.Id}})
+PAYLOAD='{"updates": [{"type": "web", "docker_image": "'"$IMAGE_ID"'"}, {"type": "worker", "docker_image": "'"$WORKER_IMAGE_ID"'"}]}'
 
 curl -n -X PATCH https://api.heroku.com/apps/$HEROKU_APP_NAME/formation \
     -d "${PAYLOAD}" \